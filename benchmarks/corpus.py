@@ -0,0 +1,163 @@
+"""
+Deterministic synthetic resume corpus for benchmarks.
+
+    python -m benchmarks.corpus /tmp/corpus --resumes 1000 --formats txt,docx,pdf --words 400 --jds 5
+
+Writes <out>/resumes/resume_00000.<ext> (formats cycled in order) and
+<out>/jd/jd_00.json (JobDescription payloads). Skills are drawn from the
+taxonomy with a Zipf-like popularity curve (`skew`), so a few skills are
+common and the long tail is rare, as in real corpora.
+"""
+import argparse
+import json
+import os
+import random
+import zipfile
+from typing import Dict, List, Sequence
+from xml.sax.saxutils import escape
+
+from hirelens.services.skills import get_matcher
+
+FORMATS = ("txt", "docx", "pdf")
+FILLER = (
+    "designed built shipped led migrated optimized maintained services platform team "
+    "latency throughput customers stakeholders roadmap production reliability on-call "
+    "reduced improved delivered mentored partnered owned launched scaled the a for with"
+).split()
+TITLES = ("Software Engineer", "Senior Software Engineer", "Data Engineer", "Backend Developer", "Lead Engineer", "Intern")
+DEGREES = ("B.Tech in Computer Science", "BSc Mathematics", "MSc Data Science", "Bootcamp graduate")
+
+
+def skill_weights(skills: Sequence[str], skew: float) -> List[float]:
+    return [1.0 / (rank + 1) ** skew for rank in range(len(skills))]
+
+
+def resume_text(rng: random.Random, skills: Sequence[str], weights: Sequence[float], words: int, skills_per_cv: int) -> str:
+    picked = sorted(set(rng.choices(skills, weights=weights, k=skills_per_cv)))
+    years = rng.randint(0, 15)
+    lines = [
+        f"{rng.choice(TITLES)} with {years}+ years of experience",
+        "Skills: " + ", ".join(picked),
+        f"Education: {rng.choice(DEGREES)}",
+    ]
+    body = []
+    for _ in range(max(words - 20, 0)):
+        body.append(rng.choice(picked) if picked and rng.random() < 0.08 else rng.choice(FILLER))
+    for start in range(0, len(body), 16):
+        lines.append(" ".join(body[start:start + 16]))
+    return "\n".join(lines)
+
+
+def write_txt(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_docx(path: str, text: str) -> None:
+    """Minimal WordprocessingML package, enough for docx2txt."""
+    paras = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>" for line in text.split("\n"))
+    ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        z.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/></Relationships>'
+        ))
+        z.writestr("word/document.xml", f'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="{ns}"><w:body>{paras}</w:body></w:document>')
+
+
+def write_pdf(path: str, text: str) -> None:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    lines = text.split("\n")
+    for start in range(0, len(lines), 60):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(40, 40, 560, 800), "\n".join(lines[start:start + 60]), fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+WRITERS = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+
+
+def generate(
+    out_dir: str,
+    resumes: int,
+    formats: Sequence[str] = ("txt",),
+    words: int = 300,
+    skills_per_cv: int = 8,
+    skew: float = 1.1,
+    jds: int = 3,
+    seed: int = 7,
+) -> Dict[str, List[str]]:
+    """
+    Write the corpus and return {"resumes": [paths], "jds": [paths]}. The
+    same arguments always produce byte-identical text.
+    """
+    for fmt in formats:
+        if fmt not in WRITERS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    rng = random.Random(seed)
+    skills = get_matcher().skills
+    weights = skill_weights(skills, skew)
+    cv_dir, jd_dir = os.path.join(out_dir, "resumes"), os.path.join(out_dir, "jd")
+    os.makedirs(cv_dir, exist_ok=True)
+    os.makedirs(jd_dir, exist_ok=True)
+
+    cv_paths = []
+    for i in range(resumes):
+        fmt = formats[i % len(formats)]
+        path = os.path.join(cv_dir, f"resume_{i:05d}.{fmt}")
+        WRITERS[fmt](path, resume_text(rng, skills, weights, words, skills_per_cv))
+        cv_paths.append(path)
+
+    jd_paths = []
+    for j in range(jds):
+        must = sorted(set(rng.choices(skills, weights=weights, k=3)))
+        nice = sorted(set(rng.choices(skills, weights=weights, k=3)) - set(must))
+        years = rng.randint(1, 8)
+        jd = {
+            "id": f"jd-{j:02d}",
+            "title": rng.choice(TITLES),
+            "text": f"Looking for an engineer with {years}+ years of experience in {', '.join(must)}. "
+                    f"Nice to have: {', '.join(nice)}. Degree in computer science preferred.",
+            "must_have": must[:1],
+            "nice_to_have": nice,
+            "min_years": None,
+        }
+        path = os.path.join(jd_dir, f"jd_{j:02d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(jd, f, indent=2)
+        jd_paths.append(path)
+    return {"resumes": cv_paths, "jds": jd_paths}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("out_dir")
+    ap.add_argument("--resumes", type=int, default=100)
+    ap.add_argument("--formats", default="txt", help=f"comma-separated, cycled: {','.join(FORMATS)}")
+    ap.add_argument("--words", type=int, default=300)
+    ap.add_argument("--skills-per-cv", type=int, default=8)
+    ap.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of skill popularity (0 = uniform)")
+    ap.add_argument("--jds", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    out = generate(args.out_dir, args.resumes, args.formats.split(","), args.words,
+                   args.skills_per_cv, args.skew, args.jds, args.seed)
+    print(f"wrote {len(out['resumes'])} resumes and {len(out['jds'])} JDs to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare embedding throughput (texts/s) and agreement with the torch backend
+per backend on generated resume-like texts.
+
+    python -m benchmarks.embedding_backends --model /models/all-MiniLM-L6-v2 --texts 2000 --threads 4
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from hirelens.configs.settings import settings
+from hirelens.services import embedding_backends
+
+WORDS = (
+    "python fastapi docker kubernetes sql aws gcp react node pipelines etl "
+    "designed built shipped led migrated optimized services platform team "
+    "latency throughput customers data models training inference api years"
+).split()
+
+
+def generate_texts(n: int, words: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(words // 2, words))) for _ in range(n)]
+
+
+def bench(backend: str, texts: List[str], model: str, batch_size: int, max_seq_length: int, threads: int) -> Dict:
+    t0 = time.perf_counter()
+    enc = embedding_backends.load_backend(backend, model, max_seq_length=max_seq_length, threads=threads)
+    load_s = time.perf_counter() - t0
+    enc.encode(texts[:batch_size], batch_size=batch_size)      # warm-up
+    t0 = time.perf_counter()
+    emb = enc.encode(texts, batch_size=batch_size)
+    dt = time.perf_counter() - t0
+    return {"backend": backend, "load_s": load_s, "seconds": dt, "texts_per_s": len(texts) / dt, "emb": emb}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--model", default=None, help="model dir or name (default: EMBEDDING_MODEL_DIR or EMBEDDING_MODEL)")
+    ap.add_argument("--backends", default=",".join(embedding_backends.BACKENDS))
+    ap.add_argument("--texts", type=int, default=1000)
+    ap.add_argument("--words", type=int, default=200)
+    ap.add_argument("--batch-size", type=int, default=64)
+    ap.add_argument("--max-seq-length", type=int, default=settings.EMBEDDING_MAX_SEQ_LENGTH)
+    ap.add_argument("--threads", type=int, default=settings.EMBEDDING_THREADS)
+    args = ap.parse_args()
+
+    model = args.model or embedding_backends.model_source(settings.EMBEDDING_MODEL)
+    texts = generate_texts(args.texts, args.words)
+    print(f"{model}: {args.texts} texts, batch_size={args.batch_size} max_seq_length={args.max_seq_length} threads={args.threads}")
+    print(f"{'backend':<10}{'load s':>10}{'seconds':>10}{'texts/s':>10}{'min cos':>10}")
+    ref = None
+    for backend in args.backends.split(","):
+        r = bench(backend, texts, model, args.batch_size, args.max_seq_length, args.threads)
+        if ref is None:
+            ref = r["emb"]
+        cos = float((r["emb"] * ref).sum(axis=1).min()) if r["emb"].shape == ref.shape else float("nan")
+        print(f"{r['backend']:<10}{r['load_s']:>10.2f}{r['seconds']:>10.2f}{r['texts_per_s']:>10.1f}{cos:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare PDF extraction throughput per engine on a generated corpus.
+
+    python -m benchmarks.pdf_engines --files 40 --pages 12
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from hirelens.services import parser
+
+WORDS = (
+    "python fastapi docker kubernetes sql aws gcp react node pipelines etl "
+    "designed built shipped led migrated optimized services platform team "
+    "latency throughput customers data models training inference api"
+).split()
+
+
+def generate_pdfs(folder: str, files: int, pages: int, seed: int = 7) -> List[str]:
+    import fitz  # PyMuPDF
+
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        doc = fitz.open()
+        for _ in range(pages):
+            page = doc.new_page()
+            body = "\n".join(" ".join(rng.choices(WORDS, k=12)) for _ in range(55))
+            page.insert_textbox(fitz.Rect(40, 40, 560, 800), body, fontsize=9)
+        path = os.path.join(folder, f"resume_{i:04d}.pdf")
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def bench(paths: List[str], engine: str, max_pages: int, max_chars: int) -> Dict[str, float]:
+    t0 = time.perf_counter()
+    chars = sum(len(parser._read_pdf(p, engine, max_pages, max_chars)) for p in paths)
+    dt = time.perf_counter() - t0
+    return {"engine": engine, "seconds": dt, "files_per_s": len(paths) / dt, "chars": chars}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--files", type=int, default=40)
+    ap.add_argument("--pages", type=int, default=12)
+    ap.add_argument("--max-pages", type=int, default=0, help="page cap passed to the extractor (0 = all)")
+    ap.add_argument("--max-chars", type=int, default=0, help="character cap passed to the extractor (0 = all)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = generate_pdfs(tmp, args.files, args.pages)
+        print(f"{args.files} PDFs x {args.pages} pages, max_pages={args.max_pages} max_chars={args.max_chars}")
+        print(f"{'engine':<10}{'seconds':>10}{'files/s':>10}{'chars':>12}")
+        for engine in parser.PDF_ENGINES:
+            r = bench(paths, engine, args.max_pages, args.max_chars)
+            print(f"{r['engine']:<10}{r['seconds']:>10.2f}{r['files_per_s']:>10.1f}{r['chars']:>12}")
+
+
+if __name__ == "__main__":
+    main()
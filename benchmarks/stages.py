@@ -0,0 +1,176 @@
+"""
+Per-stage timings of the scoring pipeline on synthetic corpora.
+
+    python -m benchmarks.stages --sizes 100,1000,10000 --stub --out bench.json
+    python -m benchmarks.stages --sizes 100,1000 --stub --compare bench.json
+
+Stages: discovery, extraction (parser.read_file), cleaning, dedup, skills,
+embedding, scoring (features for every JD) and shortlist. Corpus generation
+is not timed. --stub swaps the sentence-transformer for a deterministic
+hashed bag-of-words embedding so the suite runs offline. --compare flags
+stages that got slower than the saved baseline by more than --tolerance
+and exits non-zero.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks import corpus
+from hirelens.configs.settings import settings
+from hirelens.services import dedup, parser, scorer, shortlist
+
+STAGES = ("discovery", "extraction", "cleaning", "dedup", "skills", "embedding", "scoring", "shortlist")
+STUB_DIM = 384
+
+
+def stub_embed(texts: List[str], model_name: str = "", batch_size: int = 32) -> np.ndarray:
+    """
+    Hashed bag-of-words embedding: deterministic, offline, and close enough
+    to a real model that texts sharing words come out similar.
+    """
+    out = np.zeros((len(texts), STUB_DIM), dtype="float32")
+    for i, text in enumerate(texts):
+        for word in text.lower().split():
+            h = int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16)
+            out[i, h % STUB_DIM] += 1.0 if h & 1 else -1.0
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    return out / np.maximum(norms, 1e-12)
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str):
+    t0 = time.perf_counter()
+    yield
+    timings[stage] = time.perf_counter() - t0
+
+
+def run_stages(folder: str, jds: List[Dict], top_n: int = 10) -> Dict[str, float]:
+    """
+    Run the pipeline stage by stage over the resumes in `folder` and return
+    {stage: seconds}.
+    """
+    t: Dict[str, float] = {}
+    with _timed(t, "discovery"):
+        paths = list(parser._iter_resume_files(folder))
+    with _timed(t, "extraction"):
+        raw = [parser.read_file(p) for p in paths]
+    with _timed(t, "cleaning"):
+        texts = [parser._clean(s) for s in raw]
+    with _timed(t, "dedup"):
+        items = [{"id": p, "path": p, "text": s, "sha": hashlib.sha1(s.encode("utf-8")).hexdigest()} for p, s in zip(paths, texts)]
+        texts = [it["text"] for it in dedup.collapse(items)[0]]
+    with _timed(t, "skills"):
+        cv_skills = [scorer.skill_set(s) for s in texts]
+    with _timed(t, "embedding"):
+        corpus_vecs = scorer.embed_corpus(texts)
+        jd_vecs = scorer.embed_jds([jd["text"] for jd in jds])
+    weights = {"skills": settings.WEIGHT_SKILLS, "experience": settings.WEIGHT_EXPERIENCE,
+               "education": settings.WEIGHT_EDUCATION, "seniority": settings.WEIGHT_SENIORITY}
+    with _timed(t, "scoring"):
+        profile = scorer.resume_profile(texts, cv_skills)
+        finals = []
+        for jd, jd_vec in zip(jds, jd_vecs):
+            features = scorer.build_features(jd["text"], texts, corpus_vecs @ jd_vec, profile=profile)
+            finals.append(scorer.score_features(features, weights)[0])
+    with _timed(t, "shortlist"):
+        for final in finals:
+            shortlist.top_indices(final, top_n)
+    return t
+
+
+def run(sizes: List[int], formats: List[str], words: int, n_jds: int, stub: bool, corpus_dir: Optional[str] = None) -> Dict:
+    if stub:
+        scorer.embed_texts = stub_embed
+    settings.EMBEDDING_CACHE_ENABLED = False     # time the model, not the cache
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            out = os.path.join(corpus_dir or tmp, f"corpus_{n}_{'-'.join(formats)}_{words}")
+            if not os.path.isdir(os.path.join(out, "resumes")):
+                corpus.generate(out, n, formats, words=words, jds=n_jds)
+            jds = []
+            for name in sorted(os.listdir(os.path.join(out, "jd")))[:n_jds]:
+                with open(os.path.join(out, "jd", name), "r", encoding="utf-8") as f:
+                    jds.append(json.load(f))
+            timings = run_stages(os.path.join(out, "resumes"), jds)
+            results[str(n)] = {s: round(timings[s], 6) for s in STAGES}
+            print(f"[bench] {n} resumes: {sum(timings.values()):.2f}s total", file=sys.stderr)
+    return {
+        "meta": {
+            "sizes": sizes, "formats": formats, "words": words, "jds": n_jds,
+            "embedding": "stub" if stub else f"{settings.EMBEDDING_MODEL} ({settings.EMBEDDING_BACKEND})",
+            "python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def table(report: Dict) -> str:
+    head = f"{'size':>8}" + "".join(f"{s:>12}" for s in STAGES) + f"{'total':>10}"
+    rows = [head]
+    for size, t in report["results"].items():
+        rows.append(f"{size:>8}" + "".join(f"{t[s]:>12.4f}" for s in STAGES) + f"{sum(t.values()):>10.3f}")
+    return "\n".join(rows)
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float, min_delta_s: float) -> List[str]:
+    """
+    Stages slower than baseline * (1 + tolerance) and by more than
+    `min_delta_s` (to ignore noise on tiny stages). Sizes missing from
+    either report are skipped.
+    """
+    flagged = []
+    for size, t in report["results"].items():
+        base = baseline.get("results", {}).get(size)
+        if not base:
+            continue
+        for stage in STAGES:
+            old, new = base.get(stage), t.get(stage)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > min_delta_s:
+                flagged.append(f"{size:>8} {stage:<11} {old:.4f}s -> {new:.4f}s (+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return flagged
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="100,1000,10000")
+    ap.add_argument("--formats", default="txt,docx,pdf")
+    ap.add_argument("--words", type=int, default=300)
+    ap.add_argument("--jds", type=int, default=3)
+    ap.add_argument("--stub", action="store_true", help="offline stub embedding model")
+    ap.add_argument("--corpus-dir", default=None, help="keep generated corpora here and reuse them across runs")
+    ap.add_argument("--out", default=None, help="write the JSON report here")
+    ap.add_argument("--compare", default=None, help="baseline JSON report to check for regressions")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--min-delta-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    report = run([int(s) for s in args.sizes.split(",")], args.formats.split(","), args.words, args.jds,
+                 args.stub, args.corpus_dir)
+    print(table(report))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            flagged = compare(report, json.load(f), args.tolerance, args.min_delta_ms / 1000)
+        if flagged:
+            print(f"\nREGRESSIONS vs {args.compare} (tolerance {args.tolerance:.0%}):")
+            print("\n".join(flagged))
+            sys.exit(1)
+        print(f"\nno regressions vs {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
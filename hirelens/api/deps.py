@@ -1,13 +1,99 @@
+import importlib
+import threading
+import time
+from typing import Dict, Optional
 
 from hirelens.configs.settings import settings
-from hirelens.services.embeddings import get_model
+
+# Module imports the API process pays for up front vs. what warming loads later.
+_started = time.perf_counter()
+_state: Dict = {"imports": {}, "warm": {}, "warming": False, "warmed": False, "error": None, "ready_after_s": None}
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+
+
+def record(section: str, name: str, seconds: float) -> None:
+    with _lock:
+        _state[section][name] = round(seconds, 4)
+
+
+def timed_import(name: str, section: str = "warm"):
+    """
+    Import `name` and record how long it took (0 if it was already loaded).
+    """
+    t0 = time.perf_counter()
+    module = importlib.import_module(name)
+    record(section, f"import {name}", time.perf_counter() - t0)
+    return module
+
+
+def _backend_modules() -> list:
+    if settings.EMBEDDING_BACKEND == "onnx":
+        return ["onnxruntime", "transformers"]
+    return ["torch", "sentence_transformers"]
+
 
 def warm_models() -> None:
     """
-    Preload the sentence-transformers model so the first request isn't slow.
-    Safe to no-op if the model is already cached.
+    Preload the heavy dependencies, the embedding model and the vector index
+    so the first scoring request isn't slow, recording the cost of each step.
     """
+    from hirelens.services import embeddings, vectorstore
+
+    for name in ["faiss"] + _backend_modules():
+        timed_import(name)
+    t0 = time.perf_counter()
+    embeddings.get_model(settings.EMBEDDING_MODEL)
+    record("warm", f"load model {settings.EMBEDDING_MODEL} ({settings.EMBEDDING_BACKEND})", time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    vectorstore.get_store()
+    record("warm", "load vector index", time.perf_counter() - t0)
+
+
+def _warm() -> None:
     try:
-        get_model(settings.EMBEDDING_MODEL)
+        warm_models()
+        with _lock:
+            _state["warmed"] = True
+            _state["ready_after_s"] = round(time.perf_counter() - _started, 3)
     except Exception as e:
         print(f"[deps] warm_models warning: {e}")
+        with _lock:
+            _state["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        with _lock:
+            _state["warming"] = False
+
+
+def start_warm() -> threading.Thread:
+    """
+    Warm models on a background thread (once); the app serves /health meanwhile.
+    """
+    global _thread
+    with _lock:
+        if _thread is None or (not _thread.is_alive() and not _state["warmed"]):
+            _state.update(warming=True, error=None)
+            _thread = threading.Thread(target=_warm, name="warm-models", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def is_ready() -> bool:
+    """
+    Ready once warming succeeded, or immediately if warming is disabled
+    (models then load on first use).
+    """
+    return _state["warmed"] or not settings.WARM_ON_STARTUP
+
+
+def startup_report() -> Dict:
+    with _lock:
+        return {
+            "ready": is_ready(),
+            "warming": _state["warming"],
+            "error": _state["error"],
+            "uptime_s": round(time.perf_counter() - _started, 3),
+            "ready_after_s": _state["ready_after_s"],
+            "imports": dict(_state["imports"]),
+            "warm": dict(_state["warm"]),
+        }
@@ -1,95 +1,389 @@
 
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse, RedirectResponse
-from typing import List
+import time
+_IMPORT_T0 = time.perf_counter()
 
-from hirelens.configs.settings import settings
+import json
+import os
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
+from typing import List, Optional
+
+from hirelens.api import deps
+from hirelens.configs.settings import ensure_dirs, settings
+
+deps.record("imports", "fastapi", time.perf_counter() - _IMPORT_T0)
+# Per-module import cost for the startup report; the imports below are then free.
+for _module in (
+    "hirelens.models.schema", "hirelens.services.metrics", "hirelens.services.parser",
+    "hirelens.services.embeddings", "hirelens.services.scorer", "hirelens.services.vectorstore",
+    "hirelens.services.scheduler", "hirelens.services.jobs", "hirelens.pipelines.run",
+):
+    deps.timed_import(_module, "imports")
 from hirelens.models.schema import (
-    JobDescription, CandidateScore, ScoreBreakdown,
-    ShortlistRequest, ScheduleRequest, FeedbackBatch,
-    ShortlistPayload,
+    JobDescription, CandidateScore,
+    ScheduleRequest, ScheduleBatchRequest, SlotRequest, AssignRequest, FeedbackBatch,
+    ShortlistPayload, RerankRequest, BatchScoreRequest, BatchScoreResult,
+    SearchRequest, SearchResult,
 )
-from hirelens.services import parser, scorer, shortlist, scheduler
-from hirelens.learning.feedback import update_weights
+from hirelens.services import dedup, parser, scorer, shortlist, scheduler, embeddings, jobs, results, metrics, uploads
+from hirelens.pipelines import run as pipeline
+from hirelens.learning import online
 
 app = FastAPI(title="HireLens", version="0.1.0")
 print("[main] loaded:", __file__)
-@app.post("/shortlist", response_model=List[CandidateScore])
+deps.record("imports", "hirelens.api.main (total)", time.perf_counter() - _IMPORT_T0)
 
-def shortlist_top(payload: ShortlistPayload):
-    return shortlist.shortlist(payload.scores, payload.top_n)
+RESULT_ID_HEADER = "X-Result-Id"
+PROFILE_HEADER = "X-Profile"
+
+REQUEST_SECONDS = metrics.histogram("hirelens_http_request_seconds", "HTTP request latency by route.")
+REQUESTS = metrics.counter("hirelens_http_requests_total", "HTTP requests by route and status.")
+
+@app.middleware("http")
+async def instrument(request: Request, call_next):
+    """
+    Per-route latency/count metrics. Send `X-Profile: 1` (or `?profile=1`) to
+    get this request's stage timings back in a Server-Timing header. For
+    streaming endpoints only the stages before the first byte are included.
+    """
+    want_profile = request.headers.get(PROFILE_HEADER) == "1" or request.query_params.get("profile") == "1"
+    t0 = time.perf_counter()
+    with metrics.profiling() as prof:
+        response = await call_next(request)
+    elapsed = time.perf_counter() - t0
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    REQUEST_SECONDS.observe(elapsed, method=request.method, route=path)
+    REQUESTS.inc(method=request.method, route=path, status=response.status_code)
+    if want_profile:
+        response.headers["Server-Timing"] = metrics.server_timing({**prof, "total": elapsed})
+    return response
+
+def _serialize(content, headers: Optional[dict] = None) -> JSONResponse:
+    with metrics.timer("serialize"):
+        return JSONResponse(jsonable_encoder(content), headers=headers)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/health")
 def health():
+    """Liveness: the process is up. Does not wait for models (see /ready)."""
     return {"ok": True}
 
+@app.get("/ready")
+def ready():
+    """Readiness: 200 once background model warming has finished, else 503."""
+    report = deps.startup_report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@app.get("/startup")
+def startup_report():
+    """Import and warm-up cost per module/step, and time until ready."""
+    return deps.startup_report()
+
+@app.get("/corpus")
+def corpus():
+    resumes, report = parser.ingest(settings.RESUME_DIR)
+    version = parser.corpus_version(resumes)
+    out = {"version": version, "count": len(resumes), "ingest": report}
+    if settings.DEDUP_ENABLED:
+        reps, clusters = dedup.collapse(resumes, version)
+        out["duplicates"] = {"unique": len(reps), "clusters": clusters}
+    return out
+
+@app.get("/resumes")
+def list_resumes():
+    folder = str(settings.RESUME_DIR)
+    names = sorted(os.path.basename(p) for p in parser._iter_resume_files(folder)) if os.path.isdir(folder) else []
+    return {"count": len(names), "resumes": names}
+
+@app.post("/resumes", status_code=202)
+async def upload_resumes(request: Request):
+    """
+    Upload resumes as multipart/form-data (any number of file parts). Files
+    are streamed to the resume folder in chunks; exact duplicates of a file
+    already there are rejected by content hash. New files are extracted and
+    embedded by a background "index" job (poll GET /jobs/{job_id}), after
+    which scoring picks them up without re-parsing the folder.
+    """
+    try:
+        files = await uploads.receive(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    paths = [os.path.join(str(settings.RESUME_DIR), f["id"]) for f in files if f["status"] == "saved"]
+    job_id = None
+    if paths:
+        try:
+            job_id = jobs.get_manager().submit("index", lambda j: uploads.index(paths, j)).id
+        except jobs.QueueFull:
+            uploads.release(paths)
+            print(f"[main] job queue full; {len(paths)} uploads will be indexed by the next scoring run")
+    counts = {s: sum(1 for f in files if f["status"] == s) for s in ("saved", "duplicate", "rejected")}
+    return {**counts, "job_id": job_id, "files": files}
+
+@app.get("/embeddings/cache")
+def embedding_cache_stats():
+    return embeddings.get_cache(embeddings.model_key(settings.EMBEDDING_MODEL)).stats()
+
+@app.get("/embeddings/dispatcher")
+def embedding_dispatcher_stats():
+    return embeddings.get_dispatcher(settings.EMBEDDING_MODEL).stats()
+
 @app.on_event("startup")
 def _startup():
-    try:
-        from hirelens.api.deps import warm_models
-        warm_models()
-    except Exception as e:
-        print(f"[startup] warm_models failed: {e}")
+    ensure_dirs()
+    if settings.WARM_ON_STARTUP:
+        deps.start_warm()
 
 @app.post("/ingest/score", response_model=List[CandidateScore])
 def ingest_and_score(jd: JobDescription):
-    resumes = parser.load_resumes(settings.RESUME_DIR)
-    weights = {
-        "skills": settings.WEIGHT_SKILLS,
-        "experience": settings.WEIGHT_EXPERIENCE,
-        "education": settings.WEIGHT_EDUCATION,
-        "seniority": settings.WEIGHT_SENIORITY,
-    }
-    out: List[CandidateScore] = []
-    for r in resumes:
-        final, br = scorer.score_candidate(jd.text, r["text"], weights)
-        jd_sk = scorer.extract_skills(jd.text)
-        cv_sk = scorer.extract_skills(r["text"])
-        gaps = shortlist.skills_gap(jd.text, r["text"])
-        reasoning = (
-            f"{r['name']} – semantic fit {final:.1f}. "
-            f"Matched skills: {', '.join(sorted(set(jd_sk) & set(cv_sk))) or '—'}. "
-            f"Gaps: {', '.join(gaps) or '—'}. "
-            f"Breakdown(skills={br['skills']:.1f}, exp={br['experience']:.1f}, "
-            f"edu={br['education']:.1f}, seniority={br['seniority']:.1f})."
-        )
-        out.append(CandidateScore(
-            resume_id=r["id"],
-            name=r["name"],
-            score=round(final, 1),
-            breakdown=ScoreBreakdown(**br),
-            reasoning=reasoning,
+    run, weights = pipeline.feature_run(jd), pipeline.current_weights(jd.id)
+    ranked = pipeline.rank(run, weights)
+    return _serialize(ranked, {RESULT_ID_HEADER: results.save(run, weights, jd.id)})
+
+@app.post("/ingest/score/batch", response_model=List[BatchScoreResult])
+def ingest_and_score_batch(req: BatchScoreRequest):
+    """
+    Score many JDs against the corpus in one pass: the corpus is parsed and
+    embedded once and all similarities come from one JD x resume product.
+    Each JD gets its own ranked list (top_n per JD when given) and result_id.
+    """
+    runs = pipeline.feature_runs(req.jds)
+    out = []
+    for jd, run in zip(req.jds, runs):
+        weights = pipeline.current_weights(jd.id)
+        out.append(BatchScoreResult(
+            jd_id=jd.id,
+            result_id=results.save(run, weights, jd.id),
+            candidates=pipeline.rank(run, weights, req.top_n),
         ))
-    return sorted(out, key=lambda x: x.score, reverse=True)
+    return _serialize(out)
+
+@app.post("/ingest/score/stream")
+def ingest_and_score_stream(
+    jd: JobDescription,
+    top_n: int = 5,
+    batch_size: Optional[int] = None,
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$"),
+):
+    """
+    Streaming variant of /ingest/score. Emits one {"type": "batch"} record per
+    scored batch (its CandidateScores, best first, plus progress counters) and
+    a final {"type": "done"} record carrying the overall top_n.
+    `format=ndjson` (default) writes one JSON object per line; `format=sse`
+    writes Server-Sent Events.
+    """
+    weights = pipeline.current_weights(jd.id)
+    bs = batch_size or settings.STREAM_BATCH_SIZE
+
+    def records():
+        for step in pipeline.iter_feature_run(jd, bs):
+            if "part" in step:
+                yield {
+                    "type": "batch",
+                    "scored": step["scored"],
+                    "total": step["total"],
+                    "items": [c.model_dump() for c in pipeline.rank(step["part"], weights)],
+                }
+            elif "run" in step:
+                yield {
+                    "type": "done",
+                    "total": step["total"],
+                    "result_id": results.save(step["run"], weights, jd.id),
+                    "top": [c.model_dump() for c in pipeline.rank(step["run"], weights, top_n)],
+                }
+
+    if fmt == "sse":
+        body = (f"event: {r['type']}\ndata: {json.dumps(r)}\n\n" for r in records())
+        return StreamingResponse(body, media_type="text/event-stream")
+    return StreamingResponse((json.dumps(r) + "\n" for r in records()), media_type="application/x-ndjson")
+
+@app.post("/search", response_model=SearchResult)
+def search(req: SearchRequest):
+    """
+    Two-stage search for large corpora: approximate nearest-neighbour recall of
+    `recall_k` resumes (default settings.SEARCH_RECALL_K), then full scoring of
+    only those. `debug=true` adds recall-vs-exact diagnostics for tuning
+    recall_k (this runs the exhaustive pipeline too, so it is slow).
+    """
+    weights = pipeline.current_weights(req.jd.id)
+    run, info = pipeline.search(req.jd, req.recall_k, req.debug, req.top_n)
+    return _serialize(SearchResult(
+        result_id=results.save(run, weights, req.jd.id),
+        candidates=pipeline.rank(run, weights, req.top_n),
+        **info,
+    ))
+
+@app.post("/jobs/score", status_code=202)
+def submit_score_job(jd: JobDescription, top_n: Optional[int] = None):
+    """
+    Queue an /ingest/score run in the background; poll GET /jobs/{job_id}.
+    """
+    try:
+        job = jobs.get_manager().submit("score", lambda j: pipeline.score_job(jd, top_n, j))
+    except jobs.QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.get_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job id.")
+    return job
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    if not jobs.get_manager().cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is unknown or already finished.")
+    return jobs.get_manager().get(job_id)
+
+@app.post("/rerank", response_model=List[CandidateScore])
+def rerank(req: RerankRequest, response: Response):
+    """
+    Re-rank the last scoring run for this JD with new weights (e.g. the "new"
+    weights returned by /feedback/update-weights). Pure NumPy over the cached
+    feature matrix: no parsing, embedding or feature extraction.
+    """
+    run = scorer.get_feature_run(pipeline.jd_cache_key(req.jd))
+    if run is None:
+        raise HTTPException(status_code=404, detail="No cached scoring run for this JD; call /ingest/score first.")
+    weights = {**pipeline.current_weights(req.jd.id), **(req.weights or {})}
+    response.headers[RESULT_ID_HEADER] = results.save(run, weights, req.jd.id)
+    return pipeline.rank(run, weights)
 
 @app.post("/shortlist", response_model=List[CandidateScore])
-def shortlist_top(scores: List[CandidateScore], req: ShortlistRequest):
-    return shortlist.shortlist(scores, req.top_n)
+def shortlist_top(payload: ShortlistPayload):
+    """
+    Top-N of a stored scoring run (`result_id`, preferred) or of an uploaded
+    `scores` list.
+    """
+    if payload.result_id:
+        hit = results.get(payload.result_id)
+        if hit is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired result_id; re-run scoring.")
+        run, weights = hit
+        return pipeline.rank(run, weights, payload.top_n)
+    if payload.scores is None:
+        raise HTTPException(status_code=422, detail="Provide result_id or scores.")
+    return shortlist.shortlist(payload.scores, payload.top_n)
+
+def _schedule_kwargs(req: ScheduleRequest) -> dict:
+    return {
+        "interviewer_email": req.interviewer_email,
+        "candidate_email": req.candidate_email,
+        "start_iso": req.window_start_iso,
+        "end_iso": req.window_end_iso,
+        "title": req.title,
+        "description": req.description,
+        "timezone": req.timezone,
+        "request_id": req.request_id,
+    }
 
 @app.post("/schedule")
 def schedule(req: ScheduleRequest):
-    out = scheduler.schedule_meet(
-        interviewer_email=req.interviewer_email,
-        candidate_email=req.candidate_email,
-        start_iso=req.window_start_iso,
-        end_iso=req.window_end_iso,
-        title=req.title,
-        description=req.description,
-        timezone=req.timezone,
+    """
+    Book an interview of `duration_minutes`. When the window is longer than
+    that, the first slot in it where both attendees are free is booked; the
+    idempotency key then comes from the requested window (or `request_id`),
+    not the chosen slot, so a retry after the free/busy data changed returns
+    the same event instead of booking a second one.
+    """
+    kwargs = _schedule_kwargs(req)
+    try:
+        window = scheduler.slots.to_epoch(req.window_end_iso, req.timezone) - scheduler.slots.to_epoch(req.window_start_iso, req.timezone)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="window_start_iso and window_end_iso must be ISO datetimes.")
+    if window > req.duration_minutes * 60:
+        found = scheduler.find_slots(
+            [req.interviewer_email, req.candidate_email], req.window_start_iso, req.window_end_iso,
+            req.duration_minutes, req.timezone, working_hours="", limit=1,
+        )
+        if not found["slots"]:
+            raise HTTPException(status_code=409, detail="No common free slot in the requested window.")
+        kwargs.update(
+            start_iso=found["slots"][0]["start"],
+            end_iso=found["slots"][0]["end"],
+            request_id=req.request_id or scheduler.request_key(
+                req.interviewer_email, req.candidate_email, req.window_start_iso, req.window_end_iso
+            ),
+        )
+    return JSONResponse(scheduler.schedule_meet(**kwargs))
+
+@app.post("/schedule/slots")
+def schedule_slots(req: SlotRequest):
+    """
+    Common free slots of all `calendars` (interviewers and candidates) from
+    one freebusy query per 50 calendars, cached for settings.FREEBUSY_TTL_S.
+    """
+    return scheduler.find_slots(
+        req.calendars, req.window_start_iso, req.window_end_iso, req.duration_minutes, req.timezone,
+        req.step_minutes, req.working_hours, req.weekdays_only, req.limit,
     )
-    return JSONResponse(out)
+
+@app.post("/schedule/assign")
+def schedule_assign(req: AssignRequest):
+    """
+    Spread a shortlist of candidates over the panel's free slots; with
+    `book=true` the interviews are created in one batch.
+    """
+    return scheduler.assign_interviews(
+        req.interviewers, req.candidates, req.window_start_iso, req.window_end_iso, req.duration_minutes,
+        req.timezone, req.mode, req.gap_minutes, req.step_minutes, req.working_hours, req.weekdays_only,
+        req.title, req.description, req.book,
+    )
+
+@app.post("/schedule/batch")
+def schedule_batch(req: ScheduleBatchRequest):
+    """
+    Create many interviews through the Calendar batch API. Returns one result
+    per item (created / exists / failed, with retries already applied);
+    re-submitting the same items does not create duplicates.
+    """
+    out = scheduler.schedule_batch([_schedule_kwargs(it) for it in req.items])
+    counts = {s: sum(1 for r in out if r["status"] == s) for s in ("created", "exists", "failed")}
+    return JSONResponse({**counts, "results": out})
+
+def _record_feedback(batch: FeedbackBatch) -> dict:
+    result_id = batch.result_id or (results.latest(batch.jd_id) if batch.jd_id else None)
+    hit = results.get(result_id) if result_id else None
+    if batch.result_id and hit is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired result_id; re-run scoring.")
+    jd_id = batch.jd_id or (results.jd_id(result_id) if result_id else None)
+    records = online.join([f.model_dump() for f in batch.feedback], hit[0] if hit else None, jd_id, result_id)
+    learned = online.get_learner().record(records)
+    return {"jd_id": jd_id, "result_id": result_id, "logged": len(records), "learned": learned}
+
+@app.post("/feedback")
+def feedback(batch: FeedbackBatch):
+    """
+    Log good_fit / poor_fit labels, joined to each candidate's breakdown in
+    the scoring run (`result_id`, or the latest run for `jd_id`), and update
+    the learned weights. Later scoring of the JD uses them right away.
+    """
+    out = _record_feedback(batch)
+    weights, source = online.get_learner().weights(out["jd_id"])
+    return {**out, "weights": weights, "source": source}
 
 @app.post("/feedback/update-weights")
 def feedback_update(batch: FeedbackBatch):
-    current = {
-        "skills": settings.WEIGHT_SKILLS,
-        "experience": settings.WEIGHT_EXPERIENCE,
-        "education": settings.WEIGHT_EDUCATION,
-        "seniority": settings.WEIGHT_SENIORITY,
-    }
-    fb = [f.model_dump() for f in batch.feedback]
-    new_w = update_weights(fb, current)
-    return JSONResponse({"old": current, "new": new_w})
+    """Same as POST /feedback, reporting the weights before and after."""
+    old = pipeline.current_weights(batch.jd_id)
+    out = _record_feedback(batch)
+    return JSONResponse({**out, "old": old, "new": pipeline.current_weights(out["jd_id"])})
+
+@app.get("/feedback/weights")
+def feedback_weights(jd_id: Optional[str] = None):
+    weights, source = online.get_learner().weights(jd_id)
+    return {"jd_id": jd_id, "weights": weights, "source": source, **online.get_learner().stats()}
+
+@app.post("/feedback/compact")
+def feedback_compact():
+    """Snapshot the learned weights and start a new feedback log segment."""
+    return online.get_learner().compact()
 
 
 @app.get("/")
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict  
 
 
@@ -7,6 +8,33 @@ class Settings(BaseSettings):
 
  
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: str = "torch"          # torch | int8 | onnx
+    EMBEDDING_MODEL_DIR: Optional[Path] = None
+    EMBEDDING_MAX_SEQ_LENGTH: int = 256
+    EMBEDDING_THREADS: int = 0                # 0 = library default
+    EMBEDDING_BATCH_SIZE: int = 256
+    STREAM_BATCH_SIZE: int = 64
+
+    RESULT_STORE_SIZE: int = 32
+    RESULT_TTL_S: int = 3600
+
+    SEARCH_RECALL_K: int = 200
+    ANN_INDEX: str = "auto"
+    ANN_FLAT_MAX: int = 10_000
+    ANN_HNSW_MIN: int = 250_000
+    ANN_NPROBE: int = 16
+    ANN_HNSW_M: int = 32
+    ANN_EF_SEARCH: int = 128
+
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_SIZE: int = 32
+    JOB_RESULT_TTL_S: int = 3600
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200_000
+    EMBEDDING_CACHE_FLOAT16: bool = False
+    EMBEDDING_DISPATCH_ENABLED: bool = True
+    EMBEDDING_DISPATCH_MAX_BATCH: int = 128
+    EMBEDDING_DISPATCH_MAX_WAIT_MS: float = 5.0
 
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent 
     DATA_DIR: Path = BASE_DIR / "data"
@@ -15,10 +43,31 @@ class Settings(BaseSettings):
     JD_DIR: Path = DATA_DIR / "jd"
     OUTPUT_DIR: Path = DATA_DIR / "outputs"
     INDEX_PATH: Path = OUTPUT_DIR / "faiss.index"
+    SKILLS_TAXONOMY_PATH: Path = Path(__file__).resolve().parent / "skills.json"
+
+    PARSE_WORKERS: int = 1
+    PDF_ENGINE: str = "auto"
+    PDF_MAX_PAGES: int = 5
+    PDF_MAX_CHARS: int = 50_000
+    PARSE_TIMEOUT_S: float = 30.0
+    UPLOAD_MAX_BYTES: int = 20 * 1024 * 1024   # per file
+
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.8            # estimated Jaccard of word shingles
+    DEDUP_SHINGLE: int = 5
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_BANDS: int = 16                   # 16 bands x 8 rows: candidates from ~0.7 similarity
 
 
     GOOGLE_OAUTH_CREDS: Path = BASE_DIR / "google_oauth_credentials.json"
     GOOGLE_CALENDAR_ID: str = "primary"
+    GOOGLE_CALENDAR_API_URL: Optional[str] = None    # e.g. http://127.0.0.1:8081/calendar/v3/ for a fake server
+    GOOGLE_HTTP_TIMEOUT_S: float = 30.0
+    SCHEDULE_MAX_ATTEMPTS: int = 3
+    SCHEDULE_RETRY_BACKOFF_S: float = 1.0
+    FREEBUSY_TTL_S: float = 60.0
+    SLOT_STEP_MINUTES: int = 15
+    WORKING_HOURS: Optional[str] = "09:00-18:00"   # local to the request timezone; empty = all day
     DEFAULT_TIMEZONE: str = "Asia/Kolkata"
 
   
@@ -26,11 +75,27 @@ class Settings(BaseSettings):
     WEIGHT_EXPERIENCE: float = 0.35
     WEIGHT_EDUCATION: float = 0.10
     WEIGHT_SENIORITY: float = 0.10
+    NICE_TO_HAVE_BONUS: float = 5.0
+
+    FEEDBACK_LEARNING_RATE: float = 0.1
+    FEEDBACK_L2: float = 0.01               # pull towards the configured weights
+    FEEDBACK_PRIOR_SCALE: float = 4.0
+    FEEDBACK_MIN_LABELS: int = 5            # labels before a JD (or the global model) overrides the defaults
+    FEEDBACK_WEIGHT_FLOOR: float = 0.05
+    FEEDBACK_SNAPSHOT_EVERY: int = 200      # records between weight snapshots; the rest is replayed from the log
+    FEEDBACK_SEGMENT_BYTES: int = 8 * 1024 * 1024
+
+    WARM_ON_STARTUP: bool = True
 
 
 
 settings = Settings()
 
 
-for path in [settings.DATA_DIR, settings.RESUME_DIR, settings.JD_DIR, settings.OUTPUT_DIR]:
-    Path(path).mkdir(parents=True, exist_ok=True)
+def ensure_dirs() -> None:
+    """
+    Create the data directories. Called at app startup rather than on import;
+    everything that writes under OUTPUT_DIR also creates its own folder.
+    """
+    for path in [settings.DATA_DIR, settings.RESUME_DIR, settings.JD_DIR, settings.OUTPUT_DIR]:
+        Path(path).mkdir(parents=True, exist_ok=True)
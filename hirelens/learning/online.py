@@ -0,0 +1,296 @@
+import glob
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from hirelens.configs.settings import settings
+
+try:
+    import fcntl
+except ImportError:              # Windows: the log is then safe within one process only
+    fcntl = None
+
+FEATURES = ("skills", "experience", "education", "seniority")
+LABELS = {"good_fit": 1.0, "poor_fit": 0.0}
+GLOBAL = "*"                     # model trained on every label, whatever the JD
+SNAPSHOT_FILE = "weights.json"
+LOCK_FILE = "feedback.lock"
+
+
+def default_weights() -> Dict[str, float]:
+    return {
+        "skills": settings.WEIGHT_SKILLS,
+        "experience": settings.WEIGHT_EXPERIENCE,
+        "education": settings.WEIGHT_EDUCATION,
+        "seniority": settings.WEIGHT_SENIORITY,
+    }
+
+
+def _prior() -> List[float]:
+    # Start from the configured weights, so a model with few labels ranks like the defaults.
+    w = default_weights()
+    return [settings.FEEDBACK_PRIOR_SCALE * w[k] for k in FEATURES]
+
+
+class OnlineLogit:
+    """
+    Logistic regression P(good_fit | x) over the four breakdown features
+    (each 0..1), trained by SGD one label at a time with an L2 pull towards
+    the prior. The positive part of the coefficients, normalized, is the
+    weight set.
+    """
+
+    def __init__(self, coef: Optional[List[float]] = None, bias: float = 0.0, n: int = 0):
+        self.coef = list(coef) if coef is not None else _prior()
+        self.bias = bias
+        self.n = n
+
+    def predict(self, x: List[float]) -> float:
+        z = self.bias + sum(c * v for c, v in zip(self.coef, x))
+        return 1.0 / (1.0 + math.exp(-max(min(z, 30.0), -30.0)))
+
+    def update(self, x: List[float], y: float) -> None:
+        lr, l2 = settings.FEEDBACK_LEARNING_RATE, settings.FEEDBACK_L2
+        err = y - self.predict(x)
+        prior = _prior()
+        self.coef = [c + lr * (err * v - l2 * (c - p)) for c, v, p in zip(self.coef, x, prior)]
+        self.bias += lr * err
+        self.n += 1
+
+    def weights(self) -> Dict[str, float]:
+        pos = [max(c, 0.0) for c in self.coef]
+        total = sum(pos)
+        if total <= 0:
+            return default_weights()
+        floor = settings.FEEDBACK_WEIGHT_FLOOR
+        w = [max(c / total, floor) for c in pos]
+        total = sum(w)
+        return {k: round(v / total, 4) for k, v in zip(FEATURES, w)}
+
+    def to_dict(self) -> Dict:
+        return {"coef": self.coef, "bias": self.bias, "n": self.n}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "OnlineLogit":
+        return cls(d["coef"], d["bias"], d["n"])
+
+
+class FeedbackLearner:
+    """
+    Feedback labels in an append-only log plus online models per JD.
+
+    The log is a series of JSONL segments (feedback-000001.jsonl, ...) under
+    `root`; weights.json holds the model coefficients and how far into the
+    active segment they are up to date. Startup loads the snapshot and replays
+    only the segment tail after it, never the whole history. Compaction
+    snapshots and rolls to a new segment once the active one exceeds
+    settings.FEEDBACK_SEGMENT_BYTES; old segments stay on disk as history.
+
+    Processes sharing `root` take turns through an flock on feedback.lock:
+    each replays the others' records before appending its own, so every
+    process applies the log in file order and its offset and snapshot always
+    end on a record boundary. Another process's appends are picked up by
+    refresh(), which scoring calls before reading weights.
+    """
+
+    def __init__(self, root: str):
+        self.root = str(root)
+        self.models: Dict[str, OnlineLogit] = {}
+        self.segment = 1
+        self.offset = 0                 # bytes of the active segment applied to self.models
+        self.pending = 0                # records applied since the last snapshot
+        self._snapshot_mtime = None
+        self._lock = threading.Lock()
+        with self._locked():
+            self._load()
+
+    @contextmanager
+    def _locked(self):
+        # Thread lock for this process, flock for the others; closing the file releases it.
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(self._file(LOCK_FILE), "a") as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                yield
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _segment_path(self, segment: Optional[int] = None) -> str:
+        return self._file(f"feedback-{segment or self.segment:06d}.jsonl")
+
+    def _load(self) -> None:
+        self.models, self.segment, self.offset, self.pending = {}, 1, 0, 0
+        try:
+            self._snapshot_mtime = os.stat(self._file(SNAPSHOT_FILE)).st_mtime_ns
+            with open(self._file(SNAPSHOT_FILE), "r", encoding="utf-8") as f:
+                snap = json.load(f)
+            self.models = {k: OnlineLogit.from_dict(v) for k, v in snap["models"].items()}
+            self.segment, self.offset = snap["segment"], snap["offset"]
+        except FileNotFoundError:
+            self._snapshot_mtime = None
+        except Exception as e:
+            print(f"[feedback] ignoring unreadable snapshot in {self.root}: {e}")
+        self._replay()
+
+    def _replay(self) -> int:
+        """Apply log records written after self.offset (by us before a crash, or by another process)."""
+        path = self._segment_path()
+        try:
+            with open(path, "rb") as f:
+                f.seek(self.offset)
+                tail = f.read()
+        except FileNotFoundError:
+            return 0
+        end = tail.rfind(b"\n") + 1           # ignore a partially written last line
+        n = 0
+        for line in tail[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                print(f"[feedback] skipping undecodable record in {path}")
+                continue
+            self._apply(rec)
+            n += 1
+        self.offset += end
+        self.pending += n
+        return n
+
+    def _apply(self, rec: Dict) -> bool:
+        y, x = LABELS.get(rec.get("label")), rec.get("features")
+        if y is None or x is None:
+            return False
+        for key in [GLOBAL] + ([rec["jd_id"]] if rec.get("jd_id") else []):
+            self.models.setdefault(key, OnlineLogit()).update(x, y)
+        return True
+
+    def _snapshot(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        snap = {
+            "segment": self.segment,
+            "offset": self.offset,
+            "updated_at": time.time(),
+            "models": {k: m.to_dict() for k, m in self.models.items()},
+        }
+        tmp = self._file(SNAPSHOT_FILE) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snap, f)
+        os.replace(tmp, self._file(SNAPSHOT_FILE))
+        self._snapshot_mtime = os.stat(self._file(SNAPSHOT_FILE)).st_mtime_ns
+        self.pending = 0
+
+    def _compact(self) -> None:
+        # The snapshot covers the whole active segment, so the new one starts empty.
+        self.segment += 1
+        self.offset = 0
+        self._snapshot()
+
+    def record(self, records: List[Dict]) -> int:
+        """
+        Append labelled records ({"label", "features", "jd_id", ...}) to the
+        log and update the models from them: O(len(records)), independent of
+        the history. Returns how many records were learned from.
+        """
+        with self._locked():
+            self._refresh()
+            data = "".join(json.dumps(r, sort_keys=True) + "\n" for r in records).encode("utf-8")
+            with open(self._segment_path(), "ab") as f:
+                if f.seek(0, os.SEEK_END) != self.offset:
+                    data = b"\n" + data        # terminate a line torn by a crashed writer
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                self.offset = f.tell()
+            learned = sum(self._apply(r) for r in records)
+            self.pending += len(records)
+            if self.offset >= settings.FEEDBACK_SEGMENT_BYTES:
+                self._compact()
+            elif self.pending >= settings.FEEDBACK_SNAPSHOT_EVERY:
+                self._snapshot()
+            return learned
+
+    def _refresh(self) -> None:
+        try:
+            mtime = os.stat(self._file(SNAPSHOT_FILE)).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._snapshot_mtime:
+            self._load()
+        else:
+            self._replay()
+
+    def refresh(self) -> None:
+        """Pick up snapshots and log records written by other processes."""
+        with self._locked():
+            self._refresh()
+
+    def compact(self) -> Dict:
+        """Snapshot now and start a new log segment."""
+        with self._locked():
+            self._refresh()
+            self._compact()
+            return self.stats()
+
+    def weights(self, jd_id: Optional[str] = None) -> Tuple[Dict[str, float], str]:
+        """
+        (weights, source) for a JD: its own model once it has
+        settings.FEEDBACK_MIN_LABELS labels, else the global model, else the
+        configured defaults.
+        """
+        self.refresh()
+        for key in ([jd_id] if jd_id else []) + [GLOBAL]:
+            m = self.models.get(key)
+            if m is not None and m.n >= settings.FEEDBACK_MIN_LABELS:
+                return m.weights(), "jd" if key == jd_id else "global"
+        return default_weights(), "default"
+
+    def stats(self) -> Dict:
+        return {
+            "segment": self.segment,
+            "segments": len(glob.glob(self._file("feedback-*.jsonl"))),
+            "offset": self.offset,
+            "unsnapshotted": self.pending,
+            "labels": {k: m.n for k, m in self.models.items()},
+        }
+
+
+@lru_cache(maxsize=1)
+def get_learner(root: Optional[str] = None) -> FeedbackLearner:
+    """
+    Process-wide learner under settings.OUTPUT_DIR/feedback.
+    """
+    return FeedbackLearner(root or str(settings.OUTPUT_DIR / "feedback"))
+
+
+def join(items: List[Dict], run: Optional[Dict], jd_id: Optional[str], result_id: Optional[str]) -> List[Dict]:
+    """
+    Log records for feedback items, each joined to the candidate's stored
+    breakdown in `run` (the scoring run the recruiter was looking at).
+    Candidates not in the run are logged without features and not learned from.
+    """
+    rows = {rid: i for i, rid in enumerate(run["ids"])} if run is not None else {}
+    now = time.time()
+    out = []
+    for it in items:
+        i = rows.get(it["resume_id"])
+        feats = run["features"][i] if i is not None else None
+        out.append({
+            "ts": now,
+            "jd_id": jd_id,
+            "result_id": result_id,
+            "resume_id": it["resume_id"],
+            "label": (it.get("label") or "").strip().lower(),
+            "notes": it.get("notes"),
+            # features columns 1..4 are the weighted breakdown (see scorer.FEATURES)
+            "features": [round(float(v), 6) for v in feats[1:5]] if feats is not None else None,
+            "similarity": round(float(feats[0]), 6) if feats is not None else None,
+        })
+    return out
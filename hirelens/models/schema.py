@@ -1,6 +1,4 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 class ResumeItem(BaseModel):
@@ -24,6 +22,7 @@ class ScoreBreakdown(BaseModel):
     experience: float
     education: float
     seniority: float
+    nice_to_have: float = 0.0
 
 
 class CandidateScore(BaseModel):
@@ -32,13 +31,53 @@ class CandidateScore(BaseModel):
     score: float  
     breakdown: ScoreBreakdown
     reasoning: str
+    duplicates: List[str] = Field(default_factory=list)   # near-duplicate resumes scored as this one
+
+
+class BatchScoreRequest(BaseModel):
+    jds: List[JobDescription]
+    top_n: Optional[int] = None
+
+
+class BatchScoreResult(BaseModel):
+    jd_id: str
+    result_id: str
+    candidates: List[CandidateScore]
+
+
+class RerankRequest(BaseModel):
+    jd: JobDescription
+    weights: Optional[Dict[str, float]] = None
+
+
+class SearchRequest(BaseModel):
+    jd: JobDescription
+    recall_k: Optional[int] = Field(default=None, ge=1)
+    top_n: Optional[int] = 10
+    debug: bool = False
+
+
+class SearchResult(BaseModel):
+    result_id: str
+    index: str
+    corpus: int
+    recall_k: int
+    recalled: int
+    eligible: int
+    candidates: List[CandidateScore]
+    diagnostics: Optional[Dict[str, float]] = None
 
 
 class ShortlistRequest(BaseModel):
     top_n: int = 5
 
 class ShortlistPayload(BaseModel):
-    scores: List[CandidateScore]
+    """
+    Either `result_id` (returned by the scoring endpoints) or the full
+    `scores` list; the id avoids shipping every CandidateScore back.
+    """
+    result_id: Optional[str] = None
+    scores: Optional[List[CandidateScore]] = None
     top_n: int = 5
 class ScheduleRequest(BaseModel):
     interviewer_email: str
@@ -49,6 +88,40 @@ class ScheduleRequest(BaseModel):
     title: str
     description: Optional[str] = None
     timezone: str = "Asia/Kolkata"
+    request_id: Optional[str] = None
+
+
+class ScheduleBatchRequest(BaseModel):
+    items: List[ScheduleRequest]
+
+
+class SlotRequest(BaseModel):
+    calendars: List[str]
+    window_start_iso: str
+    window_end_iso: str
+    duration_minutes: int = Field(default=30, ge=1)
+    step_minutes: Optional[int] = None
+    working_hours: Optional[str] = None     # e.g. "09:00-18:00"; defaults to settings.WORKING_HOURS
+    weekdays_only: bool = True
+    timezone: str = "Asia/Kolkata"
+    limit: int = 20
+
+
+class AssignRequest(BaseModel):
+    interviewers: List[str]
+    candidates: List[str]
+    window_start_iso: str
+    window_end_iso: str
+    duration_minutes: int = Field(default=30, ge=1)
+    gap_minutes: int = 0
+    mode: str = Field(default="panel", pattern="^(panel|any)$")
+    step_minutes: Optional[int] = None
+    working_hours: Optional[str] = None
+    weekdays_only: bool = True
+    timezone: str = "Asia/Kolkata"
+    title: str = "Interview"
+    description: Optional[str] = None
+    book: bool = False
 
 
 class FeedbackItem(BaseModel):
@@ -59,3 +132,6 @@ class FeedbackItem(BaseModel):
 
 class FeedbackBatch(BaseModel):
     feedback: List[FeedbackItem]
+    # The scoring run the labels refer to; defaults to the latest one for jd_id.
+    result_id: Optional[str] = None
+    jd_id: Optional[str] = None
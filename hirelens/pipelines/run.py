@@ -0,0 +1,336 @@
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from hirelens.configs.settings import settings
+from hirelens.learning import online
+from hirelens.models.schema import CandidateScore, JobDescription, ScoreBreakdown
+from hirelens.services import ann, dedup, featurestore, invindex, parser, reasoner, scorer, shortlist, vectorstore
+from hirelens.services.skills import get_matcher
+
+
+def current_weights(jd_id: Optional[str] = None) -> Dict[str, float]:
+    """
+    Weights to score `jd_id` with: learned from recruiter feedback for that
+    JD (or across JDs) once there is enough of it, else settings.WEIGHT_*.
+    Read from the learner on every call, so new feedback applies without a
+    restart; cached feature runs don't depend on the weights.
+    """
+    return online.get_learner().weights(jd_id)[0]
+
+
+# A "run" is everything needed to rank one JD against one corpus snapshot:
+#   features  (N, 6) float32 scorer.FEATURES matrix
+#   ids/names resume ids and display names, row-aligned with features
+#   duplicates ids of the near-duplicate resumes each row stands for
+#   cv_bits   (N, n_bytes) packed skill bitsets; jd_skills the JD's skill set
+# Matched skills and gaps are decoded from the bitsets only for the rows that
+# are actually returned.
+ROW_KEYS = ("ids", "names", "duplicates")
+
+
+def _make_run(features: np.ndarray, resumes: List[Dict], cv_bits: np.ndarray, jd_skills) -> Dict:
+    return {
+        "features": features,
+        "ids": [r["id"] for r in resumes],
+        "names": [r["name"] for r in resumes],
+        "duplicates": [r.get("duplicates", []) for r in resumes],
+        "cv_bits": np.asarray(cv_bits),
+        "jd_skills": jd_skills,
+    }
+
+
+def merge_runs(parts: List[Dict], jd_skills=frozenset()) -> Dict:
+    run = {key: [x for p in parts for x in p[key]] for key in ROW_KEYS}
+    if parts:
+        run["features"] = np.vstack([p["features"] for p in parts])
+        run["cv_bits"] = np.vstack([p["cv_bits"] for p in parts])
+    else:
+        run["features"] = np.zeros((0, len(scorer.FEATURES)), dtype="float32")
+        run["cv_bits"] = np.zeros((0, get_matcher().n_bytes), dtype="uint8")
+    run["jd_skills"] = parts[0]["jd_skills"] if parts else jd_skills
+    return run
+
+
+def slice_run(run: Dict, start: int, stop: int) -> Dict:
+    out = {key: run[key][start:stop] for key in ROW_KEYS}
+    out["features"] = run["features"][start:stop]
+    out["cv_bits"] = run["cv_bits"][start:stop]
+    out["jd_skills"] = run["jd_skills"]
+    return out
+
+
+def load_corpus() -> Tuple[List[Dict], str, invindex.CorpusIndex]:
+    """
+    Load the resume corpus together with its version and inverted index. The
+    JD-independent features come from the columnar feature store, which only
+    featurizes new or changed resumes; the index is built once per version.
+    Near-duplicate resumes are collapsed to one representative first, so
+    only that one is embedded and scored.
+    """
+    return _load_corpus()[:3]
+
+
+def _load_corpus() -> Tuple[List[Dict], str, invindex.CorpusIndex, int]:
+    # load_corpus() plus the number of files parsed, before duplicates are collapsed.
+    resumes = parser.load_resumes(settings.RESUME_DIR)
+    parsed = len(resumes)
+    version = parser.corpus_version(resumes)
+    if settings.DEDUP_ENABLED:
+        resumes = dedup.collapse(resumes, version)[0]
+    profile = featurestore.get_store().sync(resumes)
+    return resumes, version, invindex.get_index(profile, version), parsed
+
+
+def jd_cache_key(jd: JobDescription) -> str:
+    """
+    Everything about a JD that changes its feature run: the text plus the
+    must_have / min_years prefilter and the nice_to_have bonus skills.
+    """
+    return "\0".join([
+        jd.text,
+        "|".join(sorted(jd.must_have)),
+        str(jd.min_years or ""),
+        "|".join(sorted(jd.nice_to_have)),
+    ])
+
+
+def eligible_rows(jd: JobDescription, index: invindex.CorpusIndex) -> np.ndarray:
+    """
+    Rows passing the JD's must_have / min_years prefilter, looked up in the
+    inverted index (every row when the JD has no such constraints).
+    """
+    must, unknown = invindex.canonical_skills(jd.must_have)
+    if unknown:
+        print(f"[pipeline] must_have terms not in the skill taxonomy, not filtered on: {unknown}")
+    if not must and not jd.min_years:
+        return np.arange(index.n)
+    return index.eligible(must, jd.min_years)
+
+
+def _nice(jd: JobDescription):
+    return invindex.canonical_skills(jd.nice_to_have)[0] if jd.nice_to_have else None
+
+
+def _sync_rows(store: vectorstore.VectorStore, resumes: List[Dict], rows: np.ndarray, save: bool = True) -> None:
+    """
+    Drop vectors of resumes that left the corpus and embed only `rows` (the
+    resumes that passed the prefilter), not the whole corpus.
+    """
+    live = {r["path"] for r in resumes}
+    store.remove([p for p in list(store.entries) if p not in live])
+    store.sync([resumes[i] for i in rows], scorer.embed_corpus, prune=False, save=save)
+
+
+def iter_feature_run(jd: JobDescription, batch_size: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Build (or replay from cache) the feature run for one JD batch by batch.
+    Yields {"parsed": files in the corpus} once the corpus is loaded, then
+    {"part": partial run, "scored": n, "total": eligible} per batch and
+    finally {"run": full run, ...}; the full run is added to the feature cache.
+    """
+    bs = batch_size or settings.EMBEDDING_BATCH_SIZE
+    resumes, version, index, parsed = _load_corpus()
+    yield {"parsed": parsed}
+    key = jd_cache_key(jd)
+    cached = scorer.get_feature_run(key, version)
+    if cached is not None:
+        total = len(cached["ids"])
+        for start in range(0, total, bs):
+            yield {"part": slice_run(cached, start, start + bs), "scored": min(start + bs, total), "total": total}
+        yield {"run": cached, "scored": total, "total": total}
+        return
+
+    rows = eligible_rows(jd, index)
+    store = vectorstore.get_store()
+    store.remove([p for p in list(store.entries) if p not in {r["path"] for r in resumes}])
+    jd_vec = scorer.embed_jd(jd.text)
+    jd_sk = scorer.skill_set(jd.text)
+    nice = _nice(jd)
+    parts = []
+    for start in range(0, len(rows), bs):
+        batch_rows = rows[start:start + bs]
+        batch = [resumes[i] for i in batch_rows]
+        profile = scorer.take_profile(index.profile, batch_rows)
+        store.sync(batch, scorer.embed_corpus, prune=False, save=False)
+        sims = store.vectors([r["path"] for r in batch]) @ jd_vec
+        features = scorer.build_features(jd.text, [], sims, nice_skills=nice, profile=profile)
+        parts.append(_make_run(features, batch, profile["bits"], jd_sk))
+        yield {"part": parts[-1], "scored": start + len(batch), "total": len(rows)}
+    if store.dirty:
+        store.save()                              # once per stream, not per batch
+    run = scorer.cache_feature_run(key, version, merge_runs(parts, jd_sk))
+    yield {"run": run, "scored": len(rows), "total": len(rows)}
+
+
+def feature_run(jd: JobDescription) -> Dict:
+    """
+    Embed/featurize the eligible corpus for this JD, or reuse the cached
+    feature matrix if neither the JD nor the corpus changed since the last call.
+    """
+    resumes, version, index = load_corpus()
+    key = jd_cache_key(jd)
+    run = scorer.get_feature_run(key, version)
+    if run is not None:
+        return run
+    store = vectorstore.get_store()
+    rows = eligible_rows(jd, index)
+    _sync_rows(store, resumes, rows)
+    eligible = [resumes[i] for i in rows]
+    profile = scorer.take_profile(index.profile, rows)
+    # One index search scores everyone; a prefiltered subset only needs its own vectors.
+    if len(eligible) == len(resumes):
+        sims = store.similarities(scorer.embed_jd(jd.text), [r["path"] for r in eligible])
+    else:
+        sims = store.vectors([r["path"] for r in eligible]) @ scorer.embed_jd(jd.text)
+    features = scorer.build_features(jd.text, [], sims, nice_skills=_nice(jd), profile=profile)
+    return scorer.cache_feature_run(key, version, _make_run(features, eligible, profile["bits"], scorer.skill_set(jd.text)))
+
+
+def feature_runs(jds: List[JobDescription]) -> List[Dict]:
+    """
+    One run per JD against the same corpus. The corpus is loaded and
+    profiled once, and only resumes eligible for at least one JD (must_have /
+    min_years) are embedded. All JDs are embedded in one batch and every
+    JD x resume similarity comes from a single (M x d) @ (d x U) product over
+    that union; each JD then keeps its own eligible columns. Runs already in
+    the feature cache are reused as-is.
+    """
+    resumes, version, index = load_corpus()
+    keys = [jd_cache_key(jd) for jd in jds]
+    runs: List[Optional[Dict]] = [scorer.get_feature_run(k, version) for k in keys]
+    todo = [i for i, r in enumerate(runs) if r is None]
+    if not todo:
+        return runs
+    store = vectorstore.get_store()
+    pending = [jds[i] for i in todo]
+    texts = [jd.text for jd in pending]
+    eligible = [eligible_rows(jd, index) for jd in pending]
+    union = np.unique(np.concatenate(eligible)) if eligible else np.zeros(0, dtype="int64")
+    _sync_rows(store, resumes, union)
+    corpus = store.vectors([resumes[i]["path"] for i in union])
+    sims = scorer.embed_jds(texts) @ corpus.T if len(union) else np.zeros((len(pending), 0), dtype="float32")
+    nice = [_nice(jd) or frozenset() for jd in pending]
+    profile = scorer.take_profile(index.profile, union)
+    tensor = scorer.build_feature_tensor(texts, sims, profile, nice)
+    bits = np.asarray(profile["bits"])
+    for i, jd, rows, features in zip(todo, pending, eligible, tensor):
+        cols = np.searchsorted(union, rows)
+        run = _make_run(features[cols], [resumes[r] for r in rows], bits[cols], scorer.skill_set(jd.text))
+        runs[i] = scorer.cache_feature_run(keys[i], version, run)
+    return runs
+
+
+def search(jd: JobDescription, recall_k: Optional[int] = None, debug: bool = False, top_n: Optional[int] = 10) -> Tuple[Dict, Dict]:
+    """
+    Two-stage retrieval for large corpora. Stage one takes the top `recall_k`
+    resumes by embedding similarity from an approximate index (flat / IVF /
+    HNSW, picked from corpus size by ann.choose_kind); stage two builds the
+    full feature matrix for those candidates only. A JD with must_have /
+    min_years is prefiltered first: only its eligible resumes are embedded
+    and they are recalled by exact similarity (index "exact"), since the
+    corpus-wide ANN index would need every resume embedded.
+
+    Returns (run, info). With `debug`, info also carries recall of the ANN
+    stage against exact top-`recall_k` similarity and overlap of the final
+    top_n with an exhaustive re-rank of the whole eligible corpus.
+    """
+    r = recall_k or settings.SEARCH_RECALL_K
+    resumes, version, index = load_corpus()
+    store = vectorstore.get_store()
+    cand_rows = eligible_rows(jd, index)
+    _sync_rows(store, resumes, cand_rows)
+    paths = [resumes[i]["path"] for i in cand_rows]
+    jd_vec = scorer.embed_jd(jd.text)
+
+    t0 = time.perf_counter()
+    if len(cand_rows) == len(resumes):
+        ann_index = ann.get_index(lambda: store.vectors(paths), version)
+        kind = ann_index.kind
+        rows, sims = ann_index.search(jd_vec, r)
+    else:
+        kind = "exact"
+        exact = store.vectors(paths) @ jd_vec if paths else np.zeros(0, dtype="float32")
+        top = shortlist.top_indices(exact, r)
+        rows, sims = cand_rows[top], exact[top]
+    ann_s = time.perf_counter() - t0
+    ann_rows = rows
+    profile = scorer.take_profile(index.profile, rows)
+    features = scorer.build_features(jd.text, [], sims, nice_skills=_nice(jd), profile=profile)
+    run = _make_run(features, [resumes[i] for i in rows], profile["bits"], scorer.skill_set(jd.text))
+    info = {"index": kind, "corpus": len(resumes), "recall_k": r, "recalled": len(ann_rows), "eligible": len(cand_rows)}
+    if debug:
+        info["diagnostics"] = _search_diagnostics(jd, run, store, paths, cand_rows, jd_vec, ann_rows, r, top_n, ann_s)
+    return run, info
+
+
+def _search_diagnostics(jd, run, store, paths, cand_rows, jd_vec, ann_rows, r, top_n, ann_s) -> Dict:
+    """
+    Exact references for search(): brute-force similarity top-r, and the
+    top-N of a full feature run, compared against the two-stage results.
+    """
+    t0 = time.perf_counter()
+    exact = store.vectors(paths) @ jd_vec if paths else np.zeros(0, dtype="float32")
+    exact_top = set(cand_rows[shortlist.top_indices(exact, r)].tolist())
+    exact_s = time.perf_counter() - t0
+    ann_recall = len(set(ann_rows.tolist()) & exact_top) / len(exact_top) if exact_top else 1.0
+
+    weights = current_weights(jd.id)
+    full = feature_run(jd)
+    n = min(top_n or len(full["ids"]), len(full["ids"]))
+    want = {c.resume_id for c in rank(full, weights, n)}
+    got = {c.resume_id for c in rank(run, weights, n)}
+    return {
+        "ann_recall": round(ann_recall, 4),
+        "top_n": n,
+        "top_n_recall": round(len(want & got) / n, 4) if n else 1.0,
+        "ann_ms": round(ann_s * 1000, 2),
+        "exact_ms": round(exact_s * 1000, 2),
+    }
+
+
+def rank(run: Dict, weights: Dict[str, float], top_n: Optional[int] = None) -> List[CandidateScore]:
+    """
+    Score a run with `weights` and return CandidateScores, best first
+    (only the best `top_n` when given).
+    """
+    final, br = scorer.score_features(run["features"], weights)
+    keys = scorer.FEATURES[scorer.BREAKDOWN_COLUMNS]
+    order = shortlist.top_indices(final, top_n)
+    out: List[CandidateScore] = []
+    jd_sk = run["jd_skills"]
+    matcher = get_matcher()
+    for i in order:
+        breakdown = dict(zip(keys, map(float, br[i])))
+        cv_sk = matcher.unpack(run["cv_bits"][i])
+        out.append(CandidateScore(
+            resume_id=run["ids"][i],
+            name=run["names"][i],
+            duplicates=run["duplicates"][i],
+            score=round(float(final[i]), 1),
+            breakdown=ScoreBreakdown(**breakdown),
+            reasoning=reasoner.explain(
+                run["names"][i], float(final[i]), sorted(jd_sk & cv_sk), sorted(jd_sk - cv_sk), breakdown
+            ),
+        ))
+    return out
+
+
+def score_job(jd: JobDescription, top_n: Optional[int], job) -> List[Dict]:
+    """
+    Body of a /jobs/score job: same result as /ingest/score, but reporting
+    parsed/embedded/scored counts on `job.progress` and honouring cancellation
+    between batches.
+    """
+    run = None
+    for step in iter_feature_run(jd):
+        if "parsed" in step:
+            job.progress.update(parsed=step["parsed"])
+        elif "run" in step:
+            run = step["run"]
+        else:
+            job.progress.update(embedded=step["scored"], scored=step["scored"], total=step["total"])
+        job.check_cancelled()
+    job.progress.update(total=len(run["ids"]), embedded=len(run["ids"]), scored=len(run["ids"]))
+    return [c.model_dump() for c in rank(run, current_weights(jd.id), top_n)]
@@ -0,0 +1,125 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from hirelens.configs.settings import settings
+
+KINDS = ("flat", "ivf", "hnsw")
+
+
+def choose_kind(n: int, kind: Optional[str] = None) -> str:
+    """
+    Index type for a corpus of `n` vectors: exact flat search for small
+    corpora, IVF in the middle, HNSW for very large ones. settings.ANN_INDEX
+    (or `kind`) other than "auto" forces a type.
+    """
+    kind = (kind or settings.ANN_INDEX).lower()
+    if kind != "auto":
+        if kind not in KINDS:
+            raise ValueError(f"Unknown ANN index type {kind!r}; expected auto or one of {KINDS}")
+        return kind
+    if n < settings.ANN_FLAT_MAX:
+        return "flat"
+    if n < settings.ANN_HNSW_MIN:
+        return "ivf"
+    return "hnsw"
+
+
+class AnnIndex:
+    """
+    Recall index over one corpus snapshot. FAISS ids are corpus row numbers,
+    so search() returns rows that line up with the resume list and the
+    feature store profile.
+    """
+
+    def __init__(self, vectors: np.ndarray, kind: Optional[str] = None):
+        vecs = np.ascontiguousarray(vectors, dtype="float32")
+        self.n, self.dim = vecs.shape if vecs.ndim == 2 else (0, 0)
+        self.kind = choose_kind(self.n, kind)
+        t0 = time.perf_counter()
+        self.index = self._build(vecs) if self.n else None
+        self.build_s = time.perf_counter() - t0
+        print(f"[ann] built {self.kind} index over {self.n} vectors in {self.build_s:.2f}s")
+
+    def _build(self, vecs: np.ndarray):
+        import faiss
+
+        if self.kind == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dim, settings.ANN_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = max(settings.ANN_EF_SEARCH, 2 * settings.ANN_HNSW_M)
+            index.add(vecs)
+            return index
+        if self.kind == "ivf":
+            nlist = max(1, min(int(math.sqrt(self.n)), self.n // 39))
+            quantizer = faiss.IndexFlatIP(self.dim)
+            index = faiss.IndexIVFFlat(quantizer, self.dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            rng = np.random.default_rng(0)
+            train = vecs if self.n <= 256 * nlist else vecs[rng.choice(self.n, 256 * nlist, replace=False)]
+            index.train(train)
+            index.add(vecs)
+            index.nprobe = min(settings.ANN_NPROBE, nlist)
+            return index
+        index = faiss.IndexFlatIP(self.dim)
+        index.add(vecs)
+        return index
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k corpus rows for a normalized query, best first, as
+        (rows int64, inner products float32).
+        """
+        k = min(int(k), self.n)
+        if self.index is None or k <= 0:
+            return np.zeros(0, dtype="int64"), np.zeros(0, dtype="float32")
+        if self.kind == "hnsw":
+            self.index.hnsw.efSearch = max(settings.ANN_EF_SEARCH, k)
+        q = np.ascontiguousarray(query, dtype="float32").reshape(1, -1)
+        scores, rows = self.index.search(q, k)
+        keep = rows[0] != -1
+        return rows[0][keep].astype("int64"), scores[0][keep]
+
+
+_indexes: "OrderedDict[str, AnnIndex]" = OrderedDict()
+_building: Dict[str, threading.Lock] = {}      # key -> guard held while that index is built
+_lock = threading.Lock()
+_INDEX_CACHE_SIZE = 2
+
+
+def _cached(key: str) -> Optional[AnnIndex]:
+    with _lock:
+        idx = _indexes.get(key)
+        if idx is not None:
+            _indexes.move_to_end(key)
+        return idx
+
+
+def get_index(vectors_fn, corpus_version: str, kind: Optional[str] = None) -> AnnIndex:
+    """
+    AnnIndex for this corpus version. `vectors_fn()` returns the (N, d) corpus
+    matrix in row order and is only called when the index has to be built.
+
+    The build runs outside the module lock, so a request for a cached index
+    never waits on one being built; concurrent requests for the same
+    version share one build through a per-key guard.
+    """
+    key = f"{corpus_version}:{kind or settings.ANN_INDEX}"
+    idx = _cached(key)
+    if idx is not None:
+        return idx
+    with _lock:
+        guard = _building.setdefault(key, threading.Lock())
+    with guard:
+        idx = _cached(key)
+        if idx is not None:
+            return idx
+        idx = AnnIndex(vectors_fn(), kind)
+        with _lock:
+            _indexes[key] = idx
+            while len(_indexes) > _INDEX_CACHE_SIZE:
+                _indexes.popitem(last=False)
+            _building.pop(key, None)
+    return idx
@@ -0,0 +1,156 @@
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from hirelens.configs.settings import settings
+from hirelens.services import metrics
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+DUPLICATES = metrics.counter("hirelens_duplicate_resumes_total", "Resumes collapsed into a near-duplicate cluster.")
+
+# (content sha, num_perm, shingle size) -> MinHash signature (None for empty texts).
+# Signatures are independent of the rest of the corpus, so each resume is
+# only ever hashed once per process.
+_signatures: Dict[Tuple[str, int, int], Optional[np.ndarray]] = {}
+_lock = threading.Lock()
+_last: Dict = {}                 # the latest collapse(): {"key", "result"}
+
+
+def shingles(text: str, k: Optional[int] = None) -> np.ndarray:
+    """
+    Hashes (uint64) of the distinct k-word shingles of the lower-cased,
+    punctuation-free text; a text shorter than k words is one shingle.
+    """
+    k = k or settings.DEDUP_SHINGLE
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens:
+        return np.zeros(0, dtype="uint64")
+    grams = {" ".join(tokens[i:i + k]) for i in range(max(len(tokens) - k + 1, 1))}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype="uint64", count=len(grams))
+
+
+def _perms(num_perm: int) -> Tuple[np.ndarray, np.ndarray]:
+    # a, b < 2**32 and hashes < 2**32, so a * h + b fits in uint64 before the mod.
+    rng = np.random.default_rng(1)
+    a = rng.integers(1, 1 << 32, num_perm, dtype="uint64")
+    b = rng.integers(0, 1 << 32, num_perm, dtype="uint64")
+    return a, b
+
+
+def minhash(hashes: np.ndarray, num_perm: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    (num_perm,) uint32 MinHash signature of a shingle set: the minimum of
+    num_perm universal hashes (a * x + b) mod (2^61 - 1). Two signatures agree
+    at a position with probability equal to the sets' Jaccard similarity.
+    """
+    if not len(hashes):
+        return None
+    a, b = _perms(num_perm or settings.DEDUP_NUM_PERM)
+    return (((a[:, None] * hashes[None, :] + b[:, None]) % _PRIME) & _MAX_HASH).min(axis=1).astype("uint32")
+
+
+def signature(item: Dict) -> Optional[np.ndarray]:
+    key = (item["sha"], settings.DEDUP_NUM_PERM, settings.DEDUP_SHINGLE)
+    with _lock:
+        if key in _signatures:
+            return _signatures[key]
+    sig = minhash(shingles(item["text"]))
+    with _lock:
+        _signatures[key] = sig
+    return sig
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def clusters(sigs: List[Optional[np.ndarray]], threshold: Optional[float] = None, bands: Optional[int] = None) -> List[List[int]]:
+    """
+    Groups (of 2+ row indices) of near-duplicate signatures.
+
+    LSH banding: each signature is cut into `bands` bands and rows sharing any
+    band land in the same bucket. Within a bucket every row is compared with
+    the bucket's first row only, and joined (union-find) if their estimated
+    Jaccard similarity is at least `threshold`. That is O(n * bands) work,
+    not O(n^2) pairs, even when a bucket is large.
+    """
+    threshold = settings.DEDUP_THRESHOLD if threshold is None else threshold
+    bands = bands or settings.DEDUP_BANDS
+    rows = [i for i, s in enumerate(sigs) if s is not None]
+    if len(rows) < 2:
+        return []
+    mat = np.stack([sigs[i] for i in rows])
+    width = mat.shape[1] // bands
+    parent = list(range(len(rows)))
+    for band in range(bands):
+        chunk = np.ascontiguousarray(mat[:, band * width:(band + 1) * width])
+        keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * width))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = np.nonzero(counts[inverse] > 1)[0]
+        if not len(shared):
+            continue
+        order = shared[np.argsort(inverse[shared], kind="stable")]
+        anchor = None
+        for j in order:
+            if anchor is None or inverse[j] != inverse[anchor]:
+                anchor = j
+                continue
+            if _find(parent, j) != _find(parent, anchor) and np.mean(mat[j] == mat[anchor]) >= threshold:
+                parent[_find(parent, j)] = _find(parent, anchor)
+    groups: Dict[int, List[int]] = {}
+    for j in range(len(rows)):
+        groups.setdefault(_find(parent, j), []).append(rows[j])
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def collapse(items: List[Dict], version: Optional[str] = None) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Keep one representative per near-duplicate cluster (the most recently
+    modified file), in the original order. Representatives get a
+    "duplicates" list with the ids of the resumes folded into them.
+    Returns (representatives, clusters as {"representative", "members"});
+    the result for the latest corpus `version` is reused.
+    """
+    key = (version, settings.DEDUP_THRESHOLD, settings.DEDUP_BANDS, settings.DEDUP_NUM_PERM, settings.DEDUP_SHINGLE)
+    if version is not None and _last.get("key") == key:
+        return _last["result"]
+    with metrics.timer("dedup"):
+        groups = clusters([signature(it) for it in items])
+    with _lock:
+        live = {it["sha"] for it in items}
+        for sig_key in [k for k in _signatures if k[0] not in live]:
+            del _signatures[sig_key]
+    drop, report = set(), []
+    rep_of: Dict[int, List[str]] = {}
+    for g in groups:
+        rep = max(g, key=lambda i: (_mtime(items[i]["path"]), items[i]["path"]))
+        others = [i for i in g if i != rep]
+        drop.update(others)
+        rep_of[rep] = [items[i]["id"] for i in others]
+        report.append({"representative": items[rep]["id"], "members": [items[i]["id"] for i in sorted(g)]})
+    if drop:
+        DUPLICATES.inc(len(drop))
+    out = []
+    for i, it in enumerate(items):
+        if i not in drop:
+            out.append({**it, "duplicates": rep_of[i]} if i in rep_of else it)
+    if version is not None:
+        _last.update(key=key, result=(out, report))
+    return out, report
@@ -0,0 +1,184 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from hirelens.configs.settings import settings
+
+# torch: full-precision SentenceTransformer (the reference)
+# int8:  same model with Linear layers dynamically quantized to int8
+# onnx:  ONNX Runtime session over the exported transformer, pooled in NumPy
+BACKENDS = ("torch", "int8", "onnx")
+
+
+def model_source(model_name: str) -> str:
+    """
+    Where to load `model_name` from: settings.EMBEDDING_MODEL_DIR when set
+    (a local SentenceTransformer directory, so nodes can run offline),
+    otherwise the hub name / local cache.
+    """
+    return str(settings.EMBEDDING_MODEL_DIR) if settings.EMBEDDING_MODEL_DIR else model_name
+
+
+def model_key(model_name: str, backend: Optional[str] = None) -> str:
+    """
+    Identity of the vectors a backend produces, used to key the embedding
+    cache and the vector index: backends are close but not bit-identical.
+    """
+    backend = backend or settings.EMBEDDING_BACKEND
+    return model_name if backend == "torch" else f"{model_name}#{backend}"
+
+
+def _set_threads(threads: int) -> None:
+    if threads > 0:
+        import torch
+        torch.set_num_threads(threads)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return (x / np.maximum(norms, 1e-12)).astype("float32")
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, source: str, max_seq_length: int = 0, threads: int = 0):
+        from sentence_transformers import SentenceTransformer
+
+        _set_threads(threads)
+        self.model = SentenceTransformer(source, device="cpu")
+        if max_seq_length:
+            self.model.max_seq_length = max_seq_length
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        emb = self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(emb, dtype="float32")
+
+
+class Int8Backend(TorchBackend):
+    name = "int8"
+
+    def __init__(self, source: str, max_seq_length: int = 0, threads: int = 0):
+        import torch
+
+        super().__init__(source, max_seq_length, threads)
+        self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _pooling_mode(st_model) -> str:
+    for module in st_model:
+        cfg = getattr(module, "get_config_dict", lambda: {})()
+        if "pooling_mode_cls_token" in cfg:
+            return "cls" if cfg["pooling_mode_cls_token"] else "mean"
+    return "mean"
+
+
+def export_onnx(source: str, out_dir: str) -> str:
+    """
+    Export the transformer of a SentenceTransformer model to `out_dir`
+    (model.onnx, tokenizer files and pooling.json). Needs torch; the ONNX
+    backend itself only needs onnxruntime and the tokenizer.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(source, device="cpu")
+    auto_model, tokenizer = st[0].auto_model, st.tokenizer
+    os.makedirs(out_dir, exist_ok=True)
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dynamic = {n: {0: "batch", 1: "seq"} for n in names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "seq"}
+
+    class _Wrapped(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *args):
+            return self.model(**dict(zip(names, args))).last_hidden_state
+
+    path = os.path.join(out_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            _Wrapped(auto_model.eval()), tuple(sample[n] for n in names), path,
+            input_names=names, output_names=["last_hidden_state"], dynamic_axes=dynamic,
+            opset_version=14, dynamo=False,
+        )
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, "pooling.json"), "w", encoding="utf-8") as f:
+        json.dump({"mode": _pooling_mode(st), "max_seq_length": st.max_seq_length}, f)
+    print(f"[embeddings] exported ONNX model to {path}")
+    return path
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, source: str, max_seq_length: int = 0, threads: int = 0):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        onnx_dir = self._resolve(source)
+        with open(os.path.join(onnx_dir, "pooling.json"), "r", encoding="utf-8") as f:
+            pooling = json.load(f)
+        self.mode = pooling.get("mode", "mean")
+        self.max_seq_length = max_seq_length or pooling.get("max_seq_length") or 256
+        opts = ort.SessionOptions()
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(onnx_dir, "model.onnx"), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        self.inputs = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+
+    @staticmethod
+    def _resolve(source: str) -> str:
+        """
+        Use a model directory's own onnx/ export when it ships one; otherwise
+        export once into OUTPUT_DIR/onnx/<model> and reuse it afterwards.
+        """
+        for cand in (Path(source) / "onnx", Path(source)):
+            if (cand / "model.onnx").exists() and (cand / "pooling.json").exists():
+                return str(cand)
+        out = settings.OUTPUT_DIR / "onnx" / re.sub(r"[^A-Za-z0-9_.-]+", "_", source.strip("/"))
+        if not (out / "model.onnx").exists():
+            export_onnx(source, str(out))
+        return str(out)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        # Length-sorted batches keep padding (and wasted compute) small.
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        out = np.zeros((len(texts), 0), dtype="float32")
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            enc = self.tokenizer(
+                [texts[i] for i in idx], padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np",
+            )
+            hidden = self.session.run(None, {n: enc[n].astype("int64") for n in self.inputs})[0]
+            if self.mode == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = enc["attention_mask"][..., None].astype("float32")
+                pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            if not out.shape[1]:
+                out = np.zeros((len(texts), pooled.shape[1]), dtype="float32")
+            out[idx] = pooled
+        return _normalize(out)
+
+
+def load_backend(backend: str, source: str, max_seq_length: int = 0, threads: int = 0):
+    """
+    Instantiate an embedding backend; all of them expose
+    encode(texts, batch_size) -> L2-normalized float32 (N, d).
+    """
+    classes = {"torch": TorchBackend, "int8": Int8Backend, "onnx": OnnxBackend}
+    if backend not in classes:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of {BACKENDS}")
+    return classes[backend](source, max_seq_length, threads)
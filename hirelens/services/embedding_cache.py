@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from hirelens.services import metrics
+
+CACHE_HITS = metrics.counter("hirelens_embedding_cache_hits_total", "Texts served from the embedding cache.")
+CACHE_MISSES = metrics.counter("hirelens_embedding_cache_misses_total", "Texts that had to be encoded.")
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache for one model.
+
+    Vectors are stored row by row in a raw memory-mapped buffer
+    (`<model>.<dtype>.bin`) that grows by appending; `<model>.<dtype>.idx.json`
+    maps sha1(text) -> row and keeps LRU order. Once `max_entries` rows exist,
+    the least recently used entry is evicted and its row reused, so the file
+    never exceeds max_entries * dim * itemsize bytes.
+
+    New entries are appended to a journal (`.idx.log`, one "key row" line
+    each) rather than rewriting the index; the index is rewritten, and the
+    journal emptied, only once the journal outgrows it. Recency of hits is
+    not journaled, so LRU order after a restart is approximate.
+    """
+
+    GROW_ROWS = 1024
+
+    def __init__(self, cache_dir: str, model_name: str, max_entries: int = 200_000, float16: bool = False):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.dtype = np.dtype("float16" if float16 else "float32")
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        base = os.path.join(str(cache_dir), f"{slug}.{self.dtype.name}")
+        self.data_path = f"{base}.bin"
+        self.index_path = f"{base}.idx.json"
+        self.journal_path = f"{base}.idx.log"
+        self._journaled = 0                # lines in the journal since the last index write
+        self._torn = False                 # journal ends in a partial line (crash mid-append)
+        self.max_entries = max_entries
+        self.dim: Optional[int] = None
+        self.rows = 0                      # rows written so far (append pointer)
+        self.lru: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._mm: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        os.makedirs(str(cache_dir), exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        if not (os.path.exists(self.index_path) and os.path.exists(self.data_path)):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.dim, self.rows = meta["dim"], meta["rows"]
+            self.lru = OrderedDict((k, int(r)) for k, r in meta["entries"])
+            self._replay()
+            self._map(os.path.getsize(self.data_path) // (self.dim * self.dtype.itemsize))
+        except Exception as e:
+            print(f"[embedding_cache] ignoring unreadable cache {self.index_path}: {e}")
+            self.dim, self.rows, self.lru, self._mm = None, 0, OrderedDict(), None
+
+    def _replay(self) -> None:
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except FileNotFoundError:
+            return
+        self._torn = bool(lines[-1])
+        by_row = {r: k for k, r in self.lru.items()}
+        for line in lines:
+            parts = line.split(" ")
+            if len(parts) != 2 or not parts[1].isdigit():
+                continue                    # empty or torn last line
+            k, row = parts[0], int(parts[1])
+            old = by_row.get(row)
+            if old is not None and old != k:
+                self.lru.pop(old, None)     # the row was reused: its previous entry was evicted
+            self.lru.pop(k, None)
+            self.lru[k] = row
+            by_row[row] = k
+            self.rows = max(self.rows, row + 1)
+            self._journaled += 1
+
+    def _map(self, capacity: int) -> None:
+        self._mm = None
+        if capacity:
+            self._mm = np.memmap(self.data_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+
+    def _capacity(self) -> int:
+        return 0 if self._mm is None else self._mm.shape[0]
+
+    def _grow(self, needed_rows: int) -> None:
+        if needed_rows <= self._capacity():
+            return
+        capacity = min(max(needed_rows, self._capacity() * 2, self.GROW_ROWS), self.max_entries)
+        if self._mm is not None:
+            self._mm.flush()
+        with open(self.data_path, "ab") as f:
+            f.truncate(capacity * self.dim * self.dtype.itemsize)
+        self._map(capacity)
+
+    def _save(self) -> None:
+        if self._mm is not None:
+            self._mm.flush()
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "rows": self.rows, "entries": list(self.lru.items())}, f)
+        os.replace(tmp, self.index_path)
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self._journaled, self._torn = 0, False
+
+    def _append(self, added: List) -> None:
+        """Persist new (key, row) entries: a journal append, or a full index write when due."""
+        if not os.path.exists(self.index_path) or self._journaled + len(added) > max(len(self.lru), self.GROW_ROWS):
+            self._save()
+            return
+        self._mm.flush()                    # vectors reach disk before the entries pointing at them
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(("\n" if self._torn else "") + "".join(f"{k} {row}\n" for k, row in added))
+        self._torn = False
+        self._journaled += len(added)
+
+    def _slot(self) -> int:
+        if self.rows < self.max_entries:
+            self._grow(self.rows + 1)
+            self.rows += 1
+            return self.rows - 1
+        _, row = self.lru.popitem(last=False)
+        self.evictions += 1
+        return row
+
+    def embed(self, texts: List[str], encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Return float32 embeddings for `texts`, calling `encode` only for the
+        distinct texts that are not cached yet.
+        """
+        keys = [text_key(t) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for k in keys:
+                if k in self.lru and k not in found:
+                    self.lru.move_to_end(k)
+                    found[k] = np.array(self._mm[self.lru[k]], dtype="float32")
+            hits = sum(1 for k in keys if k in found)
+            self.hits += hits
+        CACHE_HITS.inc(hits)
+
+        missing: Dict[str, str] = {}
+        for k, t in zip(keys, texts):
+            if k not in found:
+                missing.setdefault(k, t)
+        if missing:
+            vecs = np.asarray(encode(list(missing.values())), dtype="float32")
+            CACHE_MISSES.inc(len(keys) - hits)
+            with self._lock:
+                self.misses += len(keys) - hits
+                if self.dim is None:
+                    self.dim = int(vecs.shape[1])
+                added = []
+                for k, v in zip(missing, vecs):
+                    found[k] = v
+                    if k in self.lru:
+                        continue
+                    row = self._slot()
+                    self._mm[row] = v
+                    self.lru[k] = row
+                    added.append((k, row))
+                if added:
+                    self._append(added)
+
+        if not keys:
+            return np.zeros((0, self.dim or 0), dtype="float32")
+        return np.vstack([found[k] for k in keys]).astype("float32", copy=False)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.lru),
+            "max_entries": self.max_entries,
+            "dtype": self.dtype.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
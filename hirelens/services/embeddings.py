@@ -1,27 +1,189 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from functools import lru_cache
-from typing import List
+from typing import Callable, Dict, List, Optional
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+from hirelens.configs.settings import settings
+from hirelens.services import metrics
+from hirelens.services.embedding_backends import load_backend, model_key, model_source
+from hirelens.services.embedding_cache import EmbeddingCache
 
 
 @lru_cache(maxsize=1)
-def get_model(model_name: str) -> SentenceTransformer:
+def get_model(model_name: str):
+    """
+    Lazily load and cache the embedding backend (settings.EMBEDDING_BACKEND)
+    for `model_name`. Using LRU cache ensures we only load once per process.
+    """
+    return load_backend(
+        settings.EMBEDDING_BACKEND,
+        model_source(model_name),
+        max_seq_length=settings.EMBEDDING_MAX_SEQ_LENGTH,
+        threads=settings.EMBEDDING_THREADS,
+    )
+
+
+@lru_cache(maxsize=4)
+def get_cache(model_name: str) -> EmbeddingCache:
     """
-    Lazily load and cache the SentenceTransformer model.
-    Using LRU cache ensures we only load once per process.
+    One on-disk embedding cache per model, opened once per process.
     """
-    return SentenceTransformer(model_name)
+    return EmbeddingCache(
+        settings.OUTPUT_DIR / "embedding_cache",
+        model_name,
+        max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        float16=settings.EMBEDDING_CACHE_FLOAT16,
+    )
+
 
+BATCH_SIZE = metrics.histogram("hirelens_embedding_batch_size", "Texts per model forward call.", metrics.SIZE_BUCKETS)
+QUEUE_WAIT = metrics.histogram("hirelens_embedding_queue_wait_seconds", "Time encode requests wait in the dispatcher queue.")
 
-def embed_texts(texts: List[str], model_name: str) -> np.ndarray:
+
+class EmbeddingDispatcher:
+    """
+    Cross-request micro-batching in front of one model instance.
+
+    Callers enqueue their texts and block on a Future; a single worker thread
+    takes the first waiting request, keeps collecting until `max_batch` texts
+    are queued or `max_wait_s` has passed since that request arrived, runs one
+    encode over the concatenation and hands each caller back its own rows.
+    `encode(texts, batch_size)` gets the smallest batch_size any of the
+    coalesced callers asked for (max_batch if none did).
+    """
+
+    def __init__(self, encode: Callable[[List[str], int], np.ndarray], max_batch: int, max_wait_s: float, name: str = "embed"):
+        self.encode = encode
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait_s = max(0.0, float(max_wait_s))
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._batches = 0
+        self._requests = 0
+        self._texts = 0
+        self._max_batch_seen = 0
+        self._recent_sizes: deque = deque(maxlen=1024)
+        self._recent_waits: deque = deque(maxlen=1024)
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-dispatcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, texts: List[str], batch_size: Optional[int] = None) -> Future:
+        fut: Future = Future()
+        if not texts:
+            fut.set_result(np.zeros((0, 0), dtype="float32"))
+            return fut
+        self._ensure_worker()
+        self._queue.put((list(texts), fut, time.perf_counter(), batch_size))
+        return fut
+
+    def embed(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Encode `texts`, sharing a forward pass with concurrent callers.
+        """
+        return self.submit(texts, batch_size).result()
+
+    def _collect(self) -> List:
+        first = self._queue.get()
+        pending, size = [first], len(first[0])
+        deadline = first[2] + self.max_wait_s
+        while size < self.max_batch:
+            left = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=left) if left > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            pending = self._collect()
+            started = time.perf_counter()
+            texts = [t for item in pending for t in item[0]]
+            batch_size = min((item[3] for item in pending if item[3]), default=self.max_batch)
+            try:
+                emb = np.asarray(self.encode(texts, batch_size), dtype="float32")
+            except Exception as e:
+                for _, fut, _, _ in pending:
+                    fut.set_exception(e)
+                continue
+            with self._lock:
+                self._batches += 1
+                self._requests += len(pending)
+                self._texts += len(texts)
+                self._max_batch_seen = max(self._max_batch_seen, len(texts))
+                self._recent_sizes.append(len(texts))
+                self._recent_waits.extend(started - item[2] for item in pending)
+            for item in pending:
+                QUEUE_WAIT.observe(started - item[2])
+            start = 0
+            for item_texts, fut, _, _ in pending:
+                fut.set_result(emb[start:start + len(item_texts)])
+                start += len(item_texts)
+
+    def stats(self) -> Dict:
+        """
+        Batch-size and queue-wait metrics (waits over the last 1024 requests).
+        """
+        with self._lock:
+            waits = np.asarray(self._recent_waits, dtype="float64") * 1000
+            sizes = np.asarray(self._recent_sizes, dtype="float64")
+            return {
+                "batches": self._batches,
+                "requests": self._requests,
+                "texts": self._texts,
+                "queued": self._queue.qsize(),
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait_s * 1000,
+                "batch_size_mean": round(float(sizes.mean()), 2) if sizes.size else 0.0,
+                "batch_size_max": self._max_batch_seen,
+                "requests_per_batch": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "queue_wait_ms_mean": round(float(waits.mean()), 3) if waits.size else 0.0,
+                "queue_wait_ms_p95": round(float(np.percentile(waits, 95)), 3) if waits.size else 0.0,
+            }
+
+
+@lru_cache(maxsize=4)
+def get_dispatcher(model_name: str) -> EmbeddingDispatcher:
+    """
+    One dispatcher (and worker thread) per model, shared by all requests.
+    """
+    return EmbeddingDispatcher(
+        lambda texts, batch_size: _model_encode(texts, model_name, batch_size),
+        max_batch=settings.EMBEDDING_DISPATCH_MAX_BATCH,
+        max_wait_s=settings.EMBEDDING_DISPATCH_MAX_WAIT_MS / 1000.0,
+        name=model_name.rsplit("/", 1)[-1],
+    )
+
+
+def _encode(texts: List[str], model_name: str, batch_size: int) -> np.ndarray:
+    if settings.EMBEDDING_DISPATCH_ENABLED:
+        return get_dispatcher(model_name).embed(texts, batch_size)
+    return _model_encode(texts, model_name, batch_size)
+
+
+def _model_encode(texts: List[str], model_name: str, batch_size: int) -> np.ndarray:
+    BATCH_SIZE.observe(len(texts))
+    return get_model(model_name).encode(texts, batch_size=batch_size)
+
+
+def embed_texts(texts: List[str], model_name: str, batch_size: int = 32) -> np.ndarray:
     """
     Encode a list of strings into normalized embeddings (float32).
     Normalization lets us use dot product as cosine similarity.
+    When the embedding cache is enabled only unseen texts reach the model.
     """
-    model = get_model(model_name)
-    emb = model.encode(
-        texts,
-        normalize_embeddings=True,
-        show_progress_bar=False
-    )
-    return np.asarray(emb, dtype="float32")
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return _encode(texts, model_name, batch_size)
+    return get_cache(model_key(model_name)).embed(texts, lambda miss: _encode(miss, model_name, batch_size))
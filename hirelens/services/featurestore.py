@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from hirelens.configs.settings import settings
+from hirelens.services import scorer
+from hirelens.services.skills import get_matcher
+
+# column name -> (file name, dtype); "bits" is (N, n_bytes), the rest are (N,)
+COLUMNS = {
+    "bits": ("skills.u8", "uint8"),
+    "years": ("years.f32", "float32"),
+    "degree": ("degree.u8", "uint8"),
+    "sha": ("sha.S40", "S40"),
+    "offsets": ("id_offsets.i64", "int64"),
+}
+PATHS_FILE = "ids.bin"
+META_FILE = "meta.json"
+
+
+def _taxonomy_hash() -> str:
+    return hashlib.sha1("\n".join(get_matcher().skills).encode("utf-8")).hexdigest()
+
+
+class FeatureStore:
+    """
+    Columnar store of the JD-independent resume features, one raw file per
+    column under `root`, opened with numpy.memmap:
+
+      skills.u8        (N, n_bytes) skill bitset over the taxonomy
+      years.f32        (N,) estimated years of experience
+      degree.u8        (N,) education keyword flag
+      sha.S40          (N,) content hash the row was computed from
+      ids.bin          resume paths, utf-8, concatenated
+      id_offsets.i64   (N + 1,) byte offsets into ids.bin
+
+    Rows follow the order of the corpus passed to sync(). Only resumes whose
+    content hash changed are re-featurized; other rows are copied over.
+    A taxonomy change invalidates the whole store.
+    """
+
+    def __init__(self, root: str):
+        self.root = str(root)
+        self.columns: Dict[str, np.ndarray] = {}
+        self.paths: List[str] = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _load(self) -> None:
+        try:
+            with open(self._file(META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("taxonomy") != _taxonomy_hash():
+                return
+            n, width = meta["n"], meta["n_bytes"]
+            cols = {}
+            for col, (fn, dtype) in COLUMNS.items():
+                shape = (n + 1,) if col == "offsets" else ((n, width) if col == "bits" else (n,))
+                cols[col] = np.memmap(self._file(fn), dtype=dtype, mode="r", shape=shape) if n else np.zeros(shape, dtype=dtype)
+            with open(self._file(PATHS_FILE), "rb") as f:
+                blob = f.read()
+            offs = cols["offsets"]
+            self.paths = [blob[offs[i]:offs[i + 1]].decode("utf-8") for i in range(n)]
+            self.columns = cols
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[featurestore] ignoring unreadable store {self.root}: {e}")
+            self.columns, self.paths = {}, []
+
+    def _write(self, cols: Dict[str, np.ndarray], paths: List[str]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        blob = [p.encode("utf-8") for p in paths]
+        cols["offsets"] = np.concatenate([[0], np.cumsum([len(b) for b in blob])]).astype("int64")
+        for col, (fn, dtype) in COLUMNS.items():
+            np.ascontiguousarray(cols[col], dtype=dtype).tofile(self._file(fn) + ".tmp")
+        with open(self._file(PATHS_FILE) + ".tmp", "wb") as f:
+            f.write(b"".join(blob))
+        for fn in [fn for fn, _ in COLUMNS.values()] + [PATHS_FILE]:
+            os.replace(self._file(fn) + ".tmp", self._file(fn))
+        meta = {"n": len(paths), "n_bytes": get_matcher().n_bytes, "taxonomy": _taxonomy_hash()}
+        with open(self._file(META_FILE) + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(self._file(META_FILE) + ".tmp", self._file(META_FILE))
+
+    def sync(self, resumes: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Make the store match `resumes` (items from parser.load_resumes) and
+        return the profile columns ("bits", "years", "degree") row-aligned with
+        them. Unchanged rows are served straight from the memory-mapped files.
+        """
+        with self._lock:
+            paths = [r["path"] for r in resumes]
+            shas = np.asarray([r["sha"] for r in resumes], dtype="S40")
+            if paths == self.paths and np.array_equal(shas, self.columns.get("sha", np.zeros(0, "S40"))):
+                return self.profile()
+
+            old_row = {p: i for i, p in enumerate(self.paths)}
+            old_sha = self.columns.get("sha")
+            keep_new, keep_old, todo = [], [], []
+            for i, (p, sha) in enumerate(zip(paths, shas)):
+                j = old_row.get(p)
+                if j is not None and old_sha[j] == sha:
+                    keep_new.append(i)
+                    keep_old.append(j)
+                else:
+                    todo.append(i)
+
+            n = len(resumes)
+            cols = {
+                "bits": np.zeros((n, get_matcher().n_bytes), dtype="uint8"),
+                "years": np.zeros(n, dtype="float32"),
+                "degree": np.zeros(n, dtype="uint8"),
+                "sha": shas,
+            }
+            if keep_new:
+                for col in ("bits", "years", "degree"):
+                    cols[col][keep_new] = self.columns[col][keep_old]
+            if todo:
+                fresh = scorer.resume_profile([resumes[i]["text"] for i in todo])
+                for col in ("bits", "years", "degree"):
+                    cols[col][todo] = fresh[col]
+            self.columns, self.paths = {}, []      # drop the old maps before replacing files
+            self._write(cols, paths)
+            self._load()
+            return self.profile()
+
+    def profile(self) -> Dict[str, np.ndarray]:
+        n = len(self.paths)
+        if not n:
+            return {
+                "bits": np.zeros((0, get_matcher().n_bytes), dtype="uint8"),
+                "years": np.zeros(0, dtype="float32"),
+                "degree": np.zeros(0, dtype="uint8"),
+            }
+        return {col: self.columns[col] for col in ("bits", "years", "degree")}
+
+
+@lru_cache(maxsize=1)
+def get_store(root: Optional[str] = None) -> FeatureStore:
+    """
+    Process-wide feature store under settings.OUTPUT_DIR/features.
+    """
+    return FeatureStore(root or str(settings.OUTPUT_DIR / "features"))
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from hirelens.services.skills import get_matcher
+
+
+class CorpusIndex:
+    """
+    Inverted index over one corpus snapshot, built once per corpus version
+    from its feature-store profile (skill bitsets + years column):
+      - postings: canonical skill -> sorted int32 array of resume rows
+      - years_order: ascending argsort of the years column, so
+        "at least k years" is one binary search
+    """
+
+    def __init__(self, profile: Dict[str, np.ndarray]):
+        matcher = get_matcher()
+        self.profile = profile
+        self.n = len(profile["years"])
+        flags = np.unpackbits(np.asarray(profile["bits"]), axis=1, count=len(matcher.skills), bitorder="little")
+        rows, cols = np.nonzero(flags)
+        order = np.argsort(cols, kind="stable")
+        rows, cols = rows[order].astype("int32"), cols[order]
+        bounds = np.searchsorted(cols, np.arange(len(matcher.skills) + 1))
+        self.postings = {
+            skill: rows[bounds[j]:bounds[j + 1]]
+            for j, skill in enumerate(matcher.skills) if bounds[j + 1] > bounds[j]
+        }
+        self.years = np.asarray(profile["years"], dtype="float32")
+        self.years_order = np.argsort(self.years, kind="stable").astype("int32")
+        self._sorted_years = self.years[self.years_order]
+
+    def with_skills(self, skills: Iterable[str]) -> np.ndarray:
+        """
+        Rows having every skill, by intersecting posting lists shortest first.
+        """
+        lists = sorted((self.postings.get(s, np.zeros(0, dtype="int32")) for s in skills), key=len)
+        if not lists:
+            return np.arange(self.n, dtype="int32")
+        out = lists[0]
+        for p in lists[1:]:
+            if not len(out):
+                break
+            out = np.intersect1d(out, p, assume_unique=True)
+        return out
+
+    def with_min_years(self, min_years: float) -> np.ndarray:
+        start = int(np.searchsorted(self._sorted_years, min_years, side="left"))
+        return np.sort(self.years_order[start:])
+
+    def eligible(self, must_have: Iterable[str] = (), min_years: Optional[float] = None) -> np.ndarray:
+        """
+        Sorted rows that have all `must_have` skills (canonical names) and at
+        least `min_years` of experience.
+        """
+        rows = self.with_skills(must_have)
+        if min_years:
+            rows = np.intersect1d(rows, self.with_min_years(float(min_years)), assume_unique=True)
+        return rows
+
+
+def canonical_skills(terms: Iterable[str]) -> Tuple[FrozenSet[str], List[str]]:
+    """
+    Map free-form skill terms (e.g. JobDescription.must_have) to canonical
+    taxonomy skills. Terms the taxonomy does not know are returned separately,
+    since they cannot be looked up in the index.
+    """
+    matcher = get_matcher()
+    known, unknown = set(), []
+    for term in terms:
+        hit = matcher.match(term)
+        if hit:
+            known |= hit
+        elif term.strip():
+            unknown.append(term)
+    return frozenset(known), unknown
+
+
+_INDEX_CACHE_SIZE = 2
+_indexes: "OrderedDict[str, CorpusIndex]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_index(profile: Dict[str, np.ndarray], corpus_version: str) -> CorpusIndex:
+    """
+    CorpusIndex for this corpus version, built on first use and then reused
+    until the corpus changes.
+    """
+    with _lock:
+        idx = _indexes.get(corpus_version)
+        if idx is not None:
+            _indexes.move_to_end(corpus_version)
+            return idx
+    idx = CorpusIndex(profile)
+    with _lock:
+        _indexes[corpus_version] = idx
+        while len(_indexes) > _INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return idx
@@ -0,0 +1,181 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from hirelens.configs.settings import settings
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    """
+    One background unit of work. The job function receives the Job and should
+    update `progress` as it goes and call `check_cancelled()` between steps.
+    """
+
+    def __init__(self, kind: str, fn: Callable[["Job"], Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.fn = fn
+        self.status = QUEUED
+        self.progress: Dict[str, int] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def to_dict(self, with_result: bool = True) -> Dict:
+        out = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if with_result and self.status == SUCCEEDED:
+            out["result"] = self.result
+        return out
+
+
+class JobManager:
+    """
+    In-process worker pool fed by a bounded queue. Finished jobs are written
+    to `results_dir/<job_id>.json` so their results survive in-memory eviction
+    (and restarts); both copies are dropped after `ttl_s` seconds.
+    """
+
+    def __init__(self, workers: int, max_queue: int, ttl_s: float, results_dir: str):
+        self.ttl_s = ttl_s
+        self.results_dir = str(results_dir)
+        self._jobs: Dict[str, Job] = {}
+        self._queue: "queue.Queue[Job]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        os.makedirs(self.results_dir, exist_ok=True)
+        self._threads = [
+            threading.Thread(target=self._work, name=f"hirelens-job-{i}", daemon=True)
+            for i in range(max(workers, 1))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, kind: str, fn: Callable[[Job], Any]) -> Job:
+        self.evict_expired()
+        job = Job(kind, fn)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise QueueFull(f"job queue is full ({self._queue.maxsize} pending)")
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        path = self._path(job_id)
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) <= self.ttl_s:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return None
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation. Queued jobs never start; running jobs stop at
+        their next check_cancelled(). Returns False for unknown/finished jobs.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return False
+            job.cancel()
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED)
+        return True
+
+    def evict_expired(self) -> None:
+        cutoff = time.time() - self.ttl_s
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+                del self._jobs[job_id]
+        for fn in os.listdir(self.results_dir):
+            path = os.path.join(self.results_dir, fn)
+            try:
+                if fn.endswith(".json") and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.results_dir, f"{os.path.basename(job_id)}.json")
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status, job.error, job.finished_at = status, error, time.time()
+        tmp = f"{self._path(job.id)}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(job.to_dict(), f)
+            os.replace(tmp, self._path(job.id))
+        except Exception as e:
+            print(f"[jobs] could not persist job {job.id}: {e}")
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job.cancelled:
+                    continue
+                job.status = RUNNING
+                job.result = job.fn(job)
+                self._finish(job, SUCCEEDED)
+            except JobCancelled:
+                self._finish(job, CANCELLED)
+            except Exception as e:
+                print(f"[jobs] job {job.id} failed: {e}")
+                self._finish(job, FAILED, f"{type(e).__name__}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+@lru_cache(maxsize=1)
+def get_manager() -> JobManager:
+    """
+    Process-wide job manager; worker threads start on first use.
+    """
+    return JobManager(
+        workers=settings.JOB_WORKERS,
+        max_queue=settings.JOB_QUEUE_SIZE,
+        ttl_s=settings.JOB_RESULT_TTL_S,
+        results_dir=str(settings.OUTPUT_DIR / "jobs"),
+    )
@@ -0,0 +1,157 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Seconds; wide enough for both sub-millisecond stages and multi-second ingests.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _fmt_num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str):
+        self.name, self.doc = name, doc
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        k = _key(labels)
+        with self._lock:
+            self._values[k] = self._values.get(k, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for k, v in items:
+            yield f"{self.name}{_fmt_labels(k)} {_fmt_num(v)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.doc = name, doc
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, List[float]] = {}    # bucket counts..., +Inf count, sum
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        k = _key(labels)
+        with self._lock:
+            row = self._values.setdefault(k, [0.0] * (len(self.buckets) + 2))
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    row[i] += 1
+            row[-2] += 1
+            row[-1] += value
+
+    def count(self, **labels) -> float:
+        row = self._values.get(_key(labels))
+        return row[-2] if row else 0.0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for k, row in items:
+            for b, n in zip(self.buckets, row):
+                yield f"{self.name}_bucket{_fmt_labels(k, ('le', _fmt_num(b)))} {_fmt_num(n)}"
+            yield f"{self.name}_bucket{_fmt_labels(k, ('le', '+Inf'))} {_fmt_num(row[-2])}"
+            yield f"{self.name}_count{_fmt_labels(k)} {_fmt_num(row[-2])}"
+            yield f"{self.name}_sum{_fmt_labels(k)} {_fmt_num(row[-1])}"
+
+
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def counter(name: str, doc: str = "") -> Counter:
+    with _registry_lock:
+        return _registry.setdefault(name, Counter(name, doc))
+
+
+def histogram(name: str, doc: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    with _registry_lock:
+        return _registry.setdefault(name, Histogram(name, doc, buckets))
+
+
+def render() -> str:
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4).
+    """
+    lines = []
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+    for m in metrics:
+        if m.doc:
+            lines.append(f"# HELP {m.name} {m.doc}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        lines.extend(m.samples())
+    return "\n".join(lines) + "\n"
+
+
+# Per-request stage profile: {stage: seconds}, active only inside profiling().
+_profile: contextvars.ContextVar = contextvars.ContextVar("hirelens_profile", default=None)
+
+STAGE_SECONDS = histogram("hirelens_stage_seconds", "Time spent in each pipeline stage.")
+
+
+@contextmanager
+def profiling() -> Iterator[Dict[str, float]]:
+    """
+    Collect stage timings for the current request (thread pool workers
+    inherit the context, so timers in sync endpoints report here too).
+    """
+    prof: Dict[str, float] = {}
+    token = _profile.set(prof)
+    try:
+        yield prof
+    finally:
+        _profile.reset(token)
+
+
+@contextmanager
+def timer(stage: str) -> Iterator[None]:
+    """
+    Time a block into hirelens_stage_seconds{stage=...} and, when profiling,
+    into the current request's breakdown.
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.observe(dt, stage=stage)
+        prof = _profile.get()
+        if prof is not None:
+            prof[stage] = prof.get(stage, 0.0) + dt
+
+
+def server_timing(prof: Dict[str, float]) -> str:
+    """
+    Format a profile as a Server-Timing header value (milliseconds).
+    """
+    return ", ".join(f"{stage};dur={secs * 1000:.2f}" for stage, secs in prof.items())
@@ -1,35 +1,83 @@
-import os, re
-from typing import List, Dict, Iterable
-from pypdf import PdfReader
+import os, re, json, hashlib, signal, threading, time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Iterable, Iterator, Optional, Set, Tuple
 import docx2txt
 
+from hirelens.configs.settings import settings
+from hirelens.services import metrics
+
 ALLOWED_EXTS = (".pdf", ".docx", ".doc", ".txt")
+PARSE_CACHE_FILE = "parse_cache.json"
 
-def _read_pdf(path: str) -> str:
-    try:
-        reader = PdfReader(path)
-        chunks = []
-        for page in reader.pages:
-            txt = page.extract_text() or ""
-            chunks.append(txt)
-        return "\n".join(chunks)
-    except Exception:
-        return ""  
+FILES_PARSED = metrics.counter("hirelens_files_parsed_total", "Resume files extracted (cache misses).")
+FILES_CACHED = metrics.counter("hirelens_files_cached_total", "Resume files served from the parse cache.")
+PARSE_FAILURES = metrics.counter("hirelens_parse_failures_total", "Resume files that failed to extract, by reason.")
+
+class ExtractionTimeout(Exception):
+    pass
+
+PDF_ENGINES = ("pymupdf", "pypdf")
+
+def _pages_pymupdf(path: str) -> Iterator[str]:
+    import fitz  # PyMuPDF
+    with fitz.open(path) as doc:
+        for page in doc:
+            yield page.get_text("text") or ""
+
+def _pages_pypdf(path: str) -> Iterator[str]:
+    from pypdf import PdfReader
+    for page in PdfReader(path).pages:
+        yield page.extract_text() or ""
+
+def resolve_pdf_engine(engine: Optional[str] = None) -> str:
+    """
+    Map a PDF_ENGINE setting ("auto" | "pymupdf" | "pypdf") to an installed engine.
+    "auto" prefers PyMuPDF, which is several times faster than pypdf on large files.
+    """
+    engine = (engine or settings.PDF_ENGINE).lower()
+    if engine == "auto":
+        try:
+            import fitz  # noqa: F401
+            return "pymupdf"
+        except ImportError:
+            return "pypdf"
+    if engine not in PDF_ENGINES:
+        raise ValueError(f"unknown PDF engine {engine!r}, expected one of auto/{'/'.join(PDF_ENGINES)}")
+    return engine
+
+def _read_pdf(path: str, engine: Optional[str] = None, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    """
+    Stream page text from the selected engine, stopping after `max_pages`
+    pages or `max_chars` characters (0 = unlimited for either).
+    """
+    max_pages = settings.PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = settings.PDF_MAX_CHARS if max_chars is None else max_chars
+    pages = _pages_pymupdf(path) if resolve_pdf_engine(engine) == "pymupdf" else _pages_pypdf(path)
+    chunks: List[str] = []
+    n_chars = 0
+    for i, txt in enumerate(pages):
+        if max_pages and i >= max_pages:
+            break
+        chunks.append(txt)
+        n_chars += len(txt) + 1
+        if max_chars and n_chars >= max_chars:
+            break
+    pages.close()
+    text = "\n".join(chunks)
+    return text[:max_chars] if max_chars else text
 
 def _read_docx(path: str) -> str:
-    try:
-        return docx2txt.process(path) or ""
-    except Exception:
-        return ""
+    return docx2txt.process(path) or ""
 
 def _read_txt(path: str) -> str:
-    try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
-    except Exception:
-        return ""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
 
-def read_file(path: str) -> str:
+def extract_text(path: str) -> str:
+    """
+    Like read_file, but lets extraction errors propagate so callers can report them.
+    """
     ext = os.path.splitext(path)[1].lower()
     if ext == ".pdf":
         return _read_pdf(path)
@@ -37,6 +85,14 @@ def read_file(path: str) -> str:
         return _read_docx(path)
     return _read_txt(path)
 
+def read_file(path: str) -> str:
+    try:
+        return extract_text(path)
+    except Exception as e:
+        PARSE_FAILURES.inc(reason="error")
+        print(f"[parser] failed to read {path}: {type(e).__name__}: {e}")
+        return ""
+
 def _clean(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
 
@@ -46,10 +102,318 @@ def _iter_resume_files(folder: str) -> Iterable[str]:
             if fn.lower().endswith(ALLOWED_EXTS):
                 yield os.path.join(root, fn)
 
-def load_resumes(folder: str) -> List[Dict]:
-    items: List[Dict] = []
-    for path in _iter_resume_files(folder):
-        text = _clean(read_file(path))
-        name = os.path.splitext(os.path.basename(path))[0]
-        items.append({"id": os.path.basename(path), "name": name, "path": path, "text": text})
-    return items
+def _on_alarm(signum, frame):
+    raise ExtractionTimeout()
+
+def _extract_one(path: str, timeout: Optional[float]) -> Dict:
+    """
+    Extract and clean one file, enforcing `timeout` with SIGALRM where that is
+    possible (POSIX, main thread of the process - which pool workers are).
+    Never raises: failures are reported in the returned stats dict.
+    """
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    t0 = time.perf_counter()
+    text, error = "", None
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        text = _clean(extract_text(path))
+    except ExtractionTimeout:
+        error = f"timeout after {timeout}s"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return {"path": path, "text": text, "error": error, "seconds": time.perf_counter() - t0}
+
+# One extraction pool per process, grown on demand and replaced if a worker hangs.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool, _pool_size = ProcessPoolExecutor(max_workers=workers), workers
+        return _pool
+
+
+def _reset_pool(pool: ProcessPoolExecutor) -> None:
+    """Kill a pool with a hung or dead worker; the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    for proc in list((getattr(pool, "_processes", None) or {}).values()):
+        proc.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_many(paths: List[str], workers: Optional[int] = None, timeout: Optional[float] = None) -> List[Dict]:
+    """
+    Extract `paths` and return one stats dict per path, in input order:
+    {"path", "text", "error", "seconds"}. With a `timeout`, or workers > 1,
+    files go to a shared ProcessPoolExecutor (pypdf is CPU-bound, so threads
+    would not help): SIGALRM only works on a process's main thread, which the
+    API's request threads are not, so even a single file is extracted in a
+    worker when it has a time budget. The batch as a whole is abandoned if it
+    overruns what that budget allows, and the pool with the hung worker is
+    killed, so one bad PDF cannot stall a request.
+    """
+    workers = settings.PARSE_WORKERS if workers is None else workers
+    timeout = settings.PARSE_TIMEOUT_S if timeout is None else timeout
+    if not paths:
+        return []
+    if not timeout and (workers <= 1 or len(paths) <= 1):
+        return [_extract_one(p, timeout) for p in paths]
+
+    n_workers = max(min(workers, len(paths)), 1)
+    pool = _get_pool(n_workers)
+    deadline = None
+    if timeout:
+        rounds = -(-len(paths) // n_workers)
+        deadline = time.monotonic() + rounds * timeout * 2 + 5.0
+    futures = [pool.submit(_extract_one, p, timeout) for p in paths]
+    out: List[Dict] = []
+    broken = False
+    for path, fut in zip(paths, futures):
+        try:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            out.append(fut.result(timeout=remaining))
+        except FutureTimeout:
+            broken = True
+            out.append({"path": path, "text": "", "error": f"timeout after {timeout}s", "seconds": timeout})
+        except Exception as e:
+            broken = broken or isinstance(e, BrokenProcessPool)
+            out.append({"path": path, "text": "", "error": f"{type(e).__name__}: {e}", "seconds": 0.0})
+    if broken:
+        _reset_pool(pool)
+    return out
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class _ParseCache:
+    """
+    On-disk cache of cleaned resume text, keyed by absolute path and validated
+    by (size, mtime). The content hash is only recomputed when the stat changes,
+    so a touched-but-identical file is not re-extracted either.
+    The JSON file is kept in memory between calls and re-read only if another
+    process rewrote it. A content hash -> paths index is kept in step with
+    the entries, so duplicate lookups do not scan the cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self._by_sha: Dict[str, Set[str]] = {}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _set(self, path: str, entry: Dict) -> None:
+        self._drop(path)
+        self.entries[path] = entry
+        self._by_sha.setdefault(entry["sha"], set()).add(path)
+
+    def _drop(self, path: str) -> None:
+        old = self.entries.pop(path, None)
+        if old is not None:
+            paths = self._by_sha.get(old["sha"], set())
+            paths.discard(path)
+            if not paths:
+                self._by_sha.pop(old["sha"], None)
+
+    def _load(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            self.entries, self._by_sha, self._mtime = {}, {}, None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+        except Exception as e:
+            print(f"[parser] ignoring unreadable parse cache {self.path}: {e}")
+            self.entries = {}
+        self._by_sha = {}
+        for path, entry in self.entries.items():
+            self._by_sha.setdefault(entry["sha"], set()).add(path)
+        self._mtime = mtime
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f)
+        os.replace(tmp, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def _extract(self, todo: List[Tuple[str, os.stat_result, str]], workers: Optional[int], timeout: Optional[float]) -> List[Dict]:
+        stats = extract_many([p for p, _, _ in todo], workers, timeout)
+        for (path, st, sha), res in zip(todo, stats):
+            entry = {"sha": sha, "text": res["text"], "error": res["error"]}
+            if res["error"] and res["error"].startswith("timeout"):
+                entry.update(size=-1, mtime=-1)      # retry on the next load
+            else:
+                entry.update(size=st.st_size, mtime=st.st_mtime_ns)
+            self._set(path, entry)
+        return stats
+
+    def add(self, paths: List[str], workers: Optional[int], timeout: Optional[float]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Extract just `paths` (e.g. fresh uploads) into the cache without
+        walking their folder; the next sync() then finds them up to date.
+        Like sync(), this rewrites the whole JSON file (every cached text), so
+        callers should add files in batches, e.g. once per upload request.
+        """
+        paths = [os.path.abspath(p) for p in paths]
+        with self._lock:
+            self._load()
+            stats = self._extract([(p, os.stat(p), _file_hash(p)) for p in paths], workers, timeout)
+            self._save()
+            items = [_make_item(p, self.entries[p]["text"], self.entries[p]["sha"]) for p in paths]
+            return items, stats
+
+    def find(self, folder: str, sha: str) -> Optional[str]:
+        """Path of a cached file under `folder` with content hash `sha`, if any."""
+        prefix = os.path.abspath(folder) + os.sep
+        with self._lock:
+            self._load()
+            return next((p for p in sorted(self._by_sha.get(sha, ())) if p.startswith(prefix)), None)
+
+    def sync(self, folder: str, workers: Optional[int], timeout: Optional[float]) -> Tuple[List[Dict], List[Dict]]:
+        root = os.path.abspath(folder)
+        with self._lock:
+            self._load()
+            dirty = False
+            seen = sorted(_iter_resume_files(root))
+            todo: List[Tuple[str, os.stat_result, str]] = []
+            for path in seen:
+                st = os.stat(path)
+                entry = self.entries.get(path)
+                if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+                    continue
+                sha = _file_hash(path)
+                timed_out = entry and (entry.get("error") or "").startswith("timeout")
+                if entry and entry["sha"] == sha and not timed_out:
+                    entry.update(size=st.st_size, mtime=st.st_mtime_ns)
+                    dirty = True
+                    continue
+                todo.append((path, st, sha))
+
+            stats = self._extract(todo, workers, timeout)
+            dirty = dirty or bool(stats)
+
+            live = set(seen)
+            prefix = root + os.sep
+            for path in [p for p in self.entries if p.startswith(prefix) and p not in live]:
+                self._drop(path)
+                dirty = True
+            if dirty:
+                self._save()
+            items = [_make_item(p, self.entries[p]["text"], self.entries[p]["sha"]) for p in seen]
+            return items, stats
+
+
+_caches: Dict[str, _ParseCache] = {}
+
+
+def _get_cache(path: str) -> _ParseCache:
+    if path not in _caches:
+        _caches[path] = _ParseCache(path)
+    return _caches[path]
+
+
+def _make_item(path: str, text: str, sha: str) -> Dict:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return {"id": os.path.basename(path), "name": name, "path": path, "text": text, "sha": sha}
+
+
+def corpus_version(items: List[Dict]) -> str:
+    """
+    Stable fingerprint of a loaded corpus: changes whenever a file is added,
+    removed, renamed or its content changes.
+    """
+    h = hashlib.sha1()
+    for it in sorted(items, key=lambda x: x["path"]):
+        h.update(f"{it['path']}\0{it['sha']}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def ingest(
+    folder: str,
+    use_cache: bool = True,
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[List[Dict], Dict]:
+    """
+    Load every resume under `folder` and return (items, report).
+
+    With `use_cache`, unchanged files are served from the parse cache in
+    settings.OUTPUT_DIR and only new or modified files are extracted; deleted
+    files are evicted. The report counts cached/extracted files and lists the
+    per-file timing and failures of whatever had to be extracted.
+    """
+    t0 = time.perf_counter()
+    with metrics.timer("parse"):
+        if use_cache:
+            items, stats = _cache().sync(str(folder), workers, timeout)
+        else:
+            paths = sorted(_iter_resume_files(str(folder)))
+            stats = extract_many(paths, workers, timeout)
+            items = [_make_item(p, r["text"], _file_hash(p)) for p, r in zip(paths, stats)]
+    FILES_PARSED.inc(len(stats))
+    FILES_CACHED.inc(len(items) - len(stats))
+    for r in stats:
+        if r["error"]:
+            PARSE_FAILURES.inc(reason="timeout" if r["error"].startswith("timeout") else "error")
+    report = {
+        "files": len(items),
+        "extracted": len(stats),
+        "cached": len(items) - len(stats),
+        "failed": [{"path": r["path"], "error": r["error"]} for r in stats if r["error"]],
+        "timings": [{"path": r["path"], "seconds": round(r["seconds"], 4)} for r in stats],
+        "seconds": round(time.perf_counter() - t0, 4),
+    }
+    return items, report
+
+
+def load_resumes(folder: str, use_cache: bool = True) -> List[Dict]:
+    return ingest(folder, use_cache)[0]
+
+
+def _cache() -> _ParseCache:
+    return _get_cache(os.path.join(str(settings.OUTPUT_DIR), PARSE_CACHE_FILE))
+
+
+def ingest_files(paths: List[str], workers: Optional[int] = None, timeout: Optional[float] = None) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Parse only `paths` into the parse cache and return (items, per-file
+    stats), so new files become part of the next load without a rescan.
+    """
+    with metrics.timer("parse"):
+        items, stats = _cache().add(paths, workers, timeout)
+    FILES_PARSED.inc(len(stats))
+    for r in stats:
+        if r["error"]:
+            PARSE_FAILURES.inc(reason="timeout" if r["error"].startswith("timeout") else "error")
+    return items, stats
+
+
+def known_path(folder: str, sha: str) -> Optional[str]:
+    """Path of a file under `folder` the parse cache knows with content hash `sha`."""
+    return _cache().find(folder, sha)
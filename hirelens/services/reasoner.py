@@ -0,0 +1,14 @@
+from typing import Dict, List
+
+
+def explain(name: str, final: float, matched: List[str], gaps: List[str], breakdown: Dict[str, float]) -> str:
+    """
+    One-line, human-readable justification for a candidate's score.
+    """
+    return (
+        f"{name} – semantic fit {final:.1f}. "
+        f"Matched skills: {', '.join(matched) or '—'}. "
+        f"Gaps: {', '.join(gaps) or '—'}. "
+        f"Breakdown(skills={breakdown['skills']:.1f}, exp={breakdown['experience']:.1f}, "
+        f"edu={breakdown['education']:.1f}, seniority={breakdown['seniority']:.1f})."
+    )
@@ -0,0 +1,47 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from hirelens.configs.settings import settings
+
+# result_id -> (created_at, feature run, weights, jd id). Runs are shared with
+# the scorer's feature cache, so keeping a handle costs a few pointers, not a
+# copy of every CandidateScore.
+_results: "OrderedDict[str, Tuple[float, Dict, Dict[str, float], Optional[str]]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def save(run: Dict, weights: Dict[str, float], jd_id: Optional[str] = None) -> str:
+    """
+    Keep a scoring run server-side and return its result id.
+    Only the newest settings.RESULT_STORE_SIZE results are retained.
+    """
+    result_id = uuid.uuid4().hex
+    with _lock:
+        _results[result_id] = (time.time(), run, dict(weights), jd_id)
+        while len(_results) > settings.RESULT_STORE_SIZE:
+            _results.popitem(last=False)
+    return result_id
+
+
+def get(result_id: str) -> Optional[Tuple[Dict, Dict[str, float]]]:
+    with _lock:
+        hit = _results.get(result_id)
+    if hit is None or time.time() - hit[0] > settings.RESULT_TTL_S:
+        return None
+    return hit[1], hit[2]
+
+
+def jd_id(result_id: str) -> Optional[str]:
+    with _lock:
+        hit = _results.get(result_id)
+    return hit[3] if hit else None
+
+
+def latest(jd_id: str) -> Optional[str]:
+    """Id of the newest live result scored for `jd_id`."""
+    with _lock:
+        ids = [rid for rid, hit in reversed(_results.items()) if hit[3] == jd_id]
+    return next((rid for rid in ids if get(rid) is not None), None)
@@ -1,18 +1,36 @@
 from __future__ import annotations
+import base64
+import hashlib
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.oauth2.credentials import Credentials
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from hirelens.configs.settings import settings
+from hirelens.services import slots
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 
-TOKEN_PATH = Path(settings.BASE_DIR) / ".google_token.json" 
+TOKEN_PATH = Path(settings.BASE_DIR) / ".google_token.json"
+
+# Google asks for at most 50 calls per batch request, and answers freebusy
+# for at most 50 calendars per query.
+BATCH_LIMIT = 50
+FREEBUSY_LIMIT = 50
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_lock = threading.Lock()
+_creds: Optional["Credentials"] = None
+_svc = None
+_local = threading.local()
+_freebusy_cache: Dict[tuple, tuple] = {}     # (calendar, start, end) -> (fetched_at, intervals), oldest first
 
 
 def _get_creds() -> Credentials:
@@ -20,14 +38,20 @@ def _get_creds() -> Credentials:
     Desktop OAuth flow:
       - Use credentials file specified in settings.GOOGLE_OAUTH_CREDS
       - Cache user token in .google_token.json so you don't need to re-consent
+      - Refresh an expired token with its refresh_token instead of re-consenting
     """
+    # The Google client stack is slow to import; only pay for it when scheduling.
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     creds: Optional[Credentials] = None
     if TOKEN_PATH.exists():
         creds = Credentials.from_authorized_user_file(str(TOKEN_PATH), SCOPES)
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
-            pass
+            creds.refresh(Request())
         else:
             flow = InstalledAppFlow.from_client_secrets_file(str(settings.GOOGLE_OAUTH_CREDS), SCOPES)
             creds = flow.run_local_server(port=0)
@@ -36,65 +60,401 @@ def _get_creds() -> Credentials:
     return creds
 
 
+def _credentials():
+    """
+    Process-wide credentials, loaded once and refreshed when they expire.
+    """
+    global _creds
+    with _lock:
+        if _creds is None:
+            _creds = _get_creds()
+        elif not _creds.valid and getattr(_creds, "refresh_token", None):
+            from google.auth.transport.requests import Request
+
+            _creds.refresh(Request())
+            if hasattr(_creds, "to_json"):
+                TOKEN_PATH.write_text(_creds.to_json())
+        return _creds
+
+
 def _service():
-    creds = _get_creds()
-    return build("calendar", "v3", credentials=creds)
+    """
+    Process-wide Calendar client. build() parses the discovery document, so it
+    runs once; settings.GOOGLE_CALENDAR_API_URL points it at another server
+    (e.g. a local fake in tests).
+    """
+    global _svc
+    creds = _credentials()
+    with _lock:
+        if _svc is None:
+            from googleapiclient.discovery import build
 
+            opts = {"api_endpoint": settings.GOOGLE_CALENDAR_API_URL} if settings.GOOGLE_CALENDAR_API_URL else None
+            _svc = build("calendar", "v3", credentials=creds, client_options=opts, cache_discovery=False)
+        return _svc
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8))
-def schedule_meet(
+
+def _http():
+    """
+    httplib2 connections are not thread-safe, so each thread executes
+    requests on its own authorized connection over the shared credentials.
+    """
+    creds = _credentials()
+    http = getattr(_local, "http", None)
+    if http is None or http.credentials is not creds:
+        import google_auth_httplib2
+        import httplib2
+
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=settings.GOOGLE_HTTP_TIMEOUT_S))
+        _local.http = http
+    return http
+
+
+def reset_client() -> None:
+    """Drop cached credentials, client and free/busy data (e.g. after changing settings)."""
+    global _creds, _svc
+    with _lock:
+        _creds, _svc = None, None
+        _freebusy_cache.clear()
+    _local.__dict__.clear()
+
+
+def _batch_uri() -> str:
+    if settings.GOOGLE_CALENDAR_API_URL:
+        parts = urlsplit(settings.GOOGLE_CALENDAR_API_URL)
+        return f"{parts.scheme}://{parts.netloc}/batch/calendar/v3"
+    return "https://www.googleapis.com/batch/calendar/v3"
+
+
+def request_key(
     interviewer_email: str,
     candidate_email: str,
-    start_iso: str,   
-    end_iso: str,    
+    start_iso: str,
+    end_iso: str,
+    request_id: Optional[str] = None,
+) -> str:
+    """
+    Idempotency key of one interview: the caller's `request_id` if given,
+    otherwise derived from who meets when. The same key always maps to the
+    same Calendar event id, so a retried insert cannot create a duplicate.
+    """
+    raw = request_id or "\0".join([interviewer_email.lower(), candidate_email.lower(), start_iso, end_iso])
+    return "hl-" + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def event_id(key: str) -> str:
+    # Calendar event ids must use base32hex characters (a-v, 0-9).
+    return base64.b32hexencode(hashlib.sha1(key.encode("utf-8")).digest()).decode("ascii").rstrip("=").lower()
+
+
+def _event_body(
+    interviewer_email: str,
+    candidate_email: str,
+    start_iso: str,
+    end_iso: str,
     title: str,
     description: Optional[str],
     timezone: str,
+    request_id: Optional[str] = None,
+    extra_attendees: Optional[List[str]] = None,
 ) -> dict:
-    """
-    Create a Calendar event with a Google Meet link and invite both attendees.
-    Returns dict with eventId/htmlLink/meetLink.
-    """
     try:
         datetime.fromisoformat(start_iso)
         datetime.fromisoformat(end_iso)
     except Exception:
         raise ValueError("start_iso and end_iso must be ISO datetimes, e.g. 2025-08-11T11:00:00")
 
-    svc = _service()
-
-    event_body = {
+    key = request_key(interviewer_email, candidate_email, start_iso, end_iso, request_id)
+    return {
+        "id": event_id(key),
         "summary": title,
         "description": description or "",
         "start": {"dateTime": start_iso, "timeZone": timezone},
         "end": {"dateTime": end_iso, "timeZone": timezone},
-        "attendees": [{"email": interviewer_email}, {"email": candidate_email}],
+        "attendees": [{"email": e} for e in [interviewer_email, *(extra_attendees or []), candidate_email]],
         "conferenceData": {
             "createRequest": {
-                "requestId": f"req-{int(datetime.now().timestamp())}",
+                "requestId": key,
                 "conferenceSolutionKey": {"type": "hangoutsMeet"},
             }
         },
     }
 
-    created = (
-        svc.events()
-        .insert(
-            calendarId=str(settings.GOOGLE_CALENDAR_ID),
-            body=event_body,
-            conferenceDataVersion=1,  
-            sendUpdates="all",        
-        )
-        .execute()
-    )
 
+def _summary(created: dict) -> dict:
     meet_link = (
         created.get("hangoutLink")
         or created.get("conferenceData", {}).get("entryPoints", [{}])[0].get("uri")
     )
-
     return {
         "eventId": created.get("id"),
         "htmlLink": created.get("htmlLink"),
         "meetLink": meet_link,
     }
+
+
+def _status(exc: Exception) -> Optional[int]:
+    resp = getattr(exc, "resp", None)
+    return getattr(resp, "status", None)
+
+
+def _retryable(exc: Exception) -> bool:
+    status = _status(exc)
+    return status in RETRYABLE_STATUS or (status is None and not isinstance(exc, ValueError))
+
+
+def _insert(svc, body: dict):
+    return svc.events().insert(
+        calendarId=str(settings.GOOGLE_CALENDAR_ID),
+        body=body,
+        conferenceDataVersion=1,
+        sendUpdates="all",
+    )
+
+
+def _existing(svc, eid: str) -> dict:
+    return svc.events().get(calendarId=str(settings.GOOGLE_CALENDAR_ID), eventId=eid).execute(http=_http())
+
+
+@retry(
+    retry=retry_if_exception(_retryable),
+    stop=lambda state: stop_after_attempt(settings.SCHEDULE_MAX_ATTEMPTS)(state),
+    wait=wait_exponential(multiplier=1, min=1, max=8),
+    reraise=True,
+)
+def schedule_meet(
+    interviewer_email: str,
+    candidate_email: str,
+    start_iso: str,
+    end_iso: str,
+    title: str,
+    description: Optional[str],
+    timezone: str,
+    request_id: Optional[str] = None,
+    extra_attendees: Optional[List[str]] = None,
+) -> dict:
+    """
+    Create a Calendar event with a Google Meet link and invite both attendees.
+    Returns dict with eventId/htmlLink/meetLink. Scheduling the same interview
+    again (same request_id, or same people and times) returns the existing event.
+    """
+    body = _event_body(
+        interviewer_email, candidate_email, start_iso, end_iso, title, description, timezone, request_id, extra_attendees
+    )
+    svc = _service()
+    try:
+        created = _insert(svc, body).execute(http=_http())
+    except Exception as e:
+        if _status(e) != 409:
+            raise
+        created = _existing(svc, body["id"])
+    return _summary(created)
+
+
+def schedule_batch(items: List[Dict], max_attempts: Optional[int] = None) -> List[Dict]:
+    """
+    Create many events through the Calendar batch HTTP API (BATCH_LIMIT
+    inserts per HTTP request). `items` are schedule_meet keyword dicts.
+
+    Returns one result per item, in order:
+      {"index", "status": created|exists|failed, "eventId", "htmlLink",
+       "meetLink", "requestId", "attempts", "error"}
+    Items failing with 429/5xx (or a failed batch request) are retried in a
+    smaller batch with exponential backoff; a 409 means an earlier attempt
+    already created the event, which is then looked up and reported as exists.
+    """
+    from googleapiclient.http import BatchHttpRequest
+
+    attempts_max = max_attempts or settings.SCHEDULE_MAX_ATTEMPTS
+    results: List[Dict] = []
+    bodies: Dict[int, dict] = {}
+    for i, it in enumerate(items):
+        key = request_key(it["interviewer_email"], it["candidate_email"], it["start_iso"], it["end_iso"], it.get("request_id"))
+        results.append({"index": i, "status": "failed", "requestId": key, "attempts": 0, "error": None})
+        try:
+            bodies[i] = _event_body(**it)
+        except ValueError as e:
+            results[i]["error"] = str(e)
+
+    svc = _service()
+    pending = sorted(bodies)
+    for attempt in range(1, attempts_max + 1):
+        retry_next: List[int] = []
+        conflicts: List[int] = []
+
+        def on_response(request_id, response, exception):
+            i = int(request_id)
+            res = results[i]
+            res["attempts"] = attempt
+            if exception is None:
+                res.update(status="created", error=None, **_summary(response))
+            elif _status(exception) == 409:
+                conflicts.append(i)
+            else:
+                res["error"] = str(exception)
+                if _retryable(exception):
+                    retry_next.append(i)
+
+        for start in range(0, len(pending), BATCH_LIMIT):
+            chunk = pending[start:start + BATCH_LIMIT]
+            batch = BatchHttpRequest(callback=on_response, batch_uri=_batch_uri())
+            for i in chunk:
+                batch.add(_insert(svc, bodies[i]), request_id=str(i))
+            try:
+                batch.execute(http=_http())
+            except Exception as e:
+                for i in chunk:
+                    if results[i]["status"] != "created" and i not in conflicts and i not in retry_next:
+                        results[i].update(attempts=attempt, error=f"batch request failed: {e}")
+                        retry_next.append(i)
+
+        for i in conflicts:
+            try:
+                results[i].update(status="exists", error=None, **_summary(_existing(svc, bodies[i]["id"])))
+            except Exception as e:
+                results[i]["error"] = f"event exists but could not be read: {e}"
+
+        pending = sorted(set(retry_next))
+        if not pending:
+            break
+        if attempt < attempts_max:
+            time.sleep(settings.SCHEDULE_RETRY_BACKOFF_S * 2 ** (attempt - 1))
+    return results
+
+
+def freebusy(calendars: List[str], start: int, end: int) -> Tuple[Dict[str, List[slots.Interval]], Dict[str, str]]:
+    """
+    Busy intervals (epoch seconds) of each calendar in [start, end), with one
+    freebusy query per FREEBUSY_LIMIT calendars. Answers are cached for
+    settings.FREEBUSY_TTL_S. Returns (busy by calendar, errors by calendar);
+    a calendar that could not be read is left out of the busy map.
+    """
+    now = time.monotonic()
+    busy: Dict[str, List[slots.Interval]] = {}
+    with _lock:
+        for cal in calendars:
+            hit = _freebusy_cache.get((cal, start, end))
+            if hit and now - hit[0] < settings.FREEBUSY_TTL_S:
+                busy[cal] = hit[1]
+    todo = [c for c in dict.fromkeys(calendars) if c not in busy]
+    errors: Dict[str, str] = {}
+    if not todo:
+        return busy, errors
+
+    svc = _service()
+    time_min, time_max = slots.to_iso(start, "UTC"), slots.to_iso(end, "UTC")
+    for i in range(0, len(todo), FREEBUSY_LIMIT):
+        chunk = todo[i:i + FREEBUSY_LIMIT]
+        resp = svc.freebusy().query(body={
+            "timeMin": time_min,
+            "timeMax": time_max,
+            "items": [{"id": c} for c in chunk],
+        }).execute(http=_http())
+        for cal in chunk:
+            info = resp.get("calendars", {}).get(cal, {})
+            if info.get("errors"):
+                errors[cal] = ", ".join(e.get("reason", "error") for e in info["errors"])
+                continue
+            busy[cal] = slots.merge(
+                (slots.to_epoch(b["start"], "UTC"), slots.to_epoch(b["end"], "UTC")) for b in info.get("busy", [])
+            )
+            _cache_busy((cal, start, end), now, busy[cal])
+    return busy, errors
+
+
+def _cache_busy(key: tuple, now: float, intervals: List[slots.Interval]) -> None:
+    # Entries stay in fetch order, so expired ones are all at the front.
+    with _lock:
+        _freebusy_cache.pop(key, None)
+        _freebusy_cache[key] = (now, intervals)
+        while _freebusy_cache:
+            oldest = next(iter(_freebusy_cache))
+            if now - _freebusy_cache[oldest][0] < settings.FREEBUSY_TTL_S:
+                break
+            del _freebusy_cache[oldest]
+
+
+def _hours(working_hours: Optional[str]) -> Optional[str]:
+    return settings.WORKING_HOURS if working_hours is None else working_hours
+
+
+def find_slots(
+    calendars: List[str],
+    start_iso: str,
+    end_iso: str,
+    duration_minutes: int,
+    timezone: str,
+    step_minutes: Optional[int] = None,
+    working_hours: Optional[str] = None,
+    weekdays_only: bool = False,
+    limit: Optional[int] = None,
+) -> dict:
+    """
+    Slots of `duration_minutes` in the window where every calendar is free,
+    on a `step_minutes` grid (default settings.SLOT_STEP_MINUTES) and within
+    working hours local to `timezone`. Calendars that could not be read are
+    listed under "errors" and not taken into account.
+    """
+    start, end = slots.to_epoch(start_iso, timezone), slots.to_epoch(end_iso, timezone)
+    busy, errors = freebusy(calendars, start, end)
+    found = slots.common_slots(
+        busy, start, end, duration_minutes * 60, (step_minutes or settings.SLOT_STEP_MINUTES) * 60,
+        timezone, _hours(working_hours), weekdays_only,
+    )
+    return {
+        "total": len(found),
+        "slots": [{"start": slots.to_iso(s, timezone), "end": slots.to_iso(e, timezone)} for s, e in found[:limit]],
+        "errors": errors,
+    }
+
+
+def assign_interviews(
+    interviewers: List[str],
+    candidates: List[str],
+    start_iso: str,
+    end_iso: str,
+    duration_minutes: int,
+    timezone: str,
+    mode: str = "panel",
+    gap_minutes: int = 0,
+    step_minutes: Optional[int] = None,
+    working_hours: Optional[str] = None,
+    weekdays_only: bool = False,
+    title: str = "Interview",
+    description: Optional[str] = None,
+    book: bool = False,
+) -> dict:
+    """
+    Place a whole shortlist on the panel's free time in one call (see
+    slots.assign for the modes). With `book`, the assignments are created
+    through schedule_batch and each carries its booking result.
+    """
+    start, end = slots.to_epoch(start_iso, timezone), slots.to_epoch(end_iso, timezone)
+    busy, errors = freebusy(interviewers + candidates, start, end)
+    placed, unassigned = slots.assign(
+        {i: busy.get(i, []) for i in interviewers},
+        {c: busy.get(c, []) for c in candidates},
+        start, end, duration_minutes * 60, (step_minutes or settings.SLOT_STEP_MINUTES) * 60,
+        timezone, _hours(working_hours), weekdays_only, mode, gap_minutes * 60,
+    )
+    assignments = [
+        {**a, "start": slots.to_iso(a["start"], timezone), "end": slots.to_iso(a["end"], timezone)}
+        for a in placed
+    ]
+    if book and assignments:
+        booked = schedule_batch([
+            {
+                "interviewer_email": a["interviewers"][0],
+                "extra_attendees": a["interviewers"][1:],
+                "candidate_email": a["candidate"],
+                "start_iso": a["start"],
+                "end_iso": a["end"],
+                "title": title,
+                "description": description,
+                "timezone": timezone,
+            }
+            for a in assignments
+        ])
+        for a, b in zip(assignments, booked):
+            a["booking"] = {k: v for k, v in b.items() if k != "index"}
+    return {"assignments": assignments, "unassigned": unassigned, "errors": errors}
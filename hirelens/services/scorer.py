@@ -1,36 +1,52 @@
+import hashlib
 import re
+import threading
+from collections import OrderedDict
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+from hirelens.services import metrics
 from hirelens.services.embeddings import embed_texts
+from hirelens.services.skills import get_matcher, popcount
 from hirelens.configs.settings import settings
 
-SEED_SKILLS = [
-    "python","fastapi","node","react","docker","kubernetes","nlp","embeddings","faiss",
-    "pandas","sql","gcp","aws","oauth","google calendar","scheduling","etl","api",
-    "vector db","langchain","ml","classification","regression","transformers"
-]
-
 def extract_skills(text: str) -> List[str]:
-    t = (text or "").lower()
-    return [s for s in SEED_SKILLS if s in t]
+    return get_matcher().extract(text)
+
+def skill_set(text: str) -> FrozenSet[str]:
+    """
+    Canonical skills in `text` as a set; compute once per text and pass it to
+    score_from_similarities / shortlist.skills_gap instead of re-scanning.
+    """
+    return get_matcher().match(text)
 
 def estimate_experience_years(text: str) -> float:
     yrs = [int(x) for x in re.findall(r"(\d+)\s+year", (text or "").lower())]
     return float(max(yrs) if yrs else 0)
 
-def score_candidate(jd_text: str, resume_text: str, weights: Dict[str, float]) -> Tuple[float, Dict[str, float]]:
-    embs = embed_texts([jd_text, resume_text], settings.EMBEDDING_MODEL)
-    sim = float(np.dot(embs[0], embs[1]))  # 0..1
+EDU_KEYWORDS = ["b.tech","btech","b.e","be ","mtech","m.tech","masters","m.sc","mca"]
+EDU_SCORES = (0.4, 0.7)   # (no degree keyword, degree keyword)
 
-    jd_skills = set(extract_skills(jd_text))
-    cv_skills = set(extract_skills(resume_text))
+def has_degree(text: str) -> bool:
+    t = (text or "").lower()
+    return any(k in t for k in EDU_KEYWORDS)
+
+def _score_from_similarity(
+    sim: float,
+    jd_text: str,
+    resume_text: str,
+    weights: Dict[str, float],
+    jd_skills: Optional[FrozenSet[str]] = None,
+    cv_skills: Optional[FrozenSet[str]] = None,
+) -> Tuple[float, Dict[str, float]]:
+    jd_skills = skill_set(jd_text) if jd_skills is None else jd_skills
+    cv_skills = skill_set(resume_text) if cv_skills is None else cv_skills
     skill_overlap = len(jd_skills & cv_skills) / (len(jd_skills) or 1)
 
     jd_years = estimate_experience_years(jd_text)
     cv_years = estimate_experience_years(resume_text)
     exp_score = min(cv_years / (jd_years or 1), 1.0)
 
-    edu_score = 0.7 if any(k in (resume_text or "").lower() for k in ["b.tech","btech","b.e","be ","mtech","m.tech","masters","m.sc","mca"]) else 0.4
+    edu_score = EDU_SCORES[int(has_degree(resume_text))]
     seniority_score = 0.5 + 0.5 * sim
 
     total = (
@@ -47,3 +63,219 @@ def score_candidate(jd_text: str, resume_text: str, weights: Dict[str, float]) -
         "seniority": seniority_score * 100.0
     }
     return final, breakdown
+
+
+def score_candidate(jd_text: str, resume_text: str, weights: Dict[str, float]) -> Tuple[float, Dict[str, float]]:
+    embs = embed_texts([jd_text, resume_text], settings.EMBEDDING_MODEL)
+    sim = float(np.dot(embs[0], embs[1]))  # 0..1
+    return _score_from_similarity(sim, jd_text, resume_text, weights)
+
+
+def embed_corpus(texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+    """
+    Encode a whole corpus in chunks of `batch_size` (defaults to
+    settings.EMBEDDING_BATCH_SIZE) and stack the result into one (N, dim) matrix.
+    """
+    bs = batch_size or settings.EMBEDDING_BATCH_SIZE
+    with metrics.timer("embed"):
+        chunks = [
+            embed_texts(texts[i:i + bs], settings.EMBEDDING_MODEL, batch_size=bs)
+            for i in range(0, len(texts), bs)
+        ]
+    if not chunks:
+        return np.zeros((0, 0), dtype="float32")
+    return np.vstack(chunks)
+
+
+def embed_jd(jd_text: str) -> np.ndarray:
+    with metrics.timer("embed"):
+        return embed_texts([jd_text], settings.EMBEDDING_MODEL)[0]
+
+
+def embed_jds(jd_texts: List[str]) -> np.ndarray:
+    with metrics.timer("embed"):
+        return embed_texts(jd_texts, settings.EMBEDDING_MODEL, batch_size=max(len(jd_texts), 1))
+
+
+# Columns of the candidate feature matrix built by build_features.
+FEATURES = ("similarity", "skills", "experience", "education", "seniority", "nice_to_have")
+BREAKDOWN_COLUMNS = slice(1, 6)
+
+
+def skill_bits(skill_sets: Sequence[FrozenSet[str]]) -> np.ndarray:
+    """
+    Packed (len(skill_sets), n_bytes) uint8 bitsets over the skill taxonomy,
+    so set intersections become bitwise AND + popcount.
+    """
+    return get_matcher().pack(skill_sets)
+
+
+def resume_profile(resume_texts: List[str], cv_skills: Optional[Sequence[FrozenSet[str]]] = None) -> Dict[str, np.ndarray]:
+    """
+    The JD-independent half of the features: skill bitsets, years of
+    experience and the degree flag for every resume. services.featurestore
+    persists these so the request path does not recompute them.
+    """
+    n = len(resume_texts)
+    with metrics.timer("profile"):
+        if cv_skills is None:
+            cv_skills = [skill_set(t) for t in resume_texts]
+        return {
+            "bits": skill_bits(cv_skills),
+            "years": np.fromiter((estimate_experience_years(t) for t in resume_texts), dtype="float32", count=n),
+            "degree": np.fromiter((has_degree(t) for t in resume_texts), dtype="uint8", count=n),
+        }
+
+
+def take_profile(profile: Dict[str, np.ndarray], rows) -> Dict[str, np.ndarray]:
+    return {k: v[rows] for k, v in profile.items()}
+
+
+def _overlap(jd_bits: np.ndarray, cv_bits: np.ndarray) -> np.ndarray:
+    """
+    (M, N) fraction of each JD's skills found in each resume.
+    """
+    hits = np.stack([popcount(cv_bits & row) for row in jd_bits]) if len(jd_bits) else np.zeros((0, len(cv_bits)))
+    return hits / np.maximum(popcount(jd_bits), 1)[:, None]
+
+
+def build_feature_tensor(
+    jd_texts: List[str],
+    sims: np.ndarray,
+    profile: Dict[str, np.ndarray],
+    nice_skills: Optional[Sequence[FrozenSet[str]]] = None,
+) -> np.ndarray:
+    """
+    (M JDs, N resumes, 6) float32 FEATURES tensor from an (M, N) similarity
+    matrix and a resume_profile. Skill overlap is AND + popcount over the
+    packed skill bitsets; `nice_skills` (one set per JD, e.g.
+    JobDescription.nice_to_have) feeds the nice_to_have bonus column the same way.
+    Only the JD side is scanned here.
+    """
+    with metrics.timer("features"):
+        m, n = len(jd_texts), profile["years"].shape[0]
+        jd_years = np.asarray([estimate_experience_years(t) or 1.0 for t in jd_texts], dtype="float32")
+        sim = np.asarray(sims, dtype="float32").reshape(m, n)
+
+        feats = np.empty((m, n, len(FEATURES)), dtype="float32")
+        feats[..., 0] = sim
+        feats[..., 1] = _overlap(skill_bits([skill_set(t) for t in jd_texts]), profile["bits"])
+        feats[..., 2] = np.minimum(profile["years"][None, :] / jd_years[:, None], 1.0)
+        feats[..., 3] = np.where(profile["degree"], EDU_SCORES[1], EDU_SCORES[0])[None, :]
+        feats[..., 4] = 0.5 + 0.5 * sim
+        feats[..., 5] = 0.0 if nice_skills is None else _overlap(skill_bits(nice_skills), profile["bits"])
+        return feats
+
+
+def build_features(
+    jd_text: str,
+    resume_texts: List[str],
+    sims: np.ndarray,
+    cv_skills: Optional[Sequence[FrozenSet[str]]] = None,
+    nice_skills: Optional[FrozenSet[str]] = None,
+    profile: Optional[Dict[str, np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    (N, 6) float32 matrix with one row per resume and the FEATURES columns,
+    each in 0..1. Nothing in it depends on the weights, so it can be cached and
+    re-ranked with score_features for any weight set. Pass a precomputed
+    `profile` (e.g. from the feature store) to skip scanning resume text.
+    """
+    nice = None if nice_skills is None else [nice_skills]
+    if profile is None:
+        profile = resume_profile(resume_texts, cv_skills)
+    return build_feature_tensor([jd_text], sims, profile, nice)[0]
+
+
+def weight_vector(weights: Dict[str, float]) -> np.ndarray:
+    """
+    Fold the 0.6 * weighted-total + 0.4 * similarity blend into one vector so
+    the final 0..100 score is a single `features @ w`. Matching every
+    nice-to-have skill adds settings.NICE_TO_HAVE_BONUS points on top.
+    """
+    return np.asarray([
+        40.0,
+        60.0 * weights["skills"],
+        60.0 * weights["experience"],
+        60.0 * weights["education"],
+        60.0 * weights["seniority"],
+        settings.NICE_TO_HAVE_BONUS,
+    ], dtype="float32")
+
+
+def score_features(features: np.ndarray, weights: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (final scores (..., N), breakdown (..., N, 5) in 0..100, columns
+    skills, experience, education, seniority, nice_to_have); works on a
+    single run's matrix or a whole build_feature_tensor.
+    """
+    with metrics.timer("score"):
+        return features @ weight_vector(weights), features[..., BREAKDOWN_COLUMNS] * 100.0
+
+
+def score_from_similarities(
+    jd_text: str,
+    resume_texts: List[str],
+    sims: np.ndarray,
+    weights: Dict[str, float],
+    cv_skills: Optional[Sequence[FrozenSet[str]]] = None,
+) -> List[Tuple[float, Dict[str, float]]]:
+    final, br = score_features(build_features(jd_text, resume_texts, sims, cv_skills), weights)
+    keys = FEATURES[BREAKDOWN_COLUMNS]
+    return [(float(f), dict(zip(keys, map(float, row)))) for f, row in zip(final, br)]
+
+
+_FEATURE_CACHE_SIZE = 8
+_feature_runs: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+_feature_lock = threading.Lock()
+
+
+def jd_key(jd_text: str) -> str:
+    return hashlib.sha1((jd_text or "").encode("utf-8")).hexdigest()
+
+
+def cache_feature_run(jd_text: str, corpus_version: str, run: Dict) -> Dict:
+    """
+    Remember the feature matrix (plus whatever the caller needs to rebuild its
+    response) for (JD, corpus version); only the most recent few are kept.
+    """
+    with _feature_lock:
+        key = (jd_key(jd_text), corpus_version)
+        _feature_runs[key] = run
+        _feature_runs.move_to_end(key)
+        while len(_feature_runs) > _FEATURE_CACHE_SIZE:
+            _feature_runs.popitem(last=False)
+    return run
+
+
+def get_feature_run(jd_text: str, corpus_version: Optional[str] = None) -> Optional[Dict]:
+    """
+    Cached run for this JD and corpus version, or - without a version - the
+    most recent run for this JD, whatever corpus it was computed on.
+    """
+    k = jd_key(jd_text)
+    with _feature_lock:
+        if corpus_version is not None:
+            return _feature_runs.get((k, corpus_version))
+        for (jk, _), run in reversed(_feature_runs.items()):
+            if jk == k:
+                return run
+    return None
+
+
+def score_candidates(
+    jd_text: str,
+    resume_texts: List[str],
+    weights: Dict[str, float],
+    batch_size: Optional[int] = None,
+) -> List[Tuple[float, Dict[str, float]]]:
+    """
+    Batch version of score_candidate: the JD is embedded once, the resumes are
+    embedded in large batches and all similarities come from a single
+    matrix-vector product. Output order matches `resume_texts`.
+    """
+    if not resume_texts:
+        return []
+    jd_vec = embed_jd(jd_text)
+    sims = embed_corpus(resume_texts, batch_size) @ jd_vec
+    return score_from_similarities(jd_text, resume_texts, sims, weights)
@@ -1,11 +1,34 @@
-from typing import List
+import heapq
+from typing import AbstractSet, List, Optional
+import numpy as np
 from hirelens.models.schema import CandidateScore
-from hirelens.services.scorer import extract_skills
+from hirelens.services.scorer import skill_set
 
 def shortlist(candidates: List[CandidateScore], top_n: int) -> List[CandidateScore]:
-    return sorted(candidates, key=lambda c: c.score, reverse=True)[:top_n]
+    return heapq.nlargest(top_n, candidates, key=lambda c: c.score)
 
-def skills_gap(jd_text: str, cv_text: str) -> List[str]:
-    jd = set(extract_skills(jd_text))
-    cv = set(extract_skills(cv_text))
-    return sorted(list(jd - cv))
+def top_indices(scores: np.ndarray, top_n: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the `top_n` highest scores, best first (all of them when
+    top_n is None). Uses a partition to find the k-th best score, so only the
+    candidates at or above it are sorted. Ties keep their original order,
+    including ties at the cut-off.
+    """
+    n = len(scores)
+    if top_n is None or top_n >= n:
+        return np.argsort(-scores, kind="stable")
+    if top_n <= 0:
+        return np.zeros(0, dtype="int64")
+    kth = -np.partition(-scores, top_n - 1)[top_n - 1]
+    cand = np.nonzero(scores >= kth)[0]
+    return cand[np.lexsort((cand, -scores[cand]))][:top_n]
+
+def skills_gap(
+    jd_text: str,
+    cv_text: str,
+    jd_skills: Optional[AbstractSet[str]] = None,
+    cv_skills: Optional[AbstractSet[str]] = None,
+) -> List[str]:
+    jd = skill_set(jd_text) if jd_skills is None else jd_skills
+    cv = skill_set(cv_text) if cv_skills is None else cv_skills
+    return sorted(jd - cv)
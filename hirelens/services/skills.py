@@ -0,0 +1,129 @@
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+import numpy as np
+
+from hirelens.configs.settings import settings
+
+# Characters that may be part of a skill token ("c++", "node.js", "ci/cd").
+# A match must not be glued to one of them on either side, so "ml" no longer
+# matches inside "html" and "java" does not match inside "javascript".
+_WORD = r"[a-z0-9+#]"
+
+
+def _normalize(term: str) -> str:
+    return re.sub(r"\s+", " ", term.strip().lower())
+
+
+def _trie_regex(terms: List[str]) -> str:
+    """
+    Build a prefix-trie shaped alternation so the regex engine walks shared
+    prefixes once instead of trying thousands of alternatives at every offset.
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def walk(node: Dict) -> str:
+        end = "" in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            piece = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(piece + walk(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if end else body
+
+    return walk(trie)
+
+
+class SkillMatcher:
+    """
+    Single-pass matcher over a skill taxonomy of canonical names and synonyms.
+    All surface forms are compiled into one word-bounded regex; every hit is
+    mapped back to its canonical skill.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self.skills: List[str] = [_normalize(s) for s in taxonomy]
+        self._canonical: Dict[str, str] = {}
+        for skill, synonyms in taxonomy.items():
+            for form in [skill, *synonyms]:
+                self._canonical.setdefault(_normalize(form), _normalize(skill))
+        # Optional suffixes in the trie are greedy, so the longest surface
+        # form wins ("vector database" over a shorter prefix form).
+        pattern = _trie_regex(sorted(self._canonical))
+        self._regex = re.compile(rf"(?<!{_WORD})(?:{pattern})(?!{_WORD})")
+        self._order = {s: i for i, s in enumerate(self.skills)}
+
+    @classmethod
+    def from_file(cls, path: Path) -> "SkillMatcher":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, text: str) -> FrozenSet[str]:
+        t = (text or "").lower()
+        return frozenset(self._canonical[_normalize(m.group(0))] for m in self._regex.finditer(t))
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Canonical skills found in `text`, in taxonomy order.
+        """
+        return sorted(self.match(text), key=self._order.__getitem__)
+
+    def indicator(self, skill_sets: Iterable[FrozenSet[str]]) -> np.ndarray:
+        """
+        0/1 float32 matrix with one row per skill set and one column per
+        taxonomy skill (in taxonomy order).
+        """
+        sets = list(skill_sets)
+        out = np.zeros((len(sets), len(self.skills)), dtype="float32")
+        for row, skills in enumerate(sets):
+            out[row, [self._order[s] for s in skills]] = 1.0
+        return out
+
+    @property
+    def n_bytes(self) -> int:
+        return (len(self.skills) + 7) // 8
+
+    def pack(self, skill_sets: Iterable[FrozenSet[str]]) -> np.ndarray:
+        """
+        Fixed-width uint8 bitset per skill set (bit i = taxonomy skill i),
+        shape (len(skill_sets), n_bytes).
+        """
+        ind = self.indicator(skill_sets).astype("uint8")
+        return np.packbits(ind, axis=1, bitorder="little").reshape(len(ind), self.n_bytes)
+
+    def unpack(self, bits: np.ndarray) -> FrozenSet[str]:
+        """
+        Skill set encoded by one packed bitset row.
+        """
+        flags = np.unpackbits(np.asarray(bits, dtype="uint8"), count=len(self.skills), bitorder="little")
+        return frozenset(self.skills[i] for i in np.flatnonzero(flags))
+
+
+# Number of set bits in every byte value.
+POPCOUNT8 = np.unpackbits(np.arange(256, dtype="uint8")[:, None], axis=1).sum(axis=1).astype("uint8")
+
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    """
+    Set bits per row of a packed (..., n_bytes) uint8 bitset array.
+    """
+    return POPCOUNT8[bits].sum(axis=-1, dtype="int32")
+
+
+@lru_cache(maxsize=4)
+def _load_matcher(path: str) -> SkillMatcher:
+    return SkillMatcher.from_file(Path(path))
+
+
+def get_matcher(path: Optional[Path] = None) -> SkillMatcher:
+    return _load_matcher(str(path or settings.SKILLS_TAXONOMY_PATH))
@@ -0,0 +1,215 @@
+import bisect
+import heapq
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+# Intervals are half-open (start, end) pairs of UTC epoch seconds: cheap to
+# sort and compare, and DST-proof. Timezones only matter at the edges, when
+# parsing input, applying working hours and formatting output.
+Interval = Tuple[int, int]
+
+DEFAULT_STEP = 15 * 60
+
+
+def to_epoch(value: str, tz: str) -> int:
+    """
+    ISO datetime -> epoch seconds; naive values are local time in `tz`.
+    """
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=ZoneInfo(tz))
+    return int(dt.timestamp())
+
+
+def to_iso(epoch: int, tz: str) -> str:
+    return datetime.fromtimestamp(epoch, ZoneInfo(tz)).isoformat()
+
+
+def merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Union of intervals by a sorted sweep: overlapping or touching intervals
+    are coalesced. O(n log n).
+    """
+    out: List[List[int]] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if out and start <= out[-1][1]:
+            if end > out[-1][1]:
+                out[-1][1] = end
+        else:
+            out.append([start, end])
+    return [(s, e) for s, e in out]
+
+
+def merge_many(per_calendar: Iterable[Sequence[Interval]]) -> List[Interval]:
+    """
+    Union of several calendars' busy lists. Each list is merged (sorted) first,
+    so the k-way heap merge keeps the sweep at O(n log k).
+    """
+    return merge(heapq.merge(*[merge(b) for b in per_calendar]))
+
+
+def complement(busy: Sequence[Interval], start: int, end: int) -> List[Interval]:
+    """
+    Free gaps of [start, end) around merged `busy` intervals.
+    """
+    free, cursor = [], start
+    for b_start, b_end in busy:
+        if b_end <= cursor:
+            continue
+        if b_start >= end:
+            break
+        if b_start > cursor:
+            free.append((cursor, b_start))
+        cursor = max(cursor, b_end)
+    if cursor < end:
+        free.append((cursor, end))
+    return free
+
+
+def parse_hours(spec: Optional[str]) -> Optional[Tuple[dtime, dtime]]:
+    """'09:00-18:00' -> (time(9), time(18)); None/'' means all day."""
+    if not spec:
+        return None
+    a, b = spec.split("-")
+    return dtime.fromisoformat(a.strip()), dtime.fromisoformat(b.strip())
+
+
+def off_hours(start: int, end: int, tz: str, hours: Optional[str], weekdays_only: bool = False) -> List[Interval]:
+    """
+    Time outside working `hours` (local to `tz`, so DST shifts are handled
+    per day) between start and end, as busy intervals.
+    """
+    wh = parse_hours(hours)
+    if wh is None and not weekdays_only:
+        return []
+    zone = ZoneInfo(tz)
+    day: date = datetime.fromtimestamp(start, zone).date() - timedelta(days=1)
+    last: date = datetime.fromtimestamp(end, zone).date() + timedelta(days=1)
+    open_spans = []
+    while day <= last:
+        if not (weekdays_only and day.weekday() >= 5):
+            a, b = wh or (dtime(0), dtime(0))
+            s = int(datetime.combine(day, a, zone).timestamp())
+            e = int(datetime.combine(day + timedelta(days=1) if b <= a else day, b, zone).timestamp())
+            open_spans.append((s, e))
+        day += timedelta(days=1)
+    return complement(merge(open_spans), start, end)
+
+
+def split(free: Sequence[Interval], duration: int, step: int) -> List[Interval]:
+    """
+    Slots of `duration` seconds inside free gaps, starting on a `step` grid
+    (aligned to the epoch, e.g. :00/:15/:30/:45 for 15 minutes).
+    """
+    slots = []
+    for start, end in free:
+        s = -(-start // step) * step
+        while s + duration <= end:
+            slots.append((s, s + duration))
+            s += step
+    return slots
+
+
+def common_slots(
+    busy_by_calendar: Dict[str, Sequence[Interval]],
+    start: int,
+    end: int,
+    duration: int,
+    step: Optional[int] = None,
+    tz: str = "UTC",
+    working_hours: Optional[str] = None,
+    weekdays_only: bool = False,
+) -> List[Interval]:
+    """
+    Start/end of every `duration`-second slot in [start, end) in which all
+    calendars are free (and within working hours, when given).
+    """
+    busy = merge_many(list(busy_by_calendar.values()) + [off_hours(start, end, tz, working_hours, weekdays_only)])
+    return split(complement(busy, start, end), duration, step or DEFAULT_STEP)
+
+
+class _Booked:
+    """Sorted, non-overlapping intervals with O(log n) overlap checks."""
+
+    def __init__(self, busy: Sequence[Interval] = ()):
+        merged = merge(busy)
+        self.starts = [s for s, _ in merged]
+        self.ends = [e for _, e in merged]
+
+    def free(self, s: int, e: int) -> bool:
+        i = bisect.bisect_left(self.ends, s + 1)       # first interval ending after s
+        return i == len(self.starts) or self.starts[i] >= e
+
+    def add(self, s: int, e: int) -> None:
+        i = bisect.bisect_left(self.starts, s)
+        self.starts.insert(i, s)
+        self.ends.insert(i, e)
+
+
+def assign(
+    interviewers: Dict[str, Sequence[Interval]],
+    candidates: Dict[str, Sequence[Interval]],
+    start: int,
+    end: int,
+    duration: int,
+    step: Optional[int] = None,
+    tz: str = "UTC",
+    working_hours: Optional[str] = None,
+    weekdays_only: bool = False,
+    mode: str = "panel",
+    gap: int = 0,
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Spread candidates over the panel's free slots.
+
+    mode="panel": every interviewer attends each interview, so candidates get
+    distinct slots from the panel's common free time. mode="any": each
+    interview needs one interviewer; the least-loaded free one is picked.
+    Candidates with the fewest feasible slots are placed first, each in their
+    earliest feasible slot; `gap` seconds are kept free after each interview
+    for the interviewer(s). Returns (assignments, unassigned candidate ids).
+    """
+    if mode not in ("panel", "any"):
+        raise ValueError("mode must be 'panel' or 'any'")
+    step = step or DEFAULT_STEP
+    hours = off_hours(start, end, tz, working_hours, weekdays_only)
+    if mode == "panel":
+        base = merge_many(list(interviewers.values()) + [hours])
+    else:
+        base = merge(hours)
+    grid = split(complement(base, start, end), duration, step)
+
+    options = {}
+    for cid, busy in candidates.items():
+        booked = _Booked(busy)
+        options[cid] = [slot for slot in grid if booked.free(*slot)]
+
+    panel = {iid: _Booked(list(b) + hours) for iid, b in interviewers.items()}
+    load = {iid: 0 for iid in interviewers}
+    taken = _Booked()
+    out, unassigned = [], []
+    for cid in sorted(options, key=lambda c: (len(options[c]), c)):
+        placed = None
+        for s, e in options[cid]:
+            if mode == "panel":
+                if taken.free(s, e + gap):
+                    placed = (s, e, list(interviewers))
+                    taken.add(s, e + gap)
+            else:
+                free = [i for i in panel if panel[i].free(s, e + gap)]
+                if free:
+                    iid = min(free, key=lambda i: (load[i], i))
+                    panel[iid].add(s, e + gap)
+                    load[iid] += 1
+                    placed = (s, e, [iid])
+            if placed:
+                break
+        if placed:
+            out.append({"candidate": cid, "interviewers": placed[2], "start": placed[0], "end": placed[1]})
+        else:
+            unassigned.append(cid)
+    out.sort(key=lambda a: (a["start"], a["candidate"]))
+    return out, unassigned
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+from hirelens.configs.settings import settings
+from hirelens.services import metrics, parser, scorer, vectorstore
+
+UPLOADED = metrics.counter("hirelens_uploads_total", "Uploaded resume files by outcome.")
+
+# sha -> path of files saved by an upload but not yet in the parse cache, so
+# a second copy arriving before the index job ran is still caught.
+_pending: Dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def safe_name(filename: str) -> str:
+    """Basename of a client-supplied filename, stripped of any directory part."""
+    name = os.path.basename(filename.replace("\\", "/")).strip().lstrip(".")
+    return name or "upload"
+
+
+def _free_path(folder: str, name: str) -> str:
+    stem, ext = os.path.splitext(name)
+    path, n = os.path.join(folder, name), 1
+    while os.path.exists(path):
+        path = os.path.join(folder, f"{stem} ({n}){ext}")
+        n += 1
+    return path
+
+
+class _Receiver:
+    """
+    multipart/form-data callbacks that write each file part straight to a
+    temporary file in the resume folder, hashing it on the way. Nothing but
+    the current chunk is held in memory.
+    """
+
+    def __init__(self, folder: str, max_bytes: int):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.results: List[Dict] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._part: Optional[Dict] = None
+
+    def on_part_begin(self) -> None:
+        self._headers, self._part = {}, None
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field, self._value = b"", b""
+
+    def on_headers_finished(self) -> None:
+        from multipart.multipart import parse_options_header
+
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"filename" not in options:
+            return                                   # a plain form field; ignored
+        name = safe_name(options[b"filename"].decode("utf-8", "replace"))
+        part = {"filename": name, "bytes": 0, "sha": hashlib.sha1(), "error": None, "file": None}
+        if not name.lower().endswith(parser.ALLOWED_EXTS):
+            part["error"] = f"unsupported file type; allowed: {', '.join(parser.ALLOWED_EXTS)}"
+        else:
+            part["tmp"] = os.path.join(self.folder, f".upload-{uuid.uuid4().hex}.part")
+            part["file"] = open(part["tmp"], "wb")
+        self._part = part
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        part = self._part
+        if part is None or part["file"] is None:
+            return
+        chunk = data[start:end]
+        part["bytes"] += len(chunk)
+        if part["bytes"] > self.max_bytes:
+            part["error"] = f"file larger than {self.max_bytes} bytes"
+            self._discard(part)
+            return
+        part["sha"].update(chunk)
+        part["file"].write(chunk)
+
+    def on_part_end(self) -> None:
+        part, self._part = self._part, None
+        if part is None:
+            return
+        if part["error"]:
+            self._discard(part)
+            self.results.append({"filename": part["filename"], "status": "rejected", "error": part["error"]})
+            UPLOADED.inc(status="rejected")
+            return
+        part["file"].close()
+        self.results.append(_commit(self.folder, part["tmp"], part["filename"], part["sha"].hexdigest(), part["bytes"]))
+
+    def _discard(self, part: Dict) -> None:
+        if part.get("file") is not None:
+            part["file"].close()
+            part["file"] = None
+            os.remove(part["tmp"])
+
+    def abort(self) -> None:
+        if self._part is not None:
+            self._discard(self._part)
+
+
+def _commit(folder: str, tmp: str, filename: str, sha: str, size: int) -> Dict:
+    out = {"filename": filename, "sha": sha, "bytes": size}
+    with _lock:
+        existing = _pending.get(sha) or parser.known_path(folder, sha)
+        if existing and os.path.exists(existing):
+            os.remove(tmp)
+            UPLOADED.inc(status="duplicate")
+            return {**out, "status": "duplicate", "id": os.path.basename(existing)}
+        path = _free_path(folder, filename)
+        os.replace(tmp, path)
+        _pending[sha] = path
+    UPLOADED.inc(status="saved")
+    return {**out, "status": "saved", "id": os.path.basename(path)}
+
+
+async def receive(request, folder: Optional[str] = None) -> List[Dict]:
+    """
+    Stream the file parts of a multipart/form-data request into the resume
+    folder. Exact duplicates (same content hash as a file already there or
+    just uploaded) are dropped; name clashes with different content get a
+    " (n)" suffix. Returns one {"filename", "id", "status": saved | duplicate
+    | rejected, ...} per file part. Parsing and the disk writes it triggers
+    run in the threadpool, off the event loop.
+    """
+    from multipart.multipart import MultipartParser, parse_options_header
+    from starlette.concurrency import run_in_threadpool
+
+    ctype, options = parse_options_header(request.headers.get("content-type", ""))
+    if ctype != b"multipart/form-data" or b"boundary" not in options:
+        raise ValueError("expected a multipart/form-data body")
+    folder = str(folder or settings.RESUME_DIR)
+    os.makedirs(folder, exist_ok=True)
+    rx = _Receiver(folder, settings.UPLOAD_MAX_BYTES)
+    callbacks = {name: getattr(rx, name) for name in (
+        "on_part_begin", "on_part_data", "on_part_end", "on_header_field",
+        "on_header_value", "on_header_end", "on_headers_finished",
+    )}
+    mp = MultipartParser(options[b"boundary"], callbacks)
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(mp.write, chunk)
+        await run_in_threadpool(mp.finalize)
+    finally:
+        await run_in_threadpool(rx.abort)
+    return rx.results
+
+
+def release(paths: List[str]) -> None:
+    """
+    Forget uploaded files as pending, whether or not they were indexed: from
+    here on the parse cache is the only record of what is in the folder.
+    """
+    done = set(paths)
+    with _lock:
+        for sha in [s for s, p in _pending.items() if p in done]:
+            del _pending[sha]
+
+
+def index(paths: List[str], job=None) -> Dict:
+    """
+    Body of an upload's "index" job: extract and embed just these files into
+    the parse cache and the vector index, so the next scoring run only has to
+    stat the folder and featurize the new rows.
+    """
+    try:
+        items, stats = parser.ingest_files(paths)
+        if job is not None:
+            job.progress.update(parsed=len(items), total=len(items))
+            job.check_cancelled()
+        ok = [it for it, r in zip(items, stats) if not r["error"]]
+        vectorstore.get_store().sync(ok, scorer.embed_corpus, prune=False)
+        if job is not None:
+            job.progress.update(embedded=len(ok))
+    finally:
+        release(paths)
+    return {
+        "indexed": [it["id"] for it in ok],
+        "failed": [{"id": os.path.basename(r["path"]), "error": r["error"]} for r in stats if r["error"]],
+    }
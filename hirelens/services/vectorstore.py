@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from hirelens.configs.settings import settings
+from hirelens.services.embedding_backends import model_key
+
+
+class VectorStore:
+    """
+    Persistent FAISS inner-product index over normalized resume embeddings.
+
+    Vectors live in an IndexIDMap2 so they can be removed/replaced by int64 id;
+    a JSON sidecar (`<index>.ids.json`) maps those ids back to resume paths,
+    ids and content hashes, which is what makes incremental sync possible.
+    """
+
+    def __init__(self, index_path: str, model_name: str):
+        self.index_path = str(index_path)
+        self.meta_path = f"{self.index_path}.ids.json"
+        self.model_name = model_name
+        self.index = None                    # faiss.IndexIDMap2, created on first upsert
+        self.entries: Dict[str, Dict] = {}   # path -> {"vid", "id", "sha"}
+        self.next_vid = 0
+        self.dirty = False                   # in-memory changes not yet written by save()
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self) -> None:
+        if not (os.path.exists(self.index_path) and os.path.exists(self.meta_path)):
+            return
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("model") != self.model_name:
+                print(f"[vectorstore] model changed ({meta.get('model')} -> {self.model_name}), rebuilding index")
+                return
+            import faiss
+
+            self.index = faiss.read_index(self.index_path)
+            self.entries = meta.get("entries", {})
+            self.next_vid = int(meta.get("next_vid", 0))
+        except Exception as e:
+            print(f"[vectorstore] ignoring unreadable index {self.index_path}: {e}")
+            self.index, self.entries, self.next_vid = None, {}, 0
+
+    def save(self) -> None:
+        with self._lock:
+            if self.index is None:
+                return
+            import faiss
+
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            faiss.write_index(self.index, f"{self.index_path}.tmp")
+            os.replace(f"{self.index_path}.tmp", self.index_path)
+            with open(f"{self.meta_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "next_vid": self.next_vid, "entries": self.entries}, f)
+            os.replace(f"{self.meta_path}.tmp", self.meta_path)
+            self.dirty = False
+
+    def __len__(self) -> int:
+        return 0 if self.index is None else int(self.index.ntotal)
+
+    def _ensure_index(self, dim: int) -> None:
+        if self.index is None:
+            import faiss
+
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+
+    def upsert(self, items: List[Dict], vectors: np.ndarray) -> None:
+        """
+        Add or replace vectors for `items` (dicts with path/id/sha, as returned
+        by parser.load_resumes). `vectors` must be L2-normalized, one row per item.
+        """
+        if not items:
+            return
+        vecs = np.ascontiguousarray(vectors, dtype="float32")
+        with self._lock:
+            self._ensure_index(vecs.shape[1])
+            self.remove([it["path"] for it in items])
+            vids = np.arange(self.next_vid, self.next_vid + len(items), dtype="int64")
+            self.next_vid += len(items)
+            self.index.add_with_ids(vecs, vids)
+            self.dirty = True
+            for it, vid in zip(items, vids):
+                self.entries[it["path"]] = {"vid": int(vid), "id": it["id"], "sha": it["sha"]}
+
+    def remove(self, paths: List[str]) -> None:
+        with self._lock:
+            vids = [self.entries.pop(p)["vid"] for p in paths if p in self.entries]
+            if vids and self.index is not None:
+                self.index.remove_ids(np.asarray(vids, dtype="int64"))
+                self.dirty = True
+
+    def sync(
+        self,
+        items: List[Dict],
+        embed_fn: Callable[[List[str]], np.ndarray],
+        prune: bool = True,
+        save: bool = True,
+    ) -> bool:
+        """
+        Bring the index in line with the loaded corpus: embed only new or
+        changed resumes and (with `prune`) drop the ones that disappeared.
+        Pass prune=False to sync a slice of the corpus, and save=False to
+        defer writing the index when syncing many slices in a row (call
+        save() at the end; the next saving sync also writes pending changes).
+        Returns True if anything changed.
+        """
+        with self._lock:
+            current = {it["path"] for it in items}
+            stale = [p for p in self.entries if p not in current] if prune else []
+            changed = [it for it in items if self.entries.get(it["path"], {}).get("sha") != it["sha"]]
+            if stale or changed:
+                self.remove(stale)
+                if changed:
+                    self.upsert(changed, embed_fn([it["text"] for it in changed]))
+                self.dirty = True
+            if save and self.dirty:
+                self.save()
+            return bool(stale or changed)
+
+    def vectors(self, paths: List[str]) -> np.ndarray:
+        """
+        Stored vectors for `paths` (all must be indexed), one row per path.
+        """
+        with self._lock:
+            if not paths:
+                return np.zeros((0, self.index.d if self.index is not None else 0), dtype="float32")
+            return np.vstack([self.index.reconstruct(self.entries[p]["vid"]) for p in paths])
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """
+        Top-k (path, inner product) neighbours of a normalized query vector.
+        """
+        with self._lock:
+            if not len(self) or k <= 0:
+                return []
+            by_vid = {e["vid"]: p for p, e in self.entries.items()}
+            q = np.ascontiguousarray(query, dtype="float32").reshape(1, -1)
+            scores, vids = self.index.search(q, min(k, len(self)))
+        return [(by_vid[int(v)], float(s)) for s, v in zip(scores[0], vids[0]) if v != -1]
+
+    def similarities(self, query: np.ndarray, paths: List[str]) -> np.ndarray:
+        """
+        Similarity of the query to each of `paths`, in that order, using one
+        index search. Paths that are not indexed get 0.
+        """
+        hits = dict(self.search(query, len(self)))
+        return np.asarray([hits.get(p, 0.0) for p in paths], dtype="float32")
+
+
+@lru_cache(maxsize=1)
+def get_store(index_path: Optional[str] = None, model_name: Optional[str] = None) -> VectorStore:
+    """
+    Process-wide VectorStore, loaded from settings.INDEX_PATH on first use.
+    """
+    return VectorStore(index_path or str(settings.INDEX_PATH), model_name or model_key(settings.EMBEDDING_MODEL))
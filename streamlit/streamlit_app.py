@@ -1,6 +1,7 @@
 import os
 import json
 import time
+import hashlib
 import datetime as dt
 from pathlib import Path
 from typing import List, Dict, Any
@@ -11,6 +12,7 @@ import streamlit as st
 from streamlit_lottie import st_lottie
 import os, streamlit as st
 API_DEFAULT = st.secrets.get("API_BASE", "http://127.0.0.1:8000")
+UPLOAD_BATCH = 50
 DATA_DIR = Path("data")
 RESUME_DIR = DATA_DIR / "resumes"
 JD_FILE = DATA_DIR / "jd" / "jd.txt"
@@ -88,6 +90,10 @@ if clear:
         except: pass
     st.sidebar.success("Cleared resumes folder.")
 
+def jd_key(text: str) -> str:
+    """Stable JD id from its text, so feedback on different JDs trains different models."""
+    return "jd-" + hashlib.sha1(" ".join(text.split()).lower().encode("utf-8")).hexdigest()[:12]
+
 @st.cache_data(show_spinner=False)
 def load_lottie(url: str) -> Optional[Dict[str, Any]]:
     try:
@@ -150,16 +156,35 @@ with tab1:
     with right:
         st.subheader("2) Resumes")
         up = st.file_uploader(
-            "Upload PDFs / DOCX / TXT (stored in data/resumes)",
+            "Upload PDFs / DOCX / TXT (sent to the API's resume folder)",
             type=["pdf", "docx", "txt"],
             accept_multiple_files=True,
         )
-        if up:
-            for f in up:
-                (RESUME_DIR / f.name).write_bytes(f.read())
-            st.success(f"Uploaded {len(up)} file(s).")
+        sent = st.session_state.setdefault("uploaded", set())
+        new = [f for f in up or [] if (f.name, f.size) not in sent]
+        if new:
+            counts = {"saved": 0, "duplicate": 0, "rejected": 0}
+            try:
+                # A few dozen files per request keeps each body small; the API indexes each batch in the background.
+                for i in range(0, len(new), UPLOAD_BATCH):
+                    batch = new[i:i + UPLOAD_BATCH]
+                    r = requests.post(
+                        f"{api_base}/resumes",
+                        files=[("files", (f.name, f.getvalue(), f.type or "application/octet-stream")) for f in batch],
+                        timeout=(10, 300),
+                    )
+                    r.raise_for_status()
+                    for k in counts:
+                        counts[k] += r.json()[k]
+                    sent.update((f.name, f.size) for f in batch)
+                st.success(f"Uploaded {counts['saved']} file(s); {counts['duplicate']} duplicate(s) skipped, {counts['rejected']} rejected.")
+            except Exception as e:
+                st.error(f"Error calling /resumes: {e}")
         with st.expander("Files in folder", expanded=False):
-            items = [p.name for p in RESUME_DIR.glob("*") if p.is_file()]
+            try:
+                items = requests.get(f"{api_base}/resumes", timeout=10).json()["resumes"]
+            except Exception:
+                items = [p.name for p in RESUME_DIR.glob("*") if p.is_file()]
             st.write(items if items else "— none —")
 
     st.markdown("<hr/>", unsafe_allow_html=True)
@@ -173,34 +198,56 @@ with tab1:
         if not jd_text.strip():
             st.error("Please paste the JD first.")
         else:
-            with st.spinner("Scoring resumes… first time may take ~30–60s to download the embedding model"):
-                if LOTTIE_SCAN:
-                    st_lottie(LOTTIE_SCAN, height=120, key="scan")
-
-                try:
-                    r = requests.post(
-                        f"{api_base}/ingest/score",
-                        json={"id": "jd-ui", "title": "UI JD", "text": jd_text},
-                        timeout=300
-                    )
+            if LOTTIE_SCAN:
+                st_lottie(LOTTIE_SCAN, height=120, key="scan")
+            progress = st.progress(0, text="Scoring resumes… first time may take ~30–60s to download the embedding model")
+            table = st.empty()
+            scores, top, result_id = [], [], None
+            try:
+                with requests.post(
+                    f"{api_base}/ingest/score/stream",
+                    params={"top_n": top_n},
+                    json={"id": jd_key(jd_text), "title": "UI JD", "text": jd_text},
+                    stream=True,
+                    timeout=(10, 300),
+                ) as r:
                     r.raise_for_status()
-                    scores = r.json()
-                except Exception as e:
-                    st.error(f"Error calling /ingest/score: {e}")
-                    scores = []
+                    for line in r.iter_lines():
+                        if not line:
+                            continue
+                        rec = json.loads(line)
+                        if rec["type"] == "batch":
+                            scores.extend(rec["items"])
+                            progress.progress(
+                                min(rec["scored"] / max(rec["total"], 1), 1.0),
+                                text=f"Scored {rec['scored']} / {rec['total']} resumes",
+                            )
+                            live = pd.DataFrame(scores).sort_values("score", ascending=False)
+                            table.dataframe(live[["name", "score", "reasoning"]], hide_index=True, use_container_width=True)
+                        elif rec["type"] == "done":
+                            top, result_id = rec["top"], rec.get("result_id")
+                            st.session_state["result_id"] = result_id
+                            st.session_state["jd_id"] = jd_key(jd_text)
+            except Exception as e:
+                st.error(f"Error calling /ingest/score/stream: {e}")
+            progress.empty()
+            table.empty()
 
             if scores:
-                try:
-                    r2 = requests.post(
-                        f"{api_base}/shortlist",
-                        json={"scores": scores, "top_n": top_n},
-                        timeout=60
-                    )
-                    r2.raise_for_status()
-                    top = r2.json()
-                except Exception as e:
-                    st.warning(f"Could not call /shortlist: {e}. Showing the top {top_n} locally.")
+                if result_id:
+                    try:
+                        r2 = requests.post(
+                            f"{api_base}/shortlist",
+                            json={"result_id": result_id, "top_n": top_n},
+                            timeout=60
+                        )
+                        r2.raise_for_status()
+                        top = r2.json()
+                    except Exception as e:
+                        st.warning(f"Could not call /shortlist: {e}. Showing the streamed top {top_n}.")
+                if not top:
                     top = sorted(scores, key=lambda x: x["score"], reverse=True)[:top_n]
+                scores = sorted(scores, key=lambda x: x["score"], reverse=True)
 
                 st.markdown("##### All candidates")
                 df = pd.DataFrame(scores)
@@ -227,8 +274,8 @@ with tab1:
                 st.warning("No scores returned. Ensure resumes exist in data/resumes and the JD is not empty.")
 
 with tab2:
-    st.subheader("Lightweight Learning — nudge weights with feedback")
-    st.caption("Mark candidates as good/poor fit. Weights update slightly; re-run scoring to see changes.")
+    st.subheader("Lightweight Learning — learn weights from feedback")
+    st.caption("Mark candidates from the last scoring run as good/poor fit. Labels are logged and the weights for this JD are re-learned; re-run scoring to see changes.")
 
     col1, col2 = st.columns(2)
     gf = col1.text_input("👍 Good fit resume_id(s), comma-separated", placeholder="resume.pdf")
@@ -244,7 +291,7 @@ with tab2:
             st.info("No feedback provided.")
         else:
             try:
-                r = requests.post(f"{api_base}/feedback/update-weights", json={"feedback": items}, timeout=60)
+                r = requests.post(f"{api_base}/feedback/update-weights", json={"feedback": items, "jd_id": st.session_state.get("jd_id") or jd_key(jd_text), "result_id": st.session_state.get("result_id")}, timeout=60)
                 r.raise_for_status()
                 st.success("Weights updated")
                 if LOTTIE_THINK: st_lottie(LOTTIE_THINK, height=120, key="learn")
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from hirelens.configs.settings import settings
+from hirelens.services import ann
+
+
+def _corpus(n=2000, d=32, seed=0):
+    x = np.random.default_rng(seed).standard_normal((n, d)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def test_choose_kind_by_corpus_size(monkeypatch):
+    monkeypatch.setattr(settings, "ANN_INDEX", "auto")
+    assert ann.choose_kind(settings.ANN_FLAT_MAX - 1) == "flat"
+    assert ann.choose_kind(settings.ANN_FLAT_MAX) == "ivf"
+    assert ann.choose_kind(settings.ANN_HNSW_MIN) == "hnsw"
+    assert ann.choose_kind(10, "hnsw") == "hnsw"
+    with pytest.raises(ValueError):
+        ann.choose_kind(10, "lsh")
+
+
+@pytest.mark.parametrize("kind", ann.KINDS)
+def test_ann_recall_against_exact(kind):
+    x = _corpus()
+    q = x[7]
+    idx = ann.AnnIndex(x, kind)
+    rows, sims = idx.search(q, 50)
+    exact = np.argsort(-(x @ q))[:50]
+    assert rows[0] == 7 and sims[0] == pytest.approx(1.0, abs=1e-5)
+    assert len(set(rows.tolist()) & set(exact.tolist())) / 50 >= (1.0 if kind == "flat" else 0.5)
+
+
+def test_index_cached_per_version():
+    calls = []
+    build = lambda: calls.append(1) or _corpus(100)
+    a = ann.get_index(build, "v-ann", "flat")
+    assert ann.get_index(build, "v-ann", "flat") is a and len(calls) == 1
+
+
+def test_build_does_not_block_other_versions():
+    import threading
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return _corpus(100)
+
+    out = {}
+    t = threading.Thread(target=lambda: out.update(slow=ann.get_index(slow, "v-slow", "flat")))
+    t.start()
+    assert started.wait(5)
+    cached = ann.get_index(lambda: _corpus(50), "v-fast", "flat")   # served while v-slow builds
+    assert cached.n == 50 and t.is_alive()
+    release.set()
+    t.join(5)
+    assert out["slow"].n == 100
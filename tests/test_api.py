@@ -0,0 +1,293 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from hirelens.configs.settings import settings
+from hirelens.learning import online
+from hirelens.services import featurestore, parser, scorer, vectorstore
+
+from test_scoring import _fake_embed
+
+JD = {"id": "jd-1", "title": "Backend", "text": "python fastapi docker, 3 years"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    for i in range(5):
+        (resumes / f"cv{i}.txt").write_text(f"{i + 1} years python" + (" fastapi docker" if i % 2 else ""))
+    monkeypatch.setattr(settings, "RESUME_DIR", resumes)
+    monkeypatch.setattr(settings, "OUTPUT_DIR", tmp_path / "outputs")
+    monkeypatch.setattr(settings, "INDEX_PATH", tmp_path / "outputs" / "faiss.index")
+    monkeypatch.setattr(scorer, "embed_texts", _fake_embed)
+    monkeypatch.setattr(parser, "_caches", {})
+    monkeypatch.setattr(scorer, "_feature_runs", type(scorer._feature_runs)())
+    vectorstore.get_store.cache_clear()
+    featurestore.get_store.cache_clear()
+    online.get_learner.cache_clear()
+
+    from hirelens.api import main
+    monkeypatch.setattr(main.app.router, "on_startup", [])
+    yield TestClient(main.app)
+    vectorstore.get_store.cache_clear()
+    featurestore.get_store.cache_clear()
+    online.get_learner.cache_clear()
+
+
+def test_ingest_score_ranks_whole_corpus(client):
+    r = client.post("/ingest/score", json=JD)
+    assert r.status_code == 200
+    scores = [c["score"] for c in r.json()]
+    assert len(scores) == 5 and scores == sorted(scores, reverse=True)
+
+
+def test_stream_matches_batch_scoring(client):
+    with client.stream("POST", "/ingest/score/stream", params={"batch_size": 2, "top_n": 3}, json=JD) as r:
+        records = [json.loads(line) for line in r.iter_lines() if line]
+    full = client.post("/ingest/score", json=JD).json()
+    batches = [rec for rec in records if rec["type"] == "batch"]
+    assert [b["scored"] for b in batches] == [2, 4, 5]
+    assert records[-1]["type"] == "done"
+    assert records[-1]["top"] == full[:3]
+    streamed = sorted((c for b in batches for c in b["items"]), key=lambda c: c["resume_id"])
+    assert streamed == sorted(full, key=lambda c: c["resume_id"])
+
+
+def test_score_job_endpoints(client, monkeypatch, tmp_path):
+    from hirelens.services import jobs
+
+    manager = jobs.JobManager(workers=1, max_queue=2, ttl_s=60, results_dir=tmp_path / "jobs")
+    monkeypatch.setattr(jobs, "get_manager", lambda: manager)
+    r = client.post("/jobs/score", params={"top_n": 2}, json=JD)
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+    for _ in range(500):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] == "succeeded":
+            break
+        time.sleep(0.01)
+    assert job["progress"] == {"total": 5, "parsed": 5, "embedded": 5, "scored": 5}
+
+    # "parsed" counts corpus files; "total" is what passed the prefilter.
+    job_id = client.post("/jobs/score", json={**JD, "must_have": ["FastAPI"], "min_years": 3}).json()["job_id"]
+    for _ in range(500):
+        if client.get(f"/jobs/{job_id}").json()["status"] == "succeeded":
+            break
+        time.sleep(0.01)
+    assert client.get(f"/jobs/{job_id}").json()["progress"] == {"parsed": 5, "total": 1, "embedded": 1, "scored": 1}
+    assert job["result"] == client.post("/ingest/score", json=JD).json()[:2]
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.delete(f"/jobs/{job_id}").status_code == 409
+
+
+def test_shortlist_by_result_id(client):
+    r = client.post("/ingest/score", json=JD)
+    full = r.json()
+    result_id = r.headers["X-Result-Id"]
+    top = client.post("/shortlist", json={"result_id": result_id, "top_n": 2}).json()
+    assert top == full[:2]
+    assert client.post("/shortlist", json={"scores": full[::-1], "top_n": 2}).json() == full[:2]
+    assert client.post("/shortlist", json={"result_id": "missing"}).status_code == 404
+    assert client.post("/shortlist", json={"top_n": 2}).status_code == 422
+
+
+def test_batch_scoring_matches_per_jd_scoring(client, monkeypatch):
+    jds = [
+        JD,
+        {"id": "jd-2", "title": "Infra", "text": "docker kubernetes 5 years, masters preferred"},
+        {"id": "jd-3", "title": "Data", "text": "sql pandas etl"},
+    ]
+    calls = []
+
+    def counting_embed(texts, model_name, batch_size=32):
+        calls.append(len(texts))
+        return _fake_embed(texts, model_name, batch_size)
+
+    monkeypatch.setattr(scorer, "embed_texts", counting_embed)
+    batch = client.post("/ingest/score/batch", json={"jds": jds, "top_n": 3}).json()
+    assert calls == [5, 3]           # corpus once, all JDs in one batch
+    assert [b["jd_id"] for b in batch] == ["jd-1", "jd-2", "jd-3"]
+
+    monkeypatch.setattr(scorer, "_feature_runs", type(scorer._feature_runs)())
+    for jd, res in zip(jds, batch):
+        single = client.post("/ingest/score", json=jd).json()[:3]
+        assert [c["resume_id"] for c in res["candidates"]] == [c["resume_id"] for c in single]
+        for a, b in zip(res["candidates"], single):
+            assert a["score"] == pytest.approx(b["score"], abs=0.11)
+        top1 = client.post("/shortlist", json={"result_id": res["result_id"], "top_n": 1}).json()
+        assert top1[0]["resume_id"] == res["candidates"][0]["resume_id"]
+
+
+def test_must_have_and_min_years_prefilter_before_embedding(client, monkeypatch):
+    embedded = []
+
+    def counting_embed(texts, model_name, batch_size=32):
+        embedded.extend(texts)
+        return _fake_embed(texts, model_name, batch_size)
+
+    monkeypatch.setattr(scorer, "embed_texts", counting_embed)
+    jd = {**JD, "must_have": ["FastAPI"], "min_years": 3}
+    out = client.post("/ingest/score", json=jd).json()
+    assert sorted(c["resume_id"] for c in out) == ["cv3.txt"]
+    assert len(embedded) == 1 + 1      # only the eligible resume, plus the JD
+
+    with client.stream("POST", "/ingest/score/stream", json={**jd, "min_years": 1}) as r:
+        records = [json.loads(line) for line in r.iter_lines() if line]
+    assert records[-1]["total"] == 2
+
+
+def test_nice_to_have_adds_bonus(client):
+    plain = {c["resume_id"]: c for c in client.post("/ingest/score", json=JD).json()}
+    bonus = {c["resume_id"]: c for c in client.post("/ingest/score", json={**JD, "nice_to_have": ["docker"]}).json()}
+    assert bonus["cv1.txt"]["breakdown"]["nice_to_have"] == 100.0
+    assert bonus["cv1.txt"]["score"] == pytest.approx(plain["cv1.txt"]["score"] + 5.0, abs=0.11)
+    assert bonus["cv0.txt"]["score"] == plain["cv0.txt"]["score"]
+
+
+def test_search_two_stage_with_diagnostics(client):
+    r = client.post("/search", json={"jd": JD, "recall_k": 3, "top_n": 2, "debug": True})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["index"] == "flat" and body["corpus"] == 5
+    assert body["recalled"] == 3 and len(body["candidates"]) == 2
+    assert body["diagnostics"]["ann_recall"] == 1.0
+    assert 0.0 <= body["diagnostics"]["top_n_recall"] <= 1.0
+    top = client.post("/shortlist", json={"result_id": body["result_id"], "top_n": 2}).json()
+    assert [c["resume_id"] for c in top] == [c["resume_id"] for c in body["candidates"]]
+
+    # must_have leaves cv1 and cv3; only one of them is recalled.
+    body = client.post("/search", json={"jd": {**JD, "must_have": ["FastAPI"]}, "recall_k": 1, "top_n": 1}).json()
+    assert body["index"] == "exact" and body["eligible"] == 2 and body["recalled"] == 1
+
+
+def test_metrics_and_profiling_header(client):
+    from hirelens.api.main import REQUESTS
+
+    parsed, served = parser.FILES_PARSED.value(), REQUESTS.value(method="POST", route="/ingest/score", status=200)
+    r = client.post("/ingest/score", json=JD, headers={"X-Profile": "1"})
+    assert r.status_code == 200 and r.headers["X-Result-Id"]
+    stages = {part.split(";")[0] for part in r.headers["Server-Timing"].split(", ")}
+    assert {"parse", "embed", "features", "score", "serialize", "total"} <= stages
+    assert "Server-Timing" not in client.post("/ingest/score", json=JD).headers
+
+    assert parser.FILES_PARSED.value() == parsed + 5
+    assert REQUESTS.value(method="POST", route="/ingest/score", status=200) == served + 2
+    text = client.get("/metrics").text
+    assert 'hirelens_http_requests_total{method="POST",route="/ingest/score",status="200"}' in text
+    assert 'hirelens_stage_seconds_count{stage="features"}' in text
+
+
+def test_feedback_learns_per_jd_weights(client):
+    r = client.post("/ingest/score", json=JD)
+    rid, ranked = r.headers["X-Result-Id"], r.json()
+    before = client.get("/feedback/weights", params={"jd_id": "jd-1"}).json()
+    assert before["source"] == "default"
+
+    # Recruiter only cares about skills: the fastapi/docker CVs are good fits.
+    labels = [
+        {"resume_id": c["resume_id"], "label": "good_fit" if c["breakdown"]["skills"] > 50 else "poor_fit"}
+        for c in ranked
+    ]
+    for _ in range(3):
+        out = client.post("/feedback/update-weights", json={"feedback": labels, "result_id": rid}).json()
+    assert out["jd_id"] == "jd-1" and out["learned"] == 5
+    assert out["new"]["skills"] > out["old"]["skills"]
+
+    after = client.get("/feedback/weights", params={"jd_id": "jd-1"}).json()
+    assert after["source"] == "jd" and after["labels"]["jd-1"] == 15
+    rerank = client.post("/rerank", json={"jd": JD})
+    assert rerank.status_code == 200
+
+    # No result_id: joined to the latest run for the JD; unknown ids are logged only.
+    out = client.post("/feedback", json={"feedback": [{"resume_id": "nope", "label": "good_fit"}], "jd_id": "jd-1"}).json()
+    assert out["result_id"] == rerank.headers["X-Result-Id"] and out["logged"] == 1 and out["learned"] == 0
+    assert client.post("/feedback", json={"feedback": labels, "result_id": "expired"}).status_code == 404
+
+
+def test_near_duplicate_resumes_are_scored_once(client):
+    text = "Senior backend engineer, 6 years python fastapi docker kubernetes, led payments platform team at acme"
+    (settings.RESUME_DIR / "jane.txt").write_text(text)
+    (settings.RESUME_DIR / "jane (agency).txt").write_text(text.replace("acme", "acme corp"))
+    ranked = client.post("/ingest/score", json=JD).json()
+    ids = [c["resume_id"] for c in ranked]
+    assert len(ranked) == 6 and len({"jane.txt", "jane (agency).txt"} & set(ids)) == 1
+    dup = next(c for c in ranked if c["duplicates"])
+    assert dup["duplicates"] == [({"jane.txt", "jane (agency).txt"} - {dup["resume_id"]}).pop()]
+
+    corpus = client.get("/corpus").json()
+    assert corpus["count"] == 7 and corpus["duplicates"]["unique"] == 6
+
+
+def _wait_job(client, job_id):
+    for _ in range(1000):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_upload_streams_dedups_and_indexes(client, monkeypatch, tmp_path):
+    from hirelens.services import jobs
+
+    manager = jobs.JobManager(workers=1, max_queue=2, ttl_s=60, results_dir=tmp_path / "jobs")
+    monkeypatch.setattr(jobs, "get_manager", lambda: manager)
+    client.post("/ingest/score", json=JD)                  # the existing corpus is parsed and cached
+
+    files = [("files", (f"new{i}.txt", f"{i + 2} years python fastapi docker, upload {i}".encode(), "text/plain")) for i in range(500)]
+    files += [
+        ("files", ("../../cv0.txt", b"1 years python", "text/plain")),          # same bytes as cv0.txt
+        ("files", ("copy.txt", b"2 years python fastapi docker, upload 0", "text/plain")),
+        ("files", ("photo.png", b"\x89PNG", "image/png")),
+    ]
+    r = client.post("/resumes", files=files)
+    assert r.status_code == 202
+    out = r.json()
+    assert (out["saved"], out["duplicate"], out["rejected"]) == (500, 2, 1)
+    assert [f["id"] for f in out["files"][500:502]] == ["cv0.txt", "new0.txt"]
+    assert not list(settings.RESUME_DIR.glob(".upload-*"))
+    job = _wait_job(client, out["job_id"])
+    assert job["status"] == "succeeded" and len(job["result"]["indexed"]) == 500
+
+    # Scoring now only stats the folder: nothing left to extract or embed.
+    extracted, embedded = [], []
+    real_extract = parser.extract_many
+    monkeypatch.setattr(parser, "extract_many", lambda paths, *a: extracted.extend(paths) or real_extract(paths, *a))
+    monkeypatch.setattr(scorer, "embed_texts", lambda texts, *a, **k: embedded.extend(texts) or _fake_embed(texts, *a, **k))
+    ranked = client.post("/ingest/score", json=JD).json()
+    assert len(ranked) == 505 and extracted == [] and len(embedded) == 1      # just the JD
+    assert client.get("/resumes").json()["count"] == 505
+    assert client.post("/resumes", content=b"x", headers={"content-type": "text/plain"}).status_code == 400
+
+
+def test_failed_or_unqueued_index_job_releases_pending_uploads(client, monkeypatch, tmp_path):
+    from hirelens.services import jobs
+
+    manager = jobs.JobManager(workers=1, max_queue=2, ttl_s=60, results_dir=tmp_path / "jobs")
+    monkeypatch.setattr(jobs, "get_manager", lambda: manager)
+    monkeypatch.setattr(parser, "ingest_files", lambda paths: 1 / 0)
+    upload = [("files", ("new.txt", b"9 years python", "text/plain"))]
+    out = client.post("/resumes", files=upload).json()
+    assert _wait_job(client, out["job_id"])["status"] == "failed"
+    # Never indexed, so the same bytes are not reported as a duplicate of it.
+    assert client.post("/resumes", files=upload).json()["files"][0]["status"] == "saved"
+
+    def full(*a, **k):
+        raise jobs.QueueFull("full")
+
+    monkeypatch.setattr(manager, "submit", full)
+    upload = [("files", ("other.txt", b"10 years python", "text/plain"))]
+    assert client.post("/resumes", files=upload).json()["job_id"] is None
+    assert client.post("/resumes", files=upload).json()["files"][0]["status"] == "saved"
+
+
+def test_stream_writes_the_vector_index_once(client, monkeypatch):
+    saves = []
+    real_save = vectorstore.VectorStore.save
+    monkeypatch.setattr(vectorstore.VectorStore, "save", lambda self: saves.append(len(self)) or real_save(self))
+    lines = client.post("/ingest/score/stream", params={"batch_size": 2}, json=JD).text.splitlines()
+    assert len(lines) == 4 and saves == [5]
+    assert vectorstore.VectorStore(str(settings.INDEX_PATH), vectorstore.get_store().model_name).entries.keys() == vectorstore.get_store().entries.keys()
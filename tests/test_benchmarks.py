@@ -0,0 +1,28 @@
+import json
+
+from benchmarks import corpus, stages
+from hirelens.services import parser, scorer
+
+
+def test_corpus_is_deterministic_and_readable(tmp_path):
+    a = corpus.generate(str(tmp_path / "a"), 6, ["txt", "docx", "pdf"], words=60, jds=2)
+    b = corpus.generate(str(tmp_path / "b"), 6, ["txt", "docx", "pdf"], words=60, jds=2)
+    texts = [parser.read_file(p) for p in a["resumes"]]
+    assert all("years of experience" in t for t in texts)
+    assert texts == [parser.read_file(p) for p in b["resumes"]]
+    jd = json.load(open(a["jds"][0]))
+    assert jd["must_have"] and jd["text"]
+
+
+def test_run_stages_and_compare(tmp_path, monkeypatch):
+    monkeypatch.setattr(scorer, "embed_texts", stages.stub_embed)
+    out = corpus.generate(str(tmp_path), 20, ["txt"], words=50, jds=2)
+    jds = [json.load(open(p)) for p in out["jds"]]
+    timings = stages.run_stages(str(tmp_path / "resumes"), jds)
+    assert set(timings) == set(stages.STAGES)
+
+    report = {"results": {"20": timings}}
+    slower = {"results": {"20": {**timings, "scoring": timings["scoring"] * 3 + 1.0}}}
+    assert stages.compare(report, report, 0.1, 0.0) == []
+    flagged = stages.compare(slower, report, 0.1, 0.0)
+    assert len(flagged) == 1 and "scoring" in flagged[0]
@@ -0,0 +1,74 @@
+import os
+import time
+
+import numpy as np
+
+from hirelens.services import dedup
+
+
+def _text(seed, n=300):
+    rng = np.random.default_rng(seed)
+    words = [f"w{i}" for i in range(2000)]
+    return " ".join(rng.choice(words, n))
+
+
+def _item(name, text, folder=None):
+    path = os.path.join(folder, name) if folder else name
+    if folder:
+        with open(path, "w") as f:
+            f.write(text)
+    return {"id": name, "name": name, "path": path, "text": text, "sha": str(hash(text))}
+
+
+def _edit(text, every=60):
+    words = text.split()
+    return " ".join("changed" if i % every == 0 else w for i, w in enumerate(words))
+
+
+def test_near_duplicates_cluster_and_newest_is_kept(tmp_path):
+    base = _text(1)
+    items = [
+        _item("old.txt", base, tmp_path),
+        _item("other.txt", _text(2), tmp_path),
+        _item("agency copy.txt", base.upper() + "!", tmp_path),
+        _item("empty.txt", "", tmp_path),
+        _item("empty2.txt", "", tmp_path),
+    ]
+    os.utime(items[0]["path"], (1, 1))
+    time.sleep(0.01)
+    items.append(_item("reapplied.txt", _edit(base), tmp_path))
+
+    reps, clusters = dedup.collapse(items)
+    assert [r["id"] for r in reps] == ["other.txt", "empty.txt", "empty2.txt", "reapplied.txt"]
+    assert sorted(reps[-1]["duplicates"]) == ["agency copy.txt", "old.txt"]
+    assert clusters == [{"representative": "reapplied.txt", "members": ["old.txt", "agency copy.txt", "reapplied.txt"]}]
+
+
+def test_threshold_separates_heavier_edits():
+    base = _text(3)
+    sigs = [dedup.minhash(dedup.shingles(t)) for t in (base, _edit(base, 60), _edit(base, 4))]
+    assert np.mean(sigs[0] == sigs[1]) > 0.8 > np.mean(sigs[0] == sigs[2])
+    assert dedup.clusters(sigs) == [[0, 1]]
+
+
+def test_lsh_scales_to_large_corpora():
+    rng = np.random.default_rng(0)
+    n = 100_000
+    sigs = list(rng.integers(0, 1 << 32, (n, 128), dtype="uint64").astype("uint32"))
+    for i in range(0, 1000, 2):                 # 500 planted pairs, ~10% of positions edited
+        sigs[i + 1] = sigs[i].copy()
+        sigs[i + 1][rng.choice(128, 12, replace=False)] = 7
+    t0 = time.perf_counter()
+    groups = dedup.clusters(sigs)
+    assert time.perf_counter() - t0 < 10
+    assert sorted(map(sorted, groups)) == [[i, i + 1] for i in range(0, 1000, 2)]
+
+
+def test_collapse_reuses_the_result_for_the_same_version(monkeypatch):
+    dedup.collapse([_item("gone.txt", _text(3))])       # leaves a signature the next call prunes
+    items = [_item("a.txt", _text(4)), _item("b.txt", _text(5))]
+    first = dedup.collapse(items, "v-dedup")
+    calls = []
+    real = dedup.clusters
+    monkeypatch.setattr(dedup, "clusters", lambda sigs: calls.append(1) or real(sigs))
+    assert dedup.collapse(items, "v-dedup") == first and not calls
@@ -0,0 +1,54 @@
+import threading
+
+import numpy as np
+import pytest
+
+from hirelens.services.embeddings import EmbeddingDispatcher
+
+
+def _encode(calls):
+    def encode(texts, batch_size):
+        calls.append(len(texts))
+        return np.asarray([[float(t.split("-")[0]), float(t.split("-")[1])] for t in texts], dtype="float32")
+    return encode
+
+
+def test_concurrent_callers_share_batches_and_get_their_rows():
+    calls = []
+    d = EmbeddingDispatcher(_encode(calls), max_batch=64, max_wait_s=0.05)
+    out, barrier = {}, threading.Barrier(8)
+
+    def caller(i):
+        barrier.wait()
+        out[i] = d.embed([f"{i}-{j}" for j in range(3)])
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for i in range(8):
+        assert out[i].tolist() == [[i, j] for j in range(3)]
+    assert sum(calls) == 24 and len(calls) < 8
+    stats = d.stats()
+    assert stats["requests"] == 8 and stats["texts"] == 24
+    assert stats["requests_per_batch"] > 1 and stats["queue_wait_ms_mean"] >= 0
+
+
+def test_flushes_at_max_batch_and_propagates_errors():
+    calls = []
+    d = EmbeddingDispatcher(_encode(calls), max_batch=2, max_wait_s=10.0)
+    assert d.embed(["1-1", "2-2"]).shape == (2, 2)    # full batch: no 10 s wait
+    d = EmbeddingDispatcher(_encode(calls), max_batch=2, max_wait_s=0.0)
+    with pytest.raises(ValueError):
+        d.embed(["not-a-number"])
+    assert d.embed(["3-3"]).tolist() == [[3, 3]]      # worker survives a failed batch
+
+
+def test_callers_batch_size_reaches_the_model():
+    sizes = []
+    d = EmbeddingDispatcher(lambda texts, bs: sizes.append(bs) or np.zeros((len(texts), 2), dtype="float32"),
+                            max_batch=64, max_wait_s=0.0)
+    d.embed(["1-1"], batch_size=8)
+    d.embed(["2-2"])
+    assert sizes == [8, 64]
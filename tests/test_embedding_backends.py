@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from hirelens.configs.settings import settings
+from hirelens.services import embedding_backends
+
+pytest.importorskip("torch")
+pytest.importorskip("onnxruntime")
+
+WORDS = "python fastapi docker kubernetes sql aws react node data models senior engineer years team led built".split()
+SAMPLES = [
+    "senior python engineer, 6 years building fastapi services on aws",
+    "react and node developer",
+    "data engineer: sql, docker, kubernetes pipelines; led a team of 4",
+    "built models",
+    " ".join(WORDS * 3),
+]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    """A tiny random BERT saved as a local SentenceTransformer directory."""
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    root = tmp_path_factory.mktemp("tiny-st")
+    tf_dir = root / "transformer"
+    tf_dir.mkdir()
+    vocab = tf_dir / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ",", ".", ":", ";"] + WORDS))
+    torch.manual_seed(0)
+    cfg = BertConfig(vocab_size=len(vocab.read_text().split("\n")), hidden_size=32, num_hidden_layers=2,
+                     num_attention_heads=2, intermediate_size=64, max_position_embeddings=128)
+    BertModel(cfg).save_pretrained(tf_dir)
+    BertTokenizerFast(vocab_file=str(vocab)).save_pretrained(tf_dir)
+    word = models.Transformer(str(tf_dir), max_seq_length=64)
+    st = SentenceTransformer(modules=[word, models.Pooling(word.get_word_embedding_dimension(), "mean")])
+    st.save(str(root / "model"))
+    return str(root / "model")
+
+
+@pytest.mark.parametrize("backend,min_cos", [("onnx", 0.999), ("int8", 0.95)])
+def test_backend_parity_with_torch(model_dir, backend, min_cos, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "OUTPUT_DIR", tmp_path)
+    ref = embedding_backends.load_backend("torch", model_dir, max_seq_length=64).encode(SAMPLES, batch_size=2)
+    got = embedding_backends.load_backend(backend, model_dir, max_seq_length=64, threads=1).encode(SAMPLES, batch_size=2)
+    assert got.shape == ref.shape and got.dtype == np.float32
+    assert np.allclose(np.linalg.norm(got, axis=1), 1.0, atol=1e-5)
+    assert (got * ref).sum(axis=1).min() >= min_cos
+
+
+def test_model_key_and_unknown_backend(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "torch")
+    assert embedding_backends.model_key("m") == "m"
+    assert embedding_backends.model_key("m", "onnx") == "m#onnx"
+    with pytest.raises(ValueError):
+        embedding_backends.load_backend("tensorrt", "m")
@@ -0,0 +1,71 @@
+import numpy as np
+
+from hirelens.services.embedding_cache import EmbeddingCache, text_key
+
+
+def _encoder(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        return np.asarray([[len(t), 1.0, 0.5] for t in texts], dtype="float32")
+    return encode
+
+
+def test_only_misses_reach_the_model_and_cache_persists(tmp_path):
+    calls = []
+    cache = EmbeddingCache(tmp_path, "org/model")
+    first = cache.embed(["a", "bb", "a"], _encoder(calls))
+    assert calls == [["a", "bb"]]
+    assert first.shape == (3, 3) and first[0].tolist() == first[2].tolist()
+
+    again = EmbeddingCache(tmp_path, "org/model").embed(["bb", "ccc"], _encoder(calls))
+    assert calls[-1] == ["ccc"]
+    assert again[:, 0].tolist() == [2.0, 3.0]
+    assert cache.stats()["misses"] == 3
+
+
+def test_lru_eviction_respects_cap(tmp_path):
+    calls = []
+    cache = EmbeddingCache(tmp_path, "m", max_entries=2)
+    cache.embed(["a", "bb"], _encoder(calls))
+    cache.embed(["a"], _encoder(calls))          # "bb" is now least recently used
+    cache.embed(["ccc"], _encoder(calls))
+    assert len(cache.lru) == 2 and cache.evictions == 1
+    calls.clear()
+    cache.embed(["a", "ccc", "bb"], _encoder(calls))
+    assert calls == [["bb"]]
+    assert cache.stats()["hits"] == 3
+
+
+def test_float16_storage(tmp_path):
+    cache = EmbeddingCache(tmp_path, "m", float16=True)
+    cache.embed(["abcd"], _encoder([]))
+    out = EmbeddingCache(tmp_path, "m", float16=True).embed(["abcd"], _encoder([]))
+    assert out.dtype == np.float32
+    assert cache._mm.dtype == np.float16
+    assert np.allclose(out[0], [4.0, 1.0, 0.5])
+
+
+def test_new_entries_are_journaled_not_rewritten(tmp_path):
+    import os
+
+    import pytest
+
+    cache = EmbeddingCache(tmp_path, "m", max_entries=3)
+    cache.embed(["a"], _encoder([]))
+    checkpoint = os.path.getmtime(cache.index_path), os.path.getsize(cache.index_path)
+    cache.embed(["bb", "ccc"], _encoder([]))
+    cache.embed(["a"], _encoder([]))
+    cache.embed(["dddd"], _encoder([]))                 # evicts "bb" and reuses its row
+    assert (os.path.getmtime(cache.index_path), os.path.getsize(cache.index_path)) == checkpoint
+    with open(cache.journal_path, "a") as f:
+        f.write("torn")
+
+    calls = []
+    again = EmbeddingCache(tmp_path, "m", max_entries=3)
+    assert set(again.lru) == set(cache.lru) and again.rows == 3
+    out = again.embed(["a", "ccc", "dddd", "bb"], _encoder(calls))
+    assert calls == [["bb"]] and out[:, 0].tolist() == [1.0, 3.0, 4.0, 2.0]
+    assert text_key("bb") in EmbeddingCache(tmp_path, "m", max_entries=3).lru     # written past the torn line
+
+    with pytest.raises(ValueError):
+        EmbeddingCache(tmp_path, "m", max_entries=0)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from hirelens.services import featurestore, scorer
+
+
+def _items(texts):
+    return [{"path": f"/cv/{i}.txt", "text": t, "sha": f"{hash(t) & 0xffffffff:040x}"} for i, t in enumerate(texts)]
+
+
+TEXTS = ["python fastapi, 5 years", "react and sql, 2 years, BSc", "docker kubernetes"]
+
+
+def test_sync_matches_resume_profile_and_persists(tmp_path):
+    store = featurestore.FeatureStore(tmp_path)
+    prof = store.sync(_items(TEXTS))
+    ref = scorer.resume_profile(TEXTS)
+    for col in ("bits", "years", "degree"):
+        assert np.array_equal(np.asarray(prof[col]), ref[col])
+
+    reopened = featurestore.FeatureStore(tmp_path)
+    assert isinstance(reopened.columns["bits"], np.memmap)
+    assert reopened.paths == [f"/cv/{i}.txt" for i in range(3)]
+    assert np.array_equal(np.asarray(reopened.profile()["bits"]), ref["bits"])
+
+
+def test_sync_only_featurizes_changed_rows(tmp_path, monkeypatch):
+    store = featurestore.FeatureStore(tmp_path)
+    store.sync(_items(TEXTS))
+    seen = []
+    real = scorer.resume_profile
+    monkeypatch.setattr(scorer, "resume_profile", lambda texts, cv_skills=None: seen.extend(texts) or real(texts))
+
+    assert store.sync(_items(TEXTS)) is not None and seen == []
+    texts = [TEXTS[0], "golang and aws, 7 years", TEXTS[2], "java"]
+    prof = store.sync(_items(texts))
+    assert seen == ["golang and aws, 7 years", "java"]
+    assert np.array_equal(np.asarray(prof["years"]), real(texts)["years"])
+
+
+def test_taxonomy_change_invalidates_store(tmp_path, monkeypatch):
+    featurestore.FeatureStore(tmp_path).sync(_items(TEXTS))
+    monkeypatch.setattr(featurestore, "_taxonomy_hash", lambda: "other")
+    assert featurestore.FeatureStore(tmp_path).paths == []
@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from hirelens.configs.settings import settings
+from hirelens.learning import online
+
+RUN = {
+    "ids": ["a", "b", "c"],
+    "features": np.asarray([
+        [0.9, 1.0, 0.1, 0.0, 0.0, 0.0],
+        [0.5, 0.1, 1.0, 1.0, 0.0, 0.0],
+        [0.2, 0.8, 0.2, 0.0, 1.0, 0.0],
+    ], dtype="float32"),
+}
+LABELS = [{"resume_id": "a", "label": "good_fit"}, {"resume_id": "b", "label": "poor_fit"}, {"resume_id": "c", "label": "good_fit"}]
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "FEEDBACK_MIN_LABELS", 3)
+    return str(tmp_path / "feedback")
+
+
+def test_join_uses_stored_breakdown():
+    recs = online.join(LABELS + [{"resume_id": "zz", "label": "good_fit"}], RUN, "jd-1", "r1")
+    assert recs[1]["features"] == [0.1, 1.0, 1.0, 0.0] and recs[1]["jd_id"] == "jd-1"
+    assert recs[3]["features"] is None
+
+
+def test_learner_shifts_weights_and_restores_from_snapshot(root):
+    learner = online.FeedbackLearner(root)
+    assert learner.weights("jd-1") == (online.default_weights(), "default")
+    for _ in range(10):
+        assert learner.record(online.join(LABELS, RUN, "jd-1", "r1")) == 3
+    w, source = learner.weights("jd-1")
+    assert source == "jd" and w["skills"] > settings.WEIGHT_SKILLS and w["experience"] < settings.WEIGHT_EXPERIENCE
+    assert learner.weights("jd-2")[1] == "global"
+
+    again = online.FeedbackLearner(root)
+    assert again.weights("jd-1")[0] == w and again.models["jd-1"].n == 30
+
+
+def test_tail_replay_and_hot_reload(root, monkeypatch):
+    monkeypatch.setattr(settings, "FEEDBACK_SNAPSHOT_EVERY", 1000)
+    writer, reader = online.FeedbackLearner(root), online.FeedbackLearner(root)
+    writer.record(online.join(LABELS, RUN, "jd-1", "r1"))
+    # Another process's appends show up without a restart.
+    assert reader.weights("jd-1")[1] == "jd" and reader.models["jd-1"].n == 3
+    assert reader.stats()["offset"] == writer.stats()["offset"] > 0
+
+    # A torn last line (crash mid-append) is left for later, not misread.
+    with open(writer._segment_path(), "ab") as f:
+        f.write(b'{"label": "good_fit", "feat')
+    assert online.FeedbackLearner(root).models["jd-1"].n == 3
+
+    # The next append ends the torn line; replay skips it as undecodable.
+    writer.record(online.join(LABELS, RUN, "jd-1", "r1"))
+    assert online.FeedbackLearner(root).models["jd-1"].n == 6 and reader.weights("jd-1")[1] == "jd"
+
+
+def test_learners_sharing_a_log_interleave_safely(root, monkeypatch):
+    # Separate learners stand in for separate processes: only the flock orders them.
+    monkeypatch.setattr(settings, "FEEDBACK_SNAPSHOT_EVERY", 7)
+    learners = [online.FeedbackLearner(root) for _ in range(4)]
+    recs = online.join(LABELS, RUN, "jd-1", "r1")
+
+    def work(learner):
+        for _ in range(25):
+            learner.record(recs)
+            learner.weights("jd-1")
+
+    threads = [threading.Thread(target=work, args=(lr,)) for lr in learners]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    size = os.path.getsize(learners[0]._segment_path())
+    fresh = online.FeedbackLearner(root)
+    for lr in learners:
+        lr.refresh()
+        assert lr.offset == size and lr.models["jd-1"].coef == fresh.models["jd-1"].coef
+    assert fresh.models["jd-1"].n == 4 * 25 * 3
+
+
+def test_compaction_rolls_segments(root, monkeypatch):
+    monkeypatch.setattr(settings, "FEEDBACK_SEGMENT_BYTES", 2000)
+    learner = online.FeedbackLearner(root)
+    for _ in range(10):
+        learner.record(online.join(LABELS, RUN, "jd-1", "r1"))
+    stats = learner.stats()
+    assert stats["segment"] > 1 and stats["offset"] < 2000
+    with open(learner._file(online.SNAPSHOT_FILE)) as f:
+        assert json.load(f)["segment"] == stats["segment"]
+
+    restored = online.FeedbackLearner(root)
+    assert restored.models["jd-1"].n == 30 and restored.weights("jd-1") == learner.weights("jd-1")
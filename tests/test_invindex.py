@@ -0,0 +1,33 @@
+import numpy as np
+
+from hirelens.services import invindex, scorer
+
+RESUMES = [
+    {"text": "python fastapi, 5 years"},
+    {"text": "python and sql, 2 years"},
+    {"text": "react, 8 years"},
+    {"text": "python docker sql fastapi, 3 years"},
+]
+PROFILE = scorer.resume_profile([r["text"] for r in RESUMES])
+
+
+def test_posting_list_intersection_and_years():
+    idx = invindex.CorpusIndex(PROFILE)
+    assert idx.with_skills(["python"]).tolist() == [0, 1, 3]
+    assert idx.with_skills(["python", "sql"]).tolist() == [1, 3]
+    assert idx.with_skills(["python", "kubernetes"]).tolist() == []
+    assert idx.with_min_years(3).tolist() == [0, 2, 3]
+    assert idx.eligible(["python", "fastapi"], 4).tolist() == [0]
+    assert idx.eligible([], None).tolist() == [0, 1, 2, 3]
+
+
+def test_canonical_skills_maps_synonyms_and_reports_unknown_terms():
+    known, unknown = invindex.canonical_skills(["Machine Learning", "postgres", "COBOL"])
+    assert known == {"ml", "sql"}
+    assert unknown == ["COBOL"]
+
+
+def test_index_is_cached_per_corpus_version():
+    a = invindex.get_index(PROFILE, "v-test")
+    assert invindex.get_index(PROFILE, "v-test") is a
+    assert isinstance(a.postings["python"], np.ndarray)
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from hirelens.services import jobs
+
+
+def _wait(manager, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in jobs.FINISHED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_job_result_progress_and_persistence(tmp_path):
+    manager = jobs.JobManager(workers=1, max_queue=4, ttl_s=60, results_dir=tmp_path)
+
+    def work(job):
+        job.progress["scored"] = 3
+        return [1, 2, 3]
+
+    job = manager.submit("score", work)
+    done = _wait(manager, job.id)
+    assert done["status"] == jobs.SUCCEEDED and done["result"] == [1, 2, 3]
+    assert done["progress"] == {"scored": 3}
+    assert (tmp_path / f"{job.id}.json").exists()
+
+    manager._jobs.clear()
+    assert manager.get(job.id)["result"] == [1, 2, 3]
+
+
+def test_cancel_running_and_queued_jobs(tmp_path):
+    manager = jobs.JobManager(workers=1, max_queue=4, ttl_s=60, results_dir=tmp_path)
+    started = threading.Event()
+
+    def slow(job):
+        started.set()
+        while True:
+            job.check_cancelled()
+            time.sleep(0.01)
+
+    running = manager.submit("score", slow)
+    queued = manager.submit("score", lambda job: "never")
+    assert started.wait(2)
+    assert manager.cancel(queued.id) and manager.cancel(running.id)
+    assert _wait(manager, running.id)["status"] == jobs.CANCELLED
+    assert manager.get(queued.id)["status"] == jobs.CANCELLED
+    assert not manager.cancel(running.id)
+
+
+def test_bounded_queue_and_ttl_eviction(tmp_path):
+    gate = threading.Event()
+    manager = jobs.JobManager(workers=1, max_queue=1, ttl_s=60, results_dir=tmp_path)
+    manager.submit("score", lambda job: gate.wait(2))
+    time.sleep(0.05)
+    manager.submit("score", lambda job: None)
+    with pytest.raises(jobs.QueueFull):
+        manager.submit("score", lambda job: None)
+    gate.set()
+
+    quick = jobs.JobManager(workers=1, max_queue=1, ttl_s=0, results_dir=tmp_path / "ttl")
+    job = quick.submit("score", lambda j: 1)
+    _wait(quick, job.id)
+    time.sleep(0.01)
+    quick.evict_expired()
+    assert quick.get(job.id) is None
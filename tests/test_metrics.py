@@ -0,0 +1,29 @@
+from hirelens.services import metrics
+
+
+def test_counter_and_histogram_render_prometheus_text():
+    c = metrics.counter("test_things_total", "Things.")
+    c.inc(kind="a")
+    c.inc(2, kind="a")
+    h = metrics.histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    h.observe(0.05, route="/x")
+    h.observe(0.5, route="/x")
+    text = metrics.render()
+    assert "# TYPE test_things_total counter" in text
+    assert 'test_things_total{kind="a"} 3' in text
+    assert 'test_latency_seconds_bucket{route="/x",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/x",le="+Inf"} 2' in text
+    assert 'test_latency_seconds_sum{route="/x"} 0.55' in text
+    assert metrics.counter("test_things_total") is c
+
+
+def test_timer_reports_into_active_profile_only():
+    with metrics.timer("outside"):
+        pass
+    with metrics.profiling() as prof:
+        with metrics.timer("parse"):
+            pass
+        with metrics.timer("parse"):
+            pass
+    assert set(prof) == {"parse"}
+    assert metrics.server_timing({"parse": 0.0125}) == "parse;dur=12.50"
@@ -0,0 +1,169 @@
+import os
+
+import pytest
+
+from hirelens.configs.settings import settings
+from hirelens.services import parser
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    monkeypatch.setattr(settings, "OUTPUT_DIR", tmp_path / "outputs")
+    monkeypatch.setattr(settings, "PARSE_TIMEOUT_S", 0)     # extract inline, so the patched reader sees the calls
+    monkeypatch.setattr(parser, "_caches", {})
+    reads = []
+    real_read = parser.extract_text
+
+    def counting_read(path):
+        reads.append(os.path.basename(path))
+        return real_read(path)
+
+    monkeypatch.setattr(parser, "extract_text", counting_read)
+    return resumes, reads
+
+
+def test_parse_cache_only_reparses_changed_files(corpus):
+    folder, reads = corpus
+    (folder / "a.txt").write_text("alice   python")
+    (folder / "b.txt").write_text("bob sql")
+
+    first = parser.load_resumes(folder)
+    assert [r["text"] for r in first] == ["alice python", "bob sql"]
+    assert sorted(reads) == ["a.txt", "b.txt"]
+    v1 = parser.corpus_version(first)
+
+    reads.clear()
+    assert parser.corpus_version(parser.load_resumes(folder)) == v1
+    assert reads == []
+
+    (folder / "b.txt").write_text("bob sql and docker")
+    (folder / "c.txt").write_text("carol react")
+    third = parser.load_resumes(folder)
+    assert sorted(reads) == ["b.txt", "c.txt"]
+    assert parser.corpus_version(third) != v1
+
+
+def test_parse_cache_evicts_deleted_files_and_persists(corpus, monkeypatch):
+    folder, reads = corpus
+    (folder / "a.txt").write_text("alice")
+    (folder / "b.txt").write_text("bob")
+    parser.load_resumes(folder)
+
+    os.remove(folder / "b.txt")
+    monkeypatch.setattr(parser, "_caches", {})
+    reads.clear()
+    items = parser.load_resumes(folder)
+    assert [r["id"] for r in items] == ["a.txt"]
+    assert reads == []
+    cache = parser._get_cache(os.path.join(str(settings.OUTPUT_DIR), parser.PARSE_CACHE_FILE))
+    assert list(cache.entries) == [str(folder / "a.txt")]
+
+
+def test_timed_out_file_is_extracted_again(corpus, monkeypatch):
+    folder, reads = corpus
+    (folder / "a.txt").write_text("alice")
+    real = parser.extract_many
+    monkeypatch.setattr(parser, "extract_many", lambda paths, *a: [
+        {"path": p, "text": "", "error": "timeout after 1s", "seconds": 1.0} for p in paths
+    ])
+    assert len(parser.ingest(folder)[1]["failed"]) == 1
+
+    monkeypatch.setattr(parser, "extract_many", real)
+    items, report = parser.ingest(folder)
+    assert [r["text"] for r in items] == ["alice"] and report["extracted"] == 1 and report["failed"] == []
+    assert reads == ["a.txt"]
+
+
+def test_known_path_follows_ingests_and_evictions(corpus):
+    folder, _ = corpus
+    (folder / "a.txt").write_text("alice")
+    items = parser.load_resumes(folder)
+    sha = items[0]["sha"]
+    assert parser.known_path(folder, sha) == str(folder / "a.txt")
+    assert parser.known_path(folder.parent, "0" * 40) is None
+
+    (folder / "b.txt").write_text("bob")
+    (b,), _ = parser.ingest_files([str(folder / "b.txt")])
+    assert parser.known_path(folder, b["sha"]) == str(folder / "b.txt")
+    os.remove(folder / "a.txt")
+    parser.load_resumes(folder)
+    assert parser.known_path(folder, sha) is None
+
+
+def test_extract_many_parallel_keeps_order_and_reports_failures(tmp_path):
+    paths = []
+    for i in range(6):
+        p = tmp_path / f"r{i}.txt"
+        p.write_text(f"resume   {i}")
+        paths.append(str(p))
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    paths.insert(3, str(broken))
+
+    out = parser.extract_many(paths, workers=3, timeout=10)
+    assert [r["path"] for r in out] == paths
+    assert [r["text"] for r in out if r["path"] != str(broken)] == [f"resume {i}" for i in range(6)]
+    assert out[3]["error"] and out[3]["text"] == ""
+    assert all(r["error"] is None for i, r in enumerate(out) if i != 3)
+
+
+def test_extract_one_enforces_time_budget(monkeypatch):
+    import time
+
+    monkeypatch.setattr(parser, "extract_text", lambda path: time.sleep(5) or "never")
+    res = parser._extract_one("slow.pdf", timeout=0.2)
+    assert res["error"].startswith("timeout") and res["text"] == ""
+    assert res["seconds"] < 2
+
+
+def _hang(path):
+    import signal
+    import time
+
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})     # like a loop stuck in C code
+    time.sleep(60)
+
+
+def test_timeout_is_enforced_off_the_main_thread(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    ok = tmp_path / "ok.txt"
+    ok.write_text("x")
+    if parser._pool is not None:
+        parser._reset_pool(parser._pool)
+    monkeypatch.setattr(parser, "extract_text", _hang)          # inherited by the freshly forked workers
+    out, t0 = [], time.perf_counter()
+    t = threading.Thread(target=lambda: out.extend(parser.extract_many([str(tmp_path / "hung.pdf")], workers=1, timeout=0.2)))
+    t.start()
+    t.join(20)
+    assert out and out[0]["error"].startswith("timeout") and time.perf_counter() - t0 < 20
+    assert parser._pool is None                                 # the pool with the hung worker was killed
+
+    monkeypatch.undo()
+    assert parser.extract_many([str(ok)], workers=1, timeout=5)[0]["text"] == "x"
+
+
+@pytest.mark.parametrize("engine", ["pymupdf", "pypdf"])
+def test_pdf_engines_respect_page_and_char_caps(tmp_path, engine):
+    fitz = pytest.importorskip("fitz")
+    pytest.importorskip("pypdf")
+    doc = fitz.open()
+    for i in range(3):
+        doc.new_page().insert_text((72, 72), f"page{i} python")
+    path = str(tmp_path / "cv.pdf")
+    doc.save(path)
+    doc.close()
+
+    full = parser._read_pdf(path, engine, max_pages=0, max_chars=0)
+    assert all(f"page{i}" in full for i in range(3))
+    capped = parser._read_pdf(path, engine, max_pages=2, max_chars=0)
+    assert "page1" in capped and "page2" not in capped
+    assert len(parser._read_pdf(path, engine, max_pages=0, max_chars=8)) == 8
+
+
+def test_unknown_pdf_engine_is_rejected():
+    with pytest.raises(ValueError):
+        parser.resolve_pdf_engine("tesseract")
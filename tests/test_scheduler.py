@@ -0,0 +1,224 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hirelens.configs.settings import settings
+from hirelens.services import scheduler
+
+pytest.importorskip("googleapiclient")
+
+
+class FakeCalendar:
+    """
+    Just enough of Calendar v3 for the scheduler: events insert/get, freeBusy
+    (answered from `busy`) and the multipart/mixed batch endpoint. `fail_once`
+    holds event ids that get one 503 before succeeding.
+    """
+
+    def __init__(self):
+        self.events = {}
+        self.busy = {}
+        self.freebusy_queries = []
+        self.fail_once = set()
+        self.inserts = 0
+        self.batches = 0
+        self.lock = threading.Lock()
+
+    def handle(self, method, path, body):
+        if path.startswith("/calendar/v3/freeBusy"):
+            q = json.loads(body)
+            ids = [it["id"] for it in q["items"]]
+            self.freebusy_queries.append(ids)
+            cals = {i: {"busy": self.busy.get(i, [])} for i in ids}
+            cals.update({i: {"errors": [{"reason": "notFound"}]} for i in ids if i.startswith("missing")})
+            return 200, {"kind": "calendar#freeBusy", "calendars": cals}
+        m = re.match(r"/calendar/v3/calendars/[^/]+/events(?:/([^?]+))?", path)
+        if not m:
+            return 404, {"error": {"code": 404, "message": "not found"}}
+        with self.lock:
+            if method == "GET":
+                ev = self.events.get(m.group(1))
+                return (200, ev) if ev else (404, {"error": {"code": 404, "message": "not found"}})
+            ev = json.loads(body)
+            self.inserts += 1
+            if ev["id"] in self.fail_once:
+                self.fail_once.discard(ev["id"])
+                return 503, {"error": {"code": 503, "message": "backend error"}}
+            if ev["id"] in self.events:
+                return 409, {"error": {"code": 409, "message": "The requested identifier already exists."}}
+            ev["htmlLink"] = f"https://calendar.test/{ev['id']}"
+            ev["hangoutLink"] = f"https://meet.test/{ev['conferenceData']['createRequest']['requestId']}"
+            self.events[ev["id"]] = ev
+            return 200, ev
+
+
+def _handler(cal):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload, ctype="application/json"):
+            data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            return self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+
+        def do_GET(self):
+            self._send(*cal.handle("GET", self.path, ""))
+
+        def do_POST(self):
+            body = self._body()
+            if not self.path.startswith("/batch/"):
+                return self._send(*cal.handle("POST", self.path, body))
+            cal.batches += 1
+            boundary = self.headers["Content-Type"].split("boundary=")[1].strip('"')
+            parts = []
+            for part in body.split(f"--{boundary}")[1:-1]:
+                head, _, inner = part.strip("\r\n").partition("\r\n\r\n") if "\r\n\r\n" in part else part.strip("\n").partition("\n\n")
+                cid = re.search(r"Content-ID: <(.+)>", head).group(1)
+                req_head, _, req_body = inner.replace("\r\n", "\n").partition("\n\n")
+                method, path, _ = req_head.split("\n")[0].split(" ")
+                status, payload = cal.handle(method, path, req_body)
+                parts.append(
+                    f"--BOUNDARY\r\nContent-Type: application/http\r\nContent-ID: <response-{cid}>\r\n\r\n"
+                    f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n"
+                )
+            self._send(200, ("".join(parts) + "--BOUNDARY--").encode(), "multipart/mixed; boundary=BOUNDARY")
+
+    return Handler
+
+
+@pytest.fixture
+def calendar(monkeypatch):
+    from google.auth.credentials import AnonymousCredentials
+
+    cal = FakeCalendar()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(cal))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "GOOGLE_CALENDAR_API_URL", f"http://127.0.0.1:{server.server_port}/calendar/v3/")
+    monkeypatch.setattr(settings, "SCHEDULE_RETRY_BACKOFF_S", 0.0)
+    monkeypatch.setattr(scheduler, "_get_creds", AnonymousCredentials)
+    scheduler.reset_client()
+    yield cal
+    server.shutdown()
+    scheduler.reset_client()
+
+
+def _item(i, **kw):
+    return {
+        "interviewer_email": "lead@corp.test",
+        "candidate_email": f"cv{i}@mail.test",
+        "start_iso": f"2025-08-11T{9 + i % 8:02d}:00:00",
+        "end_iso": f"2025-08-11T{9 + i % 8:02d}:30:00",
+        "title": f"Interview {i}",
+        "description": None,
+        "timezone": "Asia/Kolkata",
+        **kw,
+    }
+
+
+def test_batch_creates_events_with_retries_and_is_idempotent(calendar):
+    items = [_item(i) for i in range(60)]
+    flaky = scheduler.event_id(scheduler.request_key("lead@corp.test", "cv3@mail.test", items[3]["start_iso"], items[3]["end_iso"]))
+    calendar.fail_once.add(flaky)
+
+    out = scheduler.schedule_batch(items)
+    assert [r["status"] for r in out] == ["created"] * 60
+    assert out[3]["attempts"] == 2 and out[0]["attempts"] == 1
+    assert out[5]["meetLink"].startswith("https://meet.test/hl-")
+    assert len(calendar.events) == 60 and calendar.batches == 3      # 50 + 10, then the retry
+
+    again = scheduler.schedule_batch(items[:5])
+    assert [r["status"] for r in again] == ["exists"] * 5
+    assert [r["eventId"] for r in again] == [r["eventId"] for r in out[:5]]
+    assert len(calendar.events) == 60
+
+
+def test_batch_reports_invalid_items_and_single_schedule_reuses_event(calendar):
+    out = scheduler.schedule_batch([_item(0, start_iso="tomorrow"), _item(1)])
+    assert out[0]["status"] == "failed" and "ISO" in out[0]["error"]
+    assert out[1]["status"] == "created"
+
+    first = scheduler.schedule_meet(**_item(2, request_id="ats-42"))
+    second = scheduler.schedule_meet(**_item(2, request_id="ats-42", title="renamed"))
+    assert first["eventId"] == second["eventId"] and len(calendar.events) == 2
+
+
+def test_single_schedule_honours_max_attempts(calendar, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULE_MAX_ATTEMPTS", 1)
+    item = _item(4)
+    calendar.fail_once.add(scheduler.event_id(scheduler.request_key("lead@corp.test", "cv4@mail.test", item["start_iso"], item["end_iso"])))
+    with pytest.raises(Exception):
+        scheduler.schedule_meet(**item)
+    assert calendar.inserts == 1 and not calendar.events
+
+
+def test_schedule_retry_in_a_window_reuses_the_event(calendar):
+    from fastapi.testclient import TestClient
+
+    from hirelens.api.main import app
+
+    req = {
+        "interviewer_email": "lead@corp.test", "candidate_email": "cv0@mail.test", "title": "Interview 0",
+        "duration_minutes": 60, "window_start_iso": "2025-08-11T09:00:00", "window_end_iso": "2025-08-11T13:00:00",
+    }
+    with TestClient(app) as client:
+        first = client.post("/schedule", json=req).json()
+        # The booked slot now shows as busy; once the cached free/busy expires
+        # a retry would pick the next slot.
+        calendar.busy["lead@corp.test"] = [{"start": "2025-08-11T03:30:00Z", "end": "2025-08-11T04:30:00Z"}]  # 09:00-10:00 IST
+        scheduler.reset_client()
+        second = client.post("/schedule", json=req).json()
+    assert first["eventId"] == second["eventId"] and len(calendar.events) == 1
+
+
+def test_request_ids_are_stable_and_distinct():
+    a = scheduler.request_key("x@a", "y@b", "2025-01-01T10:00:00", "2025-01-01T10:30:00")
+    assert a == scheduler.request_key("X@A", "y@b", "2025-01-01T10:00:00", "2025-01-01T10:30:00")
+    assert a != scheduler.request_key("x@a", "z@b", "2025-01-01T10:00:00", "2025-01-01T10:30:00")
+    eid = scheduler.event_id(a)
+    assert re.fullmatch(r"[a-v0-9]{5,1024}", eid)
+
+
+def test_freebusy_batches_calendars_and_caches(calendar):
+    calendar.busy["lead@corp.test"] = [{"start": "2025-08-11T04:30:00Z", "end": "2025-08-11T06:30:00Z"}]  # 10:00-12:00 IST
+    cals = ["lead@corp.test"] + [f"cv{i}@mail.test" for i in range(59)] + ["missing@x"]
+    out = scheduler.find_slots(cals, "2025-08-11T09:00:00", "2025-08-11T13:00:00", 60, "Asia/Kolkata", 30, "", limit=10)
+    assert [len(q) for q in calendar.freebusy_queries] == [50, 11]
+    assert out["errors"] == {"missing@x": "notFound"}
+    assert [s["start"][11:16] for s in out["slots"]] == ["09:00", "12:00"]
+
+    scheduler.find_slots(cals[:10], "2025-08-11T09:00:00", "2025-08-11T13:00:00", 60, "Asia/Kolkata")
+    assert len(calendar.freebusy_queries) == 2          # served from the TTL cache
+
+
+def test_assign_and_book_panel(calendar):
+    calendar.busy["p1@corp.test"] = [{"start": "2025-08-11T03:30:00Z", "end": "2025-08-11T05:30:00Z"}]  # 09:00-11:00 IST
+    out = scheduler.assign_interviews(
+        ["p1@corp.test", "p2@corp.test"], ["a@mail.test", "b@mail.test"],
+        "2025-08-11T09:00:00", "2025-08-11T18:00:00", 45, "Asia/Kolkata", gap_minutes=15, book=True,
+    )
+    assert out["unassigned"] == []
+    starts = sorted(a["start"][11:16] for a in out["assignments"])
+    assert starts == ["11:00", "12:00"]
+    assert all(a["booking"]["status"] == "created" for a in out["assignments"])
+    ev = next(iter(calendar.events.values()))
+    assert {x["email"] for x in ev["attendees"]} >= {"p1@corp.test", "p2@corp.test"}
+
+
+def test_freebusy_cache_drops_expired_windows(calendar, monkeypatch):
+    import time
+
+    monkeypatch.setattr(settings, "FREEBUSY_TTL_S", 0.05)
+    scheduler.freebusy(["lead@corp.test", "cv1@mail.test"], 0, 3600)
+    time.sleep(0.1)
+    scheduler.freebusy(["lead@corp.test"], 3600, 7200)
+    assert list(scheduler._freebusy_cache) == [("lead@corp.test", 3600, 7200)]
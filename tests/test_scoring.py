@@ -0,0 +1,114 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+from hirelens.services import scorer
+
+WEIGHTS = {"skills": 0.45, "experience": 0.35, "education": 0.10, "seniority": 0.10}
+
+
+def _fake_embed(texts, model_name, batch_size=32):
+    out = []
+    for t in texts:
+        seed = int(hashlib.md5(t.encode("utf-8")).hexdigest()[:8], 16)
+        v = np.random.default_rng(seed).random(16).astype("float32")
+        out.append(v / np.linalg.norm(v))
+    return np.asarray(out, dtype="float32")
+
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch):
+    calls = []
+
+    def embed(texts, model_name, batch_size=32):
+        calls.append(list(texts))
+        return _fake_embed(texts, model_name, batch_size)
+
+    monkeypatch.setattr(scorer, "embed_texts", embed)
+    return calls
+
+
+JD = "Backend engineer, 3 years python, fastapi, docker and sql."
+RESUMES = [
+    "5 years of python and fastapi, docker. B.Tech in CS.",
+    "Frontend dev with react, 2 years experience.",
+    "ML engineer: transformers, embeddings, faiss. Masters.",
+]
+
+
+def test_score_candidates_matches_single_scoring():
+    batch = scorer.score_candidates(JD, RESUMES, WEIGHTS)
+    single = [scorer.score_candidate(JD, r, WEIGHTS) for r in RESUMES]
+    assert len(batch) == len(single)
+    for (fb, bb), (fs, bs) in zip(batch, single):
+        assert fb == pytest.approx(fs, rel=1e-5)
+        for k in bs:
+            assert bb[k] == pytest.approx(bs[k], rel=1e-5)
+
+
+def test_score_candidates_embeds_jd_once_and_batches_resumes(fake_embeddings):
+    scorer.score_candidates(JD, RESUMES, WEIGHTS, batch_size=2)
+    assert fake_embeddings == [[JD], RESUMES[:2], RESUMES[2:]]
+
+
+def test_score_candidates_empty_corpus():
+    assert scorer.score_candidates(JD, [], WEIGHTS) == []
+
+
+def test_skill_matcher_respects_word_boundaries_and_synonyms():
+    from hirelens.services.skills import SkillMatcher
+
+    m = SkillMatcher({"ml": ["machine learning"], "java": [], "node": ["node.js"], "c++": [], "vector db": ["vector database"]})
+    assert m.extract("HTML and JavaScript only") == []
+    assert m.extract("Machine  Learning, Node.js, C++ and a vector database.") == ["ml", "node", "c++", "vector db"]
+
+
+def test_skill_matcher_scales_to_large_taxonomies():
+    from hirelens.services.skills import SkillMatcher
+
+    taxonomy = {f"skill{i}": [f"alias{i}"] for i in range(5000)}
+    m = SkillMatcher(taxonomy)
+    assert m.extract("knows skill42, alias4999 and skill42x") == ["skill42", "skill4999"]
+
+
+def test_extract_skills_uses_configured_taxonomy():
+    assert scorer.extract_skills("html css") == []
+    assert "ml" in scorer.extract_skills("5 years of machine learning")
+
+
+def test_feature_matrix_reweighting_matches_scalar_scoring():
+    sims = _fake_embed(RESUMES, "m") @ _fake_embed([JD], "m")[0]
+    feats = scorer.build_features(JD, RESUMES, sims)
+    assert feats.shape == (len(RESUMES), len(scorer.FEATURES))
+    other = {"skills": 0.1, "experience": 0.2, "education": 0.3, "seniority": 0.4}
+    for w in (WEIGHTS, other):
+        final, br = scorer.score_features(feats, w)
+        for i, text in enumerate(RESUMES):
+            f, b = scorer._score_from_similarity(float(sims[i]), JD, text, w)
+            assert final[i] == pytest.approx(f, rel=1e-5)
+            assert br[i, :4].tolist() == pytest.approx([b[k] for k in ("skills", "experience", "education", "seniority")], rel=1e-5)
+            assert br[i, 4] == 0.0
+
+
+def test_feature_run_cache_is_keyed_by_jd_and_corpus_version():
+    run = {"features": np.zeros((0, len(scorer.FEATURES)), dtype="float32")}
+    scorer.cache_feature_run("jd text", "v1", run)
+    assert scorer.get_feature_run("jd text", "v1") is run
+    assert scorer.get_feature_run("jd text", "v2") is None
+    assert scorer.get_feature_run("jd text") is run
+    assert scorer.get_feature_run("another jd") is None
+
+
+def test_top_indices_matches_full_sort():
+    from hirelens.services.shortlist import top_indices
+
+    scores = np.asarray([3.0, 9.0, 1.0, 9.0, 5.0, 7.0], dtype="float32")
+    full = np.argsort(-scores, kind="stable")
+    for k in range(0, len(scores) + 2):
+        assert top_indices(scores, k).tolist() == full[:k].tolist()
+    assert top_indices(scores).tolist() == full.tolist()
+
+    ties = np.asarray([1.0] * 50 + [2.0] + [1.0] * 50, dtype="float32")
+    for k in (2, 10, 60):
+        assert top_indices(ties, k).tolist() == np.argsort(-ties, kind="stable")[:k].tolist()
@@ -0,0 +1,67 @@
+import random
+import time
+
+from hirelens.services import slots
+
+H = 3600
+
+
+def test_merge_and_complement():
+    assert slots.merge([(5, 7), (1, 3), (2, 4), (4, 5), (9, 9)]) == [(1, 7)]
+    assert slots.merge_many([[(0, 2)], [(1, 3), (6, 8)], []]) == [(0, 3), (6, 8)]
+    assert slots.complement([(0, 3), (6, 8)], 1, 10) == [(3, 6), (8, 10)]
+
+
+def test_common_slots_respect_busy_time_and_local_working_hours():
+    tz = "Asia/Kolkata"
+    start = slots.to_epoch("2025-08-11T00:00:00", tz)
+    end = slots.to_epoch("2025-08-12T00:00:00", tz)
+    busy = {
+        "a": [(slots.to_epoch("2025-08-11T09:00:00", tz), slots.to_epoch("2025-08-11T12:00:00", tz))],
+        "b": [(slots.to_epoch("2025-08-11T12:30:00", tz), slots.to_epoch("2025-08-11T17:00:00", tz))],
+    }
+    found = slots.common_slots(busy, start, end, 30 * 60, 15 * 60, tz, "09:00-18:00")
+    local = [(slots.to_iso(s, tz)[11:16], slots.to_iso(e, tz)[11:16]) for s, e in found]
+    assert local == [("12:00", "12:30"), ("17:00", "17:30"), ("17:15", "17:45"), ("17:30", "18:00")]
+
+
+def test_working_hours_follow_dst():
+    tz = "Europe/Berlin"      # clocks go forward on 2025-03-30
+    start, end = slots.to_epoch("2025-03-29T00:00:00", tz), slots.to_epoch("2025-03-31T00:00:00", tz)
+    found = slots.common_slots({}, start, end, H, H, tz, "09:00-10:00")
+    assert [slots.to_iso(s, tz) for s, _ in found] == ["2025-03-29T09:00:00+01:00", "2025-03-30T09:00:00+02:00"]
+
+
+def test_assign_panel_and_any_modes():
+    day = [(0, 9 * H), (17 * H, 24 * H)]          # free 09-17 UTC
+    panel = {"i1": day, "i2": day + [(9 * H, 12 * H)]}
+    cands = {"c1": [], "c2": [(12 * H, 16 * H)], "c3": []}
+    out, left = slots.assign(panel, cands, 0, 24 * H, H, mode="panel")
+    assert left == [] and [a["start"] // H for a in out] == [12, 13, 16]
+    assert all(a["interviewers"] == ["i1", "i2"] for a in out)
+
+    out, left = slots.assign(panel, cands, 0, 24 * H, H, mode="any", gap=H)
+    by = {a["candidate"]: a for a in out}
+    assert left == [] and by["c2"]["start"] == 9 * H
+    assert {a["interviewers"][0] for a in out} == {"i1", "i2"}
+
+    out, left = slots.assign({"i1": day}, {f"c{i}": [] for i in range(10)}, 0, 24 * H, 2 * H)
+    assert len(out) == 4 and len(left) == 6
+
+
+def test_fifty_calendars_two_weeks_is_fast():
+    rng = random.Random(1)
+    start, end = 0, 14 * 24 * H
+    busy = {}
+    for c in range(50):
+        events = []
+        for d in range(14):
+            for _ in range(8):
+                s = d * 24 * H + rng.randrange(8 * H, 18 * H, 900)
+                events.append((s, s + rng.choice([1800, 3600])))
+        busy[f"cal{c}"] = events
+    t0 = time.perf_counter()
+    slots.common_slots(busy, start, end, 1800, 900, "UTC", "09:00-18:00", True)
+    out, _ = slots.assign({k: busy[k] for k in list(busy)[:5]}, {k: busy[k] for k in list(busy)[5:]},
+                          start, end, 3600, 900, "UTC", "09:00-18:00", True, mode="any")
+    assert time.perf_counter() - t0 < 0.5 and out
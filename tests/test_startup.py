@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import time
+
+from hirelens.api import deps
+from hirelens.configs.settings import settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_api_import_is_lazy_and_creates_no_dirs(tmp_path):
+    out = tmp_path / "never-created"
+    code = (
+        "import sys, hirelens.api.main\n"
+        "heavy = [m for m in ('googleapiclient', 'sentence_transformers', 'torch', 'faiss') if m in sys.modules]\n"
+        "print(heavy)\n"
+    )
+    env = {**os.environ, "PYTHONPATH": ROOT, "OUTPUT_DIR": str(out), "RESUME_DIR": str(out / "r")}
+    r = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=ROOT, timeout=120)
+    assert r.returncode == 0, r.stderr
+    assert r.stdout.strip().splitlines()[-1] == "[]"
+    assert not out.exists()
+
+
+def test_background_warm_flips_readiness(monkeypatch):
+    from fastapi.testclient import TestClient
+    from hirelens.api import main
+
+    calls = []
+    monkeypatch.setattr(settings, "WARM_ON_STARTUP", True)
+    monkeypatch.setattr(deps, "warm_models", lambda: calls.append(time.sleep(0.2)))
+    monkeypatch.setattr(deps, "_state", {**deps._state, "warm": {}, "warmed": False, "error": None})
+    monkeypatch.setattr(deps, "_thread", None)
+    client = TestClient(main.app)
+
+    thread = deps.start_warm()
+    assert client.get("/health").json() == {"ok": True}
+    assert client.get("/ready").status_code == 503
+    thread.join(5)
+    r = client.get("/ready")
+    assert r.status_code == 200 and r.json()["ready"] and calls
+    assert "fastapi" in client.get("/startup").json()["imports"]
@@ -0,0 +1,49 @@
+import numpy as np
+
+from hirelens.services.vectorstore import VectorStore
+
+
+def _unit(*xs):
+    v = np.asarray(xs, dtype="float32")
+    return v / np.linalg.norm(v)
+
+
+def _embed(texts):
+    table = {"a": _unit(1, 0, 0), "b": _unit(0, 1, 0), "b2": _unit(0, 1, 1), "c": _unit(0, 0, 1)}
+    return np.vstack([table[t] for t in texts])
+
+
+def _item(path, text):
+    return {"id": path, "name": path, "path": path, "text": text, "sha": text}
+
+
+def test_sync_is_incremental_and_persistent(tmp_path):
+    index_path = str(tmp_path / "faiss.index")
+    embedded = []
+
+    def embed(texts):
+        embedded.extend(texts)
+        return _embed(texts)
+
+    store = VectorStore(index_path, "m")
+    assert store.sync([_item("x", "a"), _item("y", "b")], embed)
+    assert embedded == ["a", "b"]
+    assert not store.sync([_item("x", "a"), _item("y", "b")], embed)
+
+    embedded.clear()
+    assert store.sync([_item("y", "b2"), _item("z", "c")], embed)
+    assert embedded == ["b2", "c"]
+    assert len(store) == 2
+
+    reloaded = VectorStore(index_path, "m")
+    assert len(reloaded) == 2
+    assert [p for p, _ in reloaded.search(_unit(0, 0, 1), 2)] == ["z", "y"]
+    sims = reloaded.similarities(_unit(1, 0, 0), ["x", "z"])
+    assert sims.tolist() == [0.0, 0.0]
+
+
+def test_model_change_discards_index(tmp_path):
+    index_path = str(tmp_path / "faiss.index")
+    store = VectorStore(index_path, "m1")
+    store.sync([_item("x", "a")], _embed)
+    assert len(VectorStore(index_path, "m2")) == 0